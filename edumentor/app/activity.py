@@ -0,0 +1,162 @@
+"""
+✅ Activity history for the admin dashboards.
+
+ActivityBucket holds hourly per-course counts of each metric, appended by
+roll_up_activity() (`manage.py rollup_activity`, run from cron). A run only
+scans the raw rows between the metric's watermark and the last closed
+hour, so its cost follows new activity, not the size of the history.
+activity_series() reads the buckets back over a range, summed per
+hour / day / week / month.
+"""
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Trunc, TruncHour
+from django.utils import timezone
+
+from .models import ActivityBucket, ActivityWatermark, Certificate, Enrollment, QuizAttempt, VideoProgress
+
+# ✅ metric → (model, timestamp field); every model has a course_id.
+# Rows are counted, not events: a student's quiz attempt is one upserted
+# row stamped with its first attempt, and a progress row is counted once,
+# in the hour of its last update before the roll-up.
+ACTIVITY_SOURCES = {
+    "enrollments": (Enrollment, "enrolled_at"),
+    "active_progress_rows": (VideoProgress, "updated_at"),
+    "first_quiz_attempts": (QuizAttempt, "attempted_at"),
+    "certificates": (Certificate, "issued_at"),
+}
+
+# ✅ an hour is rolled up once it has been closed this long, so rows
+# committed just after the hour ends still land in its bucket
+ROLLUP_DELAY = timedelta(minutes=5)
+
+INTERVALS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=31),
+}
+
+MAX_ACTIVITY_POINTS = 500
+
+
+# ==========================================================
+# ✅ ROLL-UP
+# ==========================================================
+def floor_hour(value):
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def roll_up_activity(now=None):
+    """
+    ✅ Append the buckets of every closed hour since each metric's
+    watermark (the whole history on the first run), then move the
+    watermark. Returns {metric: buckets written}.
+    """
+    until = floor_hour((now or timezone.now()) - ROLLUP_DELAY)
+    written = {}
+
+    for metric, (model, field) in ACTIVITY_SOURCES.items():
+        with transaction.atomic():
+            # ✅ concurrent runs queue here instead of counting an hour twice
+            watermark = ActivityWatermark.objects.select_for_update().filter(metric=metric).first()
+            since = watermark.rolled_up_to if watermark else None
+
+            if since is not None and since >= until:
+                written[metric] = 0
+                continue
+
+            rows = model.objects.filter(**{f"{field}__lt": until})
+            if since is not None:
+                rows = rows.filter(**{f"{field}__gte": since})
+
+            buckets = [
+                ActivityBucket(course_id=row["course_id"], metric=metric, hour=row["hour"], count=row["count"])
+                for row in rows.annotate(
+                    hour=TruncHour(field, tzinfo=dt_timezone.utc)
+                ).values("course_id", "hour").annotate(count=Count("pk")).order_by()
+            ]
+            ActivityBucket.objects.bulk_create(buckets, batch_size=1000, ignore_conflicts=True)
+            ActivityWatermark.objects.update_or_create(metric=metric, defaults={"rolled_up_to": until})
+
+            written[metric] = len(buckets)
+
+    return written
+
+
+# ==========================================================
+# ✅ READING
+# ==========================================================
+def truncate(value, interval):
+    value = floor_hour(value)
+    if interval == "hour":
+        return value
+
+    value = value.replace(hour=0)
+    if interval == "week":
+        return value - timedelta(days=value.weekday())
+    if interval == "month":
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(value, interval):
+    if interval == "month":
+        return value.replace(year=value.year + value.month // 12, month=value.month % 12 + 1)
+    return value + INTERVALS[interval]
+
+
+def bucket_starts(start, end, interval):
+    bucket = truncate(start, interval)
+    while bucket < end:
+        yield bucket
+        bucket = next_bucket(bucket, interval)
+
+
+def point_count(start, end, interval):
+    return max(int((end - start) / INTERVALS[interval]) + 1, 1)
+
+
+def pick_interval(start, end):
+    """✅ Finest interval that keeps the series within MAX_ACTIVITY_POINTS"""
+    for interval in INTERVALS:
+        if point_count(start, end, interval) <= MAX_ACTIVITY_POINTS:
+            return interval
+    return "month"
+
+
+def activity_series(metrics, start, end, interval, course_id=None):
+    """
+    ✅ {metric: [{"bucket", "count"}]} for buckets in [start, end), summed
+    per interval in one query; empty buckets are filled with 0.
+    start is aligned down to its interval so the first bucket is whole.
+    """
+    start = truncate(start, interval)
+    rows = ActivityBucket.objects.filter(metric__in=metrics, hour__gte=start, hour__lt=end)
+    if course_id is not None:
+        rows = rows.filter(course_id=course_id)
+
+    totals = {
+        (row["metric"], row["bucket"]): row["total"]
+        for row in rows.annotate(
+            bucket=Trunc("hour", interval, tzinfo=dt_timezone.utc)
+        ).values("metric", "bucket").annotate(total=Sum("count")).order_by()
+    }
+
+    starts = list(bucket_starts(start, end, interval))
+    return {
+        metric: [{"bucket": bucket, "count": totals.get((metric, bucket), 0)} for bucket in starts]
+        for metric in metrics
+    }
+
+
+def rolled_up_to(metrics):
+    """✅ Oldest watermark of the metrics (None until the first roll-up)"""
+    watermarks = dict(
+        ActivityWatermark.objects.filter(metric__in=metrics).values_list("metric", "rolled_up_to")
+    )
+    if len(watermarks) < len(metrics):
+        return None
+    return min(watermarks.values())
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import (Profile,Course,Module,Video,VideoProgress,Enrollment,Quiz,Question,QuizAttempt,Certificate,Lesson
+from .models import (Profile,Course,Module,Video,VideoProgress,Enrollment,Quiz,Question,QuizAttempt,Certificate,Lesson,
+    QuizStatsSnapshot,CourseStatsRollup,ActivityBucket,ActivityWatermark,LeaderboardEntry
 )
 
 # --------------------
@@ -93,7 +94,7 @@ class QuizAttemptAdmin(admin.ModelAdmin):
 # --------------------
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
-    list_display = ("user", "course", "certificate_id", "issued_at")
+    list_display = ("user", "course", "certificate_id", "issued_at", "pdf_sha256")
 
 
 # --------------------
@@ -101,3 +102,65 @@ class CertificateAdmin(admin.ModelAdmin):
 @admin.register(Lesson)
 class LessonAdmin(admin.ModelAdmin):
     list_display = ("id", "module", "title", "order")
+
+
+# --------------------
+# Quiz Stats Snapshot
+# --------------------
+@admin.register(QuizStatsSnapshot)
+class QuizStatsSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("course", "snapshot_date", "total_attempts", "passed")
+    list_filter = ("snapshot_date",)
+
+
+# --------------------
+# Course Stats Rollup (maintained by app.stats, read-only here)
+# --------------------
+@admin.register(CourseStatsRollup)
+class CourseStatsRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "course", "enrollments", "active_enrollments", "completed_videos",
+        "quiz_attempts", "quiz_passes", "certificates",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# --------------------
+# Activity history (appended by `manage.py rollup_activity`, read-only here)
+# --------------------
+@admin.register(ActivityBucket)
+class ActivityBucketAdmin(admin.ModelAdmin):
+    list_display = ("course", "metric", "hour", "count")
+    list_filter = ("metric",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ActivityWatermark)
+class ActivityWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("metric", "rolled_up_to")
+
+
+# --------------------
+# Leaderboard (maintained by app.leaderboard, read-only here)
+# --------------------
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ("course", "user", "avg_score", "quizzes", "scored_at")
+    list_filter = ("course",)
+    ordering = ("course", "-avg_score", "scored_at", "user")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
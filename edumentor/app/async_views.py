@@ -0,0 +1,174 @@
+"""
+✅ Async versions of the hottest read endpoints, for ASGI workers
+(opt-in, see edumentor/asgi.py). urls.py routes to these instead of app.views when
+settings.ASYNC_VIEWS is on; payloads and status codes are the same.
+
+DB reads go through the async ORM (aget / async for) and cache reads
+through the async cache API, so a slow client doesn't hold a thread.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
+from rest_framework.exceptions import AuthenticationFailed, MethodNotAllowed, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .cache import aget_course_outline
+from .models import Course, Enrollment, Lesson
+from .pagination import CourseCursorPagination
+from .progress import aget_course_progress
+from .query_budget import query_budget
+from .serializers import CourseSerializer, LessonSerializer, MyEnrollmentSerializer
+from .views import filter_courses, requested_course_fields
+
+
+# ==========================================================
+# ✅ ASYNC @api_view
+# ==========================================================
+def handle_exception(request, exc):
+    # ✅ same as APIView.handle_exception: 401 + WWW-Authenticate when
+    # the authenticator provides a header, 403 otherwise
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        header = request.authenticators[0].authenticate_header(request)
+        if header:
+            exc.auth_header = header
+        else:
+            exc.status_code = 403
+
+    response = api_settings.EXCEPTION_HANDLER(exc, {"request": request})
+    if response is None:
+        raise exc
+    return response
+
+
+def render_response(request, response):
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = response.accepted_renderer.media_type
+    response.renderer_context = {"request": request, "response": response}
+    return response.render()
+
+
+def async_api_view(view):
+    """
+    ✅ @api_view(["GET"]) + @permission_classes([IsAuthenticated]) for an
+    async function: DRF authenticators, DRF error payloads, JSON responses
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request = Request(
+            request,
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        )
+
+        try:
+            # ✅ authenticators are sync (user lookup / cache reads)
+            user = await sync_to_async(lambda: request.user)()
+            if not user.is_authenticated:
+                raise NotAuthenticated()
+
+            if request.method not in ("GET", "HEAD"):
+                raise MethodNotAllowed(request.method)
+
+            response = await view(request, *args, **kwargs)
+        except Exception as exc:
+            response = handle_exception(request, exc)
+
+        return render_response(request, response)
+
+    wrapper.csrf_exempt = True
+    return wrapper
+
+
+# ==========================================================
+# ✅ COURSES
+# ==========================================================
+async def course_catalog_context(request, fields=None):
+    context = {"request": request}
+
+    if fields and "is_enrolled" not in fields:
+        return context
+
+    if request.user.is_authenticated:
+        context["enrolled_course_ids"] = {
+            course_id async for course_id in Enrollment.objects.filter(
+                user=request.user
+            ).values_list("course_id", flat=True)
+        }
+
+    return context
+
+
+@query_budget(3)
+@async_api_view
+async def course_list(request):
+    fields = requested_course_fields(request)
+    courses = filter_courses(request, Course.objects.all(), fields)
+
+    # ✅ CursorPagination evaluates the page itself (sync)
+    paginator = CourseCursorPagination()
+    page = await sync_to_async(paginator.paginate_queryset)(courses, request)
+
+    serializer = CourseSerializer(
+        page,
+        many=True,
+        fields=fields,
+        context=await course_catalog_context(request, fields)
+    )
+    return paginator.get_paginated_response(serializer.data)
+
+
+@query_budget(4)
+@async_api_view
+async def course_modules(request, course_id):
+    course = await aget_object_or_404(Course, id=course_id)
+    return Response(await aget_course_outline(course.id))
+
+
+@query_budget(2)
+@async_api_view
+async def course_progress(request, course_id):
+    progress = (await aget_course_progress(request.user, [course_id])).get(course_id)
+
+    if progress is None:
+        return Response({"error": "Course not found"}, status=404)
+
+    return Response({k: v for k, v in progress.items() if k != "course_id"})
+
+
+# ==========================================================
+# ✅ LESSONS
+# ==========================================================
+@query_budget(2)
+@async_api_view
+async def lesson_detail(request, lesson_id):
+    lesson = await aget_object_or_404(Lesson.objects.select_related("module"), id=lesson_id)
+    return Response(LessonSerializer(lesson).data)
+
+
+@query_budget(2)
+@async_api_view
+async def module_lessons(request, module_id):
+    lessons = [
+        lesson async for lesson in Lesson.objects.filter(
+            module_id=module_id
+        ).select_related("module").order_by("order")
+    ]
+    return Response(LessonSerializer(lessons, many=True).data)
+
+
+# ==========================================================
+# ✅ ENROLLMENTS
+# ==========================================================
+@query_budget(2)
+@async_api_view
+async def my_enrollments(request):
+    enrollments = [
+        enrollment async for enrollment in Enrollment.objects.filter(
+            user=request.user,
+            is_active=True
+        ).select_related("course")
+    ]
+    return Response(MyEnrollmentSerializer(enrollments, many=True).data)
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import cache_is_shared
+
+
+def stateless_reads_enabled():
+    """
+    ✅ JWT_STATELESS_READS, refused with a per-process cache: role changes,
+    enrollment changes and deactivations on one worker would never
+    reach the others before the token expires (check app.E002)
+    """
+    return settings.JWT_STATELESS_READS and cache_is_shared()
+
+
+def user_inactive_key(user_id):
+    return f"user_inactive:{user_id}"
+
+
+def mark_user_inactive(user_id, inactive):
+    """
+    ✅ Deactivated users are rejected by the stateless mode before their
+    access token expires; tokens issued before the deactivation are gone
+    after ACCESS_TOKEN_LIFETIME, and so is the flag (newer logins fail)
+    """
+    if inactive:
+        cache.set(user_inactive_key(user_id), True, api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    else:
+        cache.delete(user_inactive_key(user_id))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    ✅ Stateless mode for read-only requests.
+
+    GET / HEAD / OPTIONS with a token issued by EduMentorTokenObtainPairSerializer
+    are authenticated from the token claims alone (no User query). Writes,
+    and tokens without the claims, go through the normal JWTAuthentication.
+
+    Enable with JWT_STATELESS_READS=1 (and a shared cache).
+    """
+
+    def authenticate(self, request):
+        if request.method not in SAFE_METHODS or not stateless_reads_enabled():
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if "role" not in validated_token:
+            return self.get_user(validated_token), validated_token
+
+        return self.get_claims_user(validated_token), validated_token
+
+    def get_claims_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed("Token contained no recognizable user identification")
+
+        if cache.get(user_inactive_key(user_id)):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        User = get_user_model()
+        user = User(
+            username=validated_token.get("username", ""),
+            is_staff=validated_token.get("staff", False),
+            is_active=True,
+        )
+        # ✅ the claim is a string → same type the DB would return
+        id_field = User._meta.get_field(api_settings.USER_ID_FIELD)
+        setattr(user, id_field.attname, id_field.to_python(user_id))
+        user._state.adding = False
+        user._from_token_claims = True
+
+        return user
@@ -0,0 +1,324 @@
+"""
+✅ Benchmark harness (used by `manage.py benchmark`).
+
+seed_benchmark_data() builds a synthetic dataset with bulk_create,
+route_cases() turns every route in app/urls.py into a concrete request and
+run_case() measures latency + query count through the Django test client.
+"""
+import math
+import re
+import statistics
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from .models import (
+    Certificate, Course, Enrollment, Lesson, Module, Profile,
+    Question, Quiz, QuizAttempt, Video, VideoProgress,
+)
+from .leaderboard import refresh_leaderboards
+from .progress import refresh_course_progress
+from .query_budget import record_queries
+from .stats import refresh_course_rollups
+from .tokens import EduMentorTokenObtainPairSerializer
+from . import urls as app_urls
+
+DEFAULT_SCALE = {
+    "courses": 20,
+    "modules": 5,
+    "lessons": 5,
+    "questions": 5,
+    "users": 200,
+    "enrollments": 3,
+}
+
+BENCHMARK_PASSWORD = "benchmark"
+
+
+# ==========================================================
+# ✅ SEEDING
+# ==========================================================
+def seed_benchmark_data(scale=None):
+    """
+    ✅ Synthetic dataset, every table filled with bulk_create.
+    Each student is enrolled in `enrollments` courses, has completed the
+    first half of their lessons and attempted every quiz of those courses.
+    Returns the ids route_cases() needs.
+    """
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+    password = make_password(BENCHMARK_PASSWORD)
+
+    admin = User.objects.create(username="bench_admin", password=password, is_staff=True)
+    Profile.objects.create(user=admin, role="ADMIN")
+
+    students = User.objects.bulk_create([
+        User(username=f"bench_student_{i}", password=password)
+        for i in range(scale["users"])
+    ])
+    Profile.objects.bulk_create([Profile(user=user, role="STUDENT") for user in students])
+
+    courses = Course.objects.bulk_create([
+        Course(
+            title=f"Course {i}",
+            description="Benchmark course",
+            category=("Programming", "Design", "Business")[i % 3],
+            is_premium=i % 4 == 0,
+            created_by=admin,
+        )
+        for i in range(scale["courses"])
+    ])
+
+    modules = Module.objects.bulk_create([
+        Module(course=course, title=f"Module {m}", order=m)
+        for course in courses
+        for m in range(scale["modules"])
+    ])
+
+    videos = Video.objects.bulk_create([
+        Video(
+            module=module,
+            title=f"Video {v}",
+            video_url="https://example.com/video.mp4",
+            duration=300,
+            order=v,
+        )
+        for module in modules
+        for v in range(scale["lessons"])
+    ])
+
+    Lesson.objects.bulk_create([
+        Lesson(module=video.module, title=f"Lesson {video.order}", order=video.order, video=video)
+        for video in videos
+    ])
+
+    quizzes = Quiz.objects.bulk_create([
+        Quiz(module=module, title=f"{module.title} quiz", total_marks=scale["questions"], pass_marks=1)
+        for module in modules
+    ])
+
+    Question.objects.bulk_create([
+        Question(
+            quiz=quiz,
+            question_text=f"Question {q}?",
+            option_a="A", option_b="B", option_c="C", option_d="D",
+            correct_option="A",
+        )
+        for quiz in quizzes
+        for q in range(scale["questions"])
+    ])
+
+    course_videos = {}
+    for video in videos:
+        course_videos.setdefault(video.module.course_id, []).append(video)
+
+    course_quizzes = {}
+    for quiz in quizzes:
+        course_quizzes.setdefault(quiz.module.course_id, []).append(quiz)
+
+    enrollments, progress, attempts = [], [], []
+    for i, student in enumerate(students):
+        for j in range(min(scale["enrollments"], len(courses))):
+            course = courses[(i + j) % len(courses)]
+            enrollments.append(Enrollment(user=student, course=course))
+
+            watched = course_videos.get(course.id, [])
+            for video in watched[:len(watched) // 2 + 1]:
+                progress.append(VideoProgress(
+                    user=student, video=video, course=course,
+                    watched_seconds=video.duration, is_completed=True,
+                ))
+
+            for quiz in course_quizzes.get(course.id, []):
+                attempts.append(QuizAttempt(
+                    user=student, quiz=quiz, course=course,
+                    score=(i + j) % (scale["questions"] + 1), passed=(i + j) % 3 != 0,
+                ))
+
+    Enrollment.objects.bulk_create(enrollments, batch_size=1000)
+    VideoProgress.objects.bulk_create(progress, batch_size=1000)
+    QuizAttempt.objects.bulk_create(attempts, batch_size=1000)
+
+    # ✅ bulk_create skips the signals that maintain the counters
+    for course in courses:
+        refresh_course_progress(course.id)
+    refresh_course_rollups()
+    refresh_leaderboards()
+
+    student = students[0]
+    course = courses[0]
+    module = next(m for m in modules if m.course_id == course.id)
+    quiz = next(q for q in quizzes if q.module_id == module.id)
+
+    certificate = Certificate.objects.create(
+        user=student, course=course, certificate_id=f"EDU-{course.id}-BENCHMARK"
+    )
+
+    return {
+        "admin": admin,
+        "student": student,
+        "course_id": course.id,
+        "module_id": module.id,
+        "video_id": Video.objects.filter(module=module).values_list("id", flat=True).first(),
+        "lesson_id": Lesson.objects.filter(module=module).values_list("id", flat=True).first(),
+        "quiz_id": quiz.id,
+        "question_id": Question.objects.filter(quiz=quiz).values_list("id", flat=True).first(),
+        "user_id": student.id,
+        "certificate_id": certificate.certificate_id,
+        "rows": {
+            "users": len(students) + 1,
+            "courses": len(courses),
+            "modules": len(modules),
+            "lessons": len(videos),
+            "enrollments": len(enrollments),
+            "video_progress": len(progress),
+            "quiz_attempts": len(attempts),
+        },
+    }
+
+
+# ==========================================================
+# ✅ ROUTES
+# ==========================================================
+PARAMETER = re.compile(r"<(?:\w+:)?(\w+)>")
+
+# ✅ write scenarios worth tracking (everything else is measured with GET)
+POST_CASES = {
+    "login/": lambda ids: {"username": ids["student"].username, "password": BENCHMARK_PASSWORD},
+    "video-progress/<int:video_id>/": lambda ids: {"watched_seconds": 120, "is_completed": False},
+    "video-progress/bulk/": lambda ids: {
+        "items": [{"video_id": ids["video_id"], "watched_seconds": 130}]
+    },
+    "modules/<int:module_id>/quiz/submit/": lambda ids: {
+        "answers": {str(ids["question_id"]): "A"}
+    },
+}
+
+
+def route_parameters(route, ids):
+    params = {
+        "course_id": ids["course_id"],
+        "module_id": ids["module_id"],
+        "video_id": ids["video_id"],
+        "lesson_id": ids["lesson_id"],
+        "quiz_id": ids["quiz_id"],
+        "question_id": ids["question_id"],
+        "certificate_id": ids["certificate_id"],
+    }
+    # ✅ "pk" is a user under admin/users/, a course under admin/courses/
+    params["pk"] = ids["user_id"] if route.startswith("admin/users/") else ids["course_id"]
+    return params
+
+
+def route_cases(ids):
+    """
+    ✅ [{"name", "method", "path", "role", "data"}] — one GET per route in
+    app/urls.py plus the POST_CASES; admin/ routes run as the admin
+    """
+    cases = []
+
+    for pattern in app_urls.urlpatterns:
+        route = str(pattern.pattern)
+        params = route_parameters(route, ids)
+        path = "/api/" + PARAMETER.sub(lambda m: str(params[m.group(1)]), route)
+        role = "admin" if route.startswith("admin") else "student"
+
+        cases.append({"name": f"GET {route}", "method": "get", "path": path, "role": role, "data": None})
+
+        if route in POST_CASES:
+            cases.append({
+                "name": f"POST {route}",
+                "method": "post",
+                "path": path,
+                "role": role,
+                "data": POST_CASES[route](ids),
+            })
+
+    return cases
+
+
+def benchmark_clients(ids):
+    clients = {}
+    for role in ("admin", "student"):
+        token = EduMentorTokenObtainPairSerializer.get_token(ids[role]).access_token
+        # ✅ a broken view is reported as a 500, not an aborted run
+        client = APIClient(raise_request_exception=False)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        clients[role] = client
+    return clients
+
+
+# ==========================================================
+# ✅ MEASURING
+# ==========================================================
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def run_case(client, case, iterations=20, warmup=2):
+    """
+    ✅ cold request (empty cache) + warmup + timed iterations
+    → status, query counts and latency percentiles in ms
+    """
+    def call():
+        return getattr(client, case["method"])(case["path"], case["data"], format="json")
+
+    cache.clear()
+    with record_queries() as cold:
+        response = call()
+
+    for _ in range(warmup):
+        call()
+
+    timings, queries = [], []
+    for _ in range(iterations):
+        with record_queries() as recorder:
+            started = time.perf_counter()
+            response = call()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(recorder))
+
+    return {
+        "name": case["name"],
+        "path": case["path"],
+        "role": case["role"],
+        "status": response.status_code,
+        "cold_queries": len(cold),
+        "queries": max(queries),
+        "latency_ms": {
+            "p50": round(percentile(timings, 50), 3),
+            "p90": round(percentile(timings, 90), 3),
+            "p95": round(percentile(timings, 95), 3),
+            "p99": round(percentile(timings, 99), 3),
+            "mean": round(statistics.fmean(timings), 3),
+            "max": round(max(timings), 3),
+        },
+    }
+
+
+def compare_results(baseline, current, latency_tolerance=0.25, min_delta_ms=1.0):
+    """
+    ✅ Regressions vs a previous run: more queries (N+1) or p50 slower by
+    more than latency_tolerance (fraction) AND min_delta_ms (timer noise).
+    Endpoints missing from either side are skipped.
+    """
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+
+    for result in current["results"]:
+        old = previous.get(result["name"])
+        if old is None:
+            continue
+
+        if result["queries"] > old["queries"]:
+            regressions.append(f"{result['name']}: queries {old['queries']} → {result['queries']}")
+
+        old_p50, new_p50 = old["latency_ms"]["p50"], result["latency_ms"]["p50"]
+        if new_p50 > old_p50 * (1 + latency_tolerance) and new_p50 - old_p50 > min_delta_ms:
+            regressions.append(f"{result['name']}: p50 {old_p50}ms → {new_p50}ms")
+
+    return regressions
@@ -0,0 +1,336 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .models import Module, Lesson, Quiz, Question, Enrollment
+from .serializers import ModuleSerializer, StudentQuestionSerializer
+
+
+# ==========================================================
+# ✅ SHARED vs PER-PROCESS CACHE
+# Invalidation only reaches the process that made the write when the
+# cache is local memory, so authorization / grading data must not trust
+# it for long there (see quiz_version, get_role, enrolled_courses)
+# ==========================================================
+PER_PROCESS_BACKENDS = ("LocMemCache", "DummyCache")
+
+
+def cache_is_shared():
+    """✅ True when every worker sees the same cache (Redis, Memcached, database...)"""
+    return settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1] not in PER_PROCESS_BACKENDS
+
+
+# ==========================================================
+# ✅ COURSE OUTLINE (course → modules → lessons → video IDs)
+# ==========================================================
+COURSE_OUTLINE_TTL = 60 * 60
+
+
+def course_outline_key(course_id):
+    return f"course_outline:{course_id}"
+
+
+def course_outline_modules(course_id):
+    """
+    ✅ Whole module/lesson tree in 2 queries:
+    modules (+ course id) and one prefetch for all their lessons
+    """
+    return Module.objects.filter(
+        course_id=course_id
+    ).order_by("order").prefetch_related(
+        Prefetch("lessons", queryset=Lesson.objects.order_by("order"))
+    )
+
+
+def build_course_outline(course_id):
+    return ModuleSerializer(course_outline_modules(course_id), many=True).data
+
+
+def get_course_outline(course_id):
+    key = course_outline_key(course_id)
+    outline = cache.get(key)
+
+    if outline is None:
+        outline = build_course_outline(course_id)
+        cache.set(key, outline, COURSE_OUTLINE_TTL)
+
+    return outline
+
+
+async def aget_course_outline(course_id):
+    """
+    ✅ get_course_outline() for async views; same key, same payload
+    """
+    key = course_outline_key(course_id)
+    outline = await cache.aget(key)
+
+    if outline is None:
+        modules = [module async for module in course_outline_modules(course_id)]
+        outline = ModuleSerializer(modules, many=True).data
+        await cache.aset(key, outline, COURSE_OUTLINE_TTL)
+
+    return outline
+
+
+def invalidate_course_outline(course_id):
+    cache.delete(course_outline_key(course_id))
+
+
+# ==========================================================
+# ✅ COURSE PROGRESS (per user + course, short TTL)
+# ==========================================================
+COURSE_PROGRESS_TTL = 30
+
+
+def course_progress_key(user_id, course_id):
+    return f"course_progress:{user_id}:{course_id}"
+
+
+def invalidate_course_progress(user_id, course_id):
+    cache.delete(course_progress_key(user_id, course_id))
+
+
+def invalidate_course_progress_many(pairs):
+    cache.delete_many([course_progress_key(user_id, course_id) for user_id, course_id in pairs])
+
+
+# ==========================================================
+# ✅ QUIZ (module → quiz lookup, versioned answer key)
+# ==========================================================
+QUIZ_CACHE_TTL = 60 * 60 * 24
+
+# ✅ seconds: module → quiz isn't versioned, and a per-process cache never
+# sees another worker delete or replace a module's quiz
+LOCAL_MODULE_QUIZ_TTL = 30
+
+
+def module_quiz_ttl():
+    return QUIZ_CACHE_TTL if cache_is_shared() else LOCAL_MODULE_QUIZ_TTL
+
+
+def quiz_version_key(quiz_id):
+    return f"quiz_version:{quiz_id}"
+
+
+def quiz_version(quiz_id):
+    """
+    ✅ Current content version of a quiz. A new version is a fresh
+    timestamp, so an evicted version can never resurrect stale entries.
+
+    With a per-process cache another worker's edit can't replace this
+    process's key, so the version is Quiz.updated_at instead (one
+    primary-key read per grading / quiz fetch).
+    """
+    if not cache_is_shared():
+        updated_at = Quiz.objects.filter(id=quiz_id).values_list("updated_at", flat=True).first()
+        return int(updated_at.timestamp() * 1_000_000) if updated_at else None
+
+    key = quiz_version_key(quiz_id)
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def invalidate_quiz(quiz_id):
+    cache.set(quiz_version_key(quiz_id), time.time_ns(), None)
+
+
+def module_quiz_key(module_id):
+    return f"module_quiz:{module_id}"
+
+
+def get_module_quiz(module_id):
+    """
+    ✅ {"quiz_id", "course_id"} for a module, or None if it has no quiz
+    """
+    key = module_quiz_key(module_id)
+    meta = cache.get(key)
+
+    if meta is None:
+        row = Quiz.objects.filter(module_id=module_id).values("id", "module__course_id").first()
+        if row is None:
+            return None
+
+        meta = {"quiz_id": row["id"], "course_id": row["module__course_id"]}
+        cache.set(key, meta, module_quiz_ttl())
+
+    return meta
+
+
+def invalidate_module_quiz(module_id):
+    cache.delete(module_quiz_key(module_id))
+
+
+def get_answer_key(quiz_id):
+    """
+    ✅ {"version", "pass_marks", "answers": {"<question_id>": "A"}}
+    Cached per quiz version, so grading is a dict comparison.
+    None if the quiz doesn't exist (anymore).
+    """
+    version = quiz_version(quiz_id)
+    key = f"answer_key:{quiz_id}:{version}"
+    answer_key = cache.get(key)
+
+    if answer_key is None:
+        pass_marks = Quiz.objects.filter(id=quiz_id).values_list("pass_marks", flat=True).first()
+        if pass_marks is None:
+            return None
+
+        answers = Question.objects.filter(quiz_id=quiz_id).values_list("id", "correct_option")
+
+        answer_key = {
+            "version": version,
+            "pass_marks": pass_marks,
+            "answers": {str(question_id): option.upper() for question_id, option in answers},
+        }
+        cache.set(key, answer_key, QUIZ_CACHE_TTL)
+
+    return answer_key
+
+
+def get_quiz_payload(quiz_id):
+    """
+    ✅ Student-facing quiz content (no correct options) + a content-hash
+    ETag, cached per quiz version. None if the quiz doesn't exist.
+    """
+    version = quiz_version(quiz_id)
+    key = f"quiz_payload:{quiz_id}:{version}"
+    payload = cache.get(key)
+
+    if payload is None:
+        quiz = Quiz.objects.filter(id=quiz_id).values(
+            "id", "title", "total_marks", "pass_marks", "module_id"
+        ).first()
+        if quiz is None:
+            return None
+
+        questions = StudentQuestionSerializer(
+            Question.objects.filter(quiz_id=quiz_id).order_by("id"),
+            many=True
+        ).data
+
+        payload = {
+            "quiz": quiz,
+            "questions": [dict(q) for q in questions],
+        }
+        payload["etag"] = hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()[:32]
+
+        cache.set(key, payload, QUIZ_CACHE_TTL)
+
+    return payload
+
+
+# ==========================================================
+# ✅ USER ROLE (Profile.role)
+# ==========================================================
+# ✅ minutes: only trusted with a shared cache, where role changes write
+# the new role (app.permissions.get_role)
+ROLE_CACHE_TTL = 60 * 5
+
+
+def user_role_key(user_id):
+    return f"user_role:{user_id}"
+
+
+def get_cached_role(user_id):
+    return cache.get(user_role_key(user_id))
+
+
+def set_cached_role(user_id, role):
+    cache.set(user_role_key(user_id), role, ROLE_CACHE_TTL)
+
+
+def invalidate_role(user_id):
+    cache.delete(user_role_key(user_id))
+
+
+# ==========================================================
+# ✅ ENROLLMENTS (per-user version, embedded in JWT claims)
+# ==========================================================
+def enrollment_version_key(user_id):
+    return f"enrollment_version:{user_id}"
+
+
+def enrollment_version(user_id):
+    """
+    ✅ Current version of a user's enrollments. Bumped on every
+    Enrollment write, so tokens carrying an older "enr_v" are ignored.
+    """
+    key = enrollment_version_key(user_id)
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def invalidate_enrollments(user_id):
+    cache.set(enrollment_version_key(user_id), time.time_ns(), None)
+
+
+ENROLLMENT_CACHE_TTL = 60 * 60
+
+# ✅ seconds: a per-process cache never sees another worker's version
+# bump, so a revoked enrollment is only dropped when its entry expires
+LOCAL_ENROLLMENT_CACHE_TTL = 30
+
+
+def enrollment_cache_ttl():
+    return ENROLLMENT_CACHE_TTL if cache_is_shared() else LOCAL_ENROLLMENT_CACHE_TTL
+
+
+def get_enrolled_course_ids(user_id):
+    """
+    ✅ frozenset of the user's ACTIVE course ids, cached per enrollment
+    version (any Enrollment write starts a new key)
+    """
+    key = f"enrolled_courses:{user_id}:{enrollment_version(user_id)}"
+    course_ids = cache.get(key)
+
+    if course_ids is None:
+        course_ids = frozenset(
+            Enrollment.objects.filter(
+                user_id=user_id,
+                is_active=True
+            ).values_list("course_id", flat=True)
+        )
+        cache.set(key, course_ids, enrollment_cache_ttl())
+
+    return course_ids
+
+
+def module_course_key(module_id):
+    return f"module_course:{module_id}"
+
+
+def get_module_course_id(module_id):
+    """
+    ✅ module → course id, or None if the module doesn't exist
+    """
+    key = module_course_key(module_id)
+    course_id = cache.get(key)
+
+    if course_id is None:
+        course_id = Module.objects.filter(id=module_id).values_list("course_id", flat=True).first()
+        if course_id is None:
+            return None
+
+        cache.set(key, course_id, enrollment_cache_ttl())
+
+    return course_id
+
+
+def invalidate_module_course(module_id):
+    cache.delete(module_course_key(module_id))
@@ -0,0 +1,216 @@
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.db.models import Count
+
+from .models import Certificate, Enrollment, QuizAttempt, VideoProgress
+from .progress import course_lessons
+from .stats import refresh_course_rollups
+from .pdf import pdf_path, render_and_store
+
+logger = logging.getLogger(__name__)
+
+
+def certificate_root():
+    return str(settings.CERTIFICATE_ROOT)
+
+
+def new_certificate_id(course_id):
+    return f"EDU-{course_id}-{uuid.uuid4().hex[:12].upper()}"
+
+
+def certificate_data(certificate):
+    """
+    ✅ Plain dict handed to the renderer (picklable, no model instances)
+    """
+    user = certificate.user
+
+    return {
+        "certificate_id": certificate.certificate_id,
+        "student": user.get_full_name() or user.username,
+        "course": certificate.course.title,
+        "issued_on": certificate.issued_at.strftime("%d %B %Y"),
+    }
+
+
+def certificate_file(certificate):
+    """
+    ✅ Path of the stored PDF, or None if it isn't rendered (or was removed)
+    """
+    if not certificate.pdf_sha256:
+        return None
+
+    path = pdf_path(certificate_root(), certificate.pdf_sha256)
+    return path if os.path.exists(path) else None
+
+
+def issue_certificate(user, course_id):
+    """
+    ✅ Idempotent: returns (certificate, created); a concurrent issue for the
+    same user + course loses on the unique constraint and reads the winner
+    """
+    certificate = Certificate.objects.filter(user=user, course_id=course_id).first()
+    if certificate is not None:
+        return certificate, False
+
+    try:
+        certificate = Certificate.objects.create(
+            user=user,
+            course_id=course_id,
+            certificate_id=new_certificate_id(course_id)
+        )
+        return certificate, True
+    except IntegrityError:
+        return Certificate.objects.get(user=user, course_id=course_id), False
+
+
+def eligible_user_ids(course_id):
+    """
+    ✅ Actively enrolled users meeting the course_progress certificate
+    criteria (every video lesson completed + a passed quiz), in 3 queries
+    """
+    total_lessons = course_lessons(course_id).count()
+    if total_lessons == 0:
+        return set()
+
+    completed = VideoProgress.objects.filter(
+        course_id=course_id,
+        is_completed=True
+    ).order_by().values("user_id").annotate(c=Count("id")).filter(c=total_lessons)
+
+    passed = QuizAttempt.objects.filter(
+        course_id=course_id,
+        passed=True
+    ).values_list("user_id", flat=True)
+
+    return set(
+        Enrollment.objects.filter(
+            course_id=course_id,
+            is_active=True,
+            user_id__in=completed.values("user_id"),
+        ).filter(
+            user_id__in=passed
+        ).values_list("user_id", flat=True)
+    )
+
+
+def bulk_issue(course_id, user_ids):
+    """
+    ✅ Certificate rows for every user that doesn't have one yet → count
+    (ignore_conflicts: a concurrent run / request issuing the same one wins)
+    """
+    certificates = Certificate.objects.filter(course_id=course_id, user_id__in=user_ids)
+    existing = set(certificates.values_list("user_id", flat=True))
+    missing = sorted(set(user_ids) - existing)
+
+    if not missing:
+        return 0
+
+    issued = [
+        Certificate(user_id=user_id, course_id=course_id, certificate_id=new_certificate_id(course_id))
+        for user_id in missing
+    ]
+    Certificate.objects.bulk_create(issued, ignore_conflicts=True, batch_size=500)
+
+    # ✅ bulk_create skips the signals, and with ignore_conflicts it returns
+    # every object, skipped or not: count the new ids that made it in
+    refresh_course_rollups([course_id])
+    return certificates.filter(
+        certificate_id__in=[certificate.certificate_id for certificate in issued]
+    ).count()
+
+
+# ==========================================================
+# ✅ BACKGROUND RENDERING (process pool, per web worker)
+# ==========================================================
+_pool = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def get_render_pool():
+    """
+    ✅ Created on first use. Children are spawned, not forked: this web
+    worker's threads (progress flush, executor callbacks) may hold locks
+    at fork time.
+    """
+    global _pool
+
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.CERTIFICATE_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    return _pool
+
+
+def discard_render_pool(pool):
+    """
+    ✅ A child killed by the OOM killer / a crash breaks the whole pool:
+    drop it so the next render starts a new one
+    """
+    global _pool
+
+    with _lock:
+        if _pool is pool:
+            _pool = None
+
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def save_rendered(certificate_id, sha256):
+    Certificate.objects.filter(id=certificate_id).update(pdf_sha256=sha256)
+
+
+def _render_done(certificate_id, future):
+    try:
+        save_rendered(certificate_id, future.result())
+    except Exception:
+        logger.exception("Certificate %s failed to render", certificate_id)
+    finally:
+        with _lock:
+            _pending.discard(certificate_id)
+        # ✅ runs on the executor's thread, which owns its own DB connection
+        close_old_connections()
+
+
+def request_render(certificate):
+    """
+    ✅ Queue the PDF for rendering unless it's already queued in this process.
+    CERTIFICATE_RENDER_WORKERS=0 renders inline (dev / tests).
+    """
+    data = certificate_data(certificate)
+
+    if not settings.CERTIFICATE_RENDER_WORKERS:
+        certificate.pdf_sha256 = render_and_store(certificate_root(), data)
+        save_rendered(certificate.id, certificate.pdf_sha256)
+        return
+
+    with _lock:
+        if certificate.id in _pending:
+            return
+        _pending.add(certificate.id)
+
+    try:
+        pool = get_render_pool()
+        try:
+            future = pool.submit(render_and_store, certificate_root(), data)
+        except BrokenProcessPool:
+            discard_render_pool(pool)
+            future = get_render_pool().submit(render_and_store, certificate_root(), data)
+    except Exception:
+        with _lock:
+            _pending.discard(certificate.id)
+        raise
+
+    future.add_done_callback(partial(_render_done, certificate.id))
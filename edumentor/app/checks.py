@@ -0,0 +1,89 @@
+import importlib.util
+
+from django.conf import settings
+from django.core.checks import Error, Info, Warning, register
+
+from .cache import cache_is_shared
+
+
+@register("database")
+def database_connection_settings(app_configs, **kwargs):
+    """
+    ✅ Reports the effective connection reuse settings of every database
+    (shown by `manage.py check`, runserver and migrate)
+    """
+    messages = []
+
+    for alias, db in settings.DATABASES.items():
+        engine = db.get("ENGINE", "")
+        pool = db.get("OPTIONS", {}).get("pool")
+        conn_max_age = db.get("CONN_MAX_AGE", 0)
+
+        if pool:
+            pool_options = pool if isinstance(pool, dict) else {}
+            summary = "psycopg pool (min_size={}, max_size={}, timeout={})".format(
+                pool_options.get("min_size", 4),
+                pool_options.get("max_size", "min_size"),
+                pool_options.get("timeout", 30),
+            )
+        elif conn_max_age is None:
+            summary = "persistent connections (unlimited)"
+        elif conn_max_age:
+            summary = f"persistent connections (CONN_MAX_AGE={conn_max_age}s)"
+        else:
+            summary = "new connection per request"
+
+        if "sqlite3" in engine:
+            options = db.get("OPTIONS", {})
+            pragmas = [
+                command.strip().removeprefix("PRAGMA ")
+                for command in options.get("init_command", "").split(";")
+                if command.strip()
+            ]
+            summary += ", transaction_mode={}, pragmas: {}".format(
+                options.get("transaction_mode", "DEFERRED"),
+                ", ".join(pragmas) or "defaults",
+            )
+
+        messages.append(Info(
+            f"Database '{alias}' ({engine.rsplit('.', 1)[-1]}): {summary}, "
+            f"health checks {'on' if db.get('CONN_HEALTH_CHECKS') else 'off'}",
+            id="app.I001",
+        ))
+
+        if pool and importlib.util.find_spec("psycopg_pool") is None:
+            messages.append(Error(
+                f"Database '{alias}' has a connection pool configured but psycopg_pool is not installed.",
+                hint="pip install -r requirements-pool.txt or unset DB_POOL.",
+                id="app.E001",
+            ))
+
+        if "postgresql" in engine and not pool and conn_max_age == 0:
+            messages.append(Warning(
+                f"Database '{alias}' opens a new PostgreSQL connection for every request.",
+                hint=(
+                    "Serving ASGI: persistent connections are off (CONN_MAX_AGE=0), "
+                    "set DB_POOL=1 to reuse connections."
+                    if settings.SERVING_ASGI else
+                    "Set DB_CONN_MAX_AGE > 0 or DB_POOL=1."
+                ),
+                id="app.W001",
+            ))
+
+    return messages
+
+
+@register("security")
+def stateless_reads_cache(app_configs, **kwargs):
+    """
+    ✅ JWT_STATELESS_READS trusts token claims that only a shared cache can
+    revoke; with a per-process cache the mode stays off
+    """
+    if settings.JWT_STATELESS_READS and not cache_is_shared():
+        return [Error(
+            "JWT_STATELESS_READS is set but the default cache is per-process; "
+            "stateless reads are disabled.",
+            hint="Set REDIS_URL (a cache shared by every worker) or unset JWT_STATELESS_READS.",
+            id="app.E002",
+        )]
+    return []
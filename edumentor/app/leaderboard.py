@@ -0,0 +1,153 @@
+"""
+✅ Per-course quiz leaderboards.
+
+LeaderboardEntry holds one row per (course, student) with their average
+quiz score, stored in ranking order by leaderboard_rank_idx: highest
+average first, then whoever got there first (scored_at: the latest
+QuizAttempt.scored_at, in every write path), then user id.
+submit_quiz updates the submitting student's row (record_quiz_score),
+ORM writes go through app.signals and refresh_leaderboards() rebuilds
+whole courses from QuizAttempt.
+
+A page is an index range scan and a rank is an indexed COUNT of the
+rows ahead, so neither touches QuizAttempt.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import LeaderboardEntry, QuizAttempt
+
+LEADERBOARD_ORDER = ("-avg_score", "scored_at", "user_id")
+
+LEADERBOARD_FIELDS = ("user_id", "user__username", "avg_score", "quizzes", "scored_at")
+
+
+# ==========================================================
+# ✅ WRITES
+# ==========================================================
+def record_quiz_score(user_id, course_id, create=True):
+    """
+    ✅ Recount one student's row from their attempts (2 queries) after
+    their results changed.
+    create=False only updates an existing row (post_delete: the user
+    may be on its way out in the same cascade).
+    """
+    totals = QuizAttempt.objects.filter(user_id=user_id, course_id=course_id).aggregate(
+        total=Coalesce(Sum("score"), 0),
+        quizzes=Count("pk"),
+        scored_at=Max("scored_at"),
+    )
+    entries = LeaderboardEntry.objects.filter(course_id=course_id, user_id=user_id)
+
+    if not totals["quizzes"]:
+        entries.delete()
+        return
+
+    values = {
+        "total_score": totals["total"],
+        "quizzes": totals["quizzes"],
+        "avg_score": totals["total"] / totals["quizzes"],
+        "scored_at": totals["scored_at"],
+    }
+
+    if not create:
+        entries.update(**values)
+        return
+
+    LeaderboardEntry.objects.bulk_create(
+        [LeaderboardEntry(course_id=course_id, user_id=user_id, **values)],
+        update_conflicts=True,
+        unique_fields=["course", "user"],
+        update_fields=list(values),
+    )
+
+
+def refresh_leaderboards(course_ids=None):
+    """
+    ✅ Rebuild the rows of these courses (None → all) from QuizAttempt,
+    same values as record_quiz_score. Returns the number of rows.
+    """
+    attempts = QuizAttempt.objects.all()
+    entries = LeaderboardEntry.objects.all()
+    if course_ids is not None:
+        attempts = attempts.filter(course_id__in=course_ids)
+        entries = entries.filter(course_id__in=course_ids)
+
+    fresh = [
+        LeaderboardEntry(
+            course_id=row["course_id"],
+            user_id=row["user_id"],
+            total_score=row["total"],
+            quizzes=row["quizzes"],
+            avg_score=row["total"] / row["quizzes"],
+            scored_at=row["scored_at"],
+        )
+        for row in attempts.values("course_id", "user_id").annotate(
+            total=Sum("score"),
+            quizzes=Count("pk"),
+            scored_at=Max("scored_at"),
+        ).order_by()
+    ]
+    keys = {(entry.course_id, entry.user_id) for entry in fresh}
+
+    with transaction.atomic():
+        entries.filter(pk__in=[
+            pk for pk, course_id, user_id in entries.values_list("pk", "course_id", "user_id")
+            if (course_id, user_id) not in keys
+        ]).delete()
+
+        LeaderboardEntry.objects.bulk_create(
+            fresh,
+            update_conflicts=True,
+            unique_fields=["course", "user"],
+            update_fields=["total_score", "quizzes", "avg_score", "scored_at"],
+            batch_size=1000,
+        )
+
+    return len(fresh)
+
+
+# ==========================================================
+# ✅ READS
+# ==========================================================
+def leaderboard(course_id):
+    """✅ LEADERBOARD_FIELDS dicts of a course, in rank order (sliceable)"""
+    return LeaderboardEntry.objects.filter(
+        course_id=course_id
+    ).order_by(*LEADERBOARD_ORDER).values(*LEADERBOARD_FIELDS)
+
+
+def leaderboard_row(entry, rank):
+    return {
+        "rank": rank,
+        "user_id": entry["user_id"],
+        "username": entry["user__username"],
+        "avg_score": round(entry["avg_score"], 2),
+        "quizzes": entry["quizzes"],
+        "scored_at": entry["scored_at"],
+    }
+
+
+def rank_of(course_id, entry):
+    """
+    ✅ 1 + rows ahead in LEADERBOARD_ORDER, in one COUNT.
+    Each branch of the UNION ALL is a range seek on leaderboard_rank_idx
+    (OR-ing them makes the planner walk the whole course instead).
+    """
+    avg_score, scored_at = entry["avg_score"], entry["scored_at"]
+    entries = LeaderboardEntry.objects.filter(course_id=course_id).values("pk")
+
+    higher = entries.filter(avg_score__gt=avg_score)
+    tied = entries.filter(avg_score=avg_score).filter(
+        Q(scored_at__lt=scored_at) | Q(scored_at=scored_at, user_id__lt=entry["user_id"])
+    )
+    return higher.union(tied, all=True).count() + 1
+
+
+def my_rank(course_id, user_id):
+    """✅ leaderboard_row of one student, None if they have no attempts"""
+    entry = leaderboard(course_id).filter(user_id=user_id).first()
+    if entry is None:
+        return None
+    return leaderboard_row(entry, rank_of(course_id, entry))
@@ -0,0 +1,105 @@
+import json
+import logging
+import platform
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from app.benchmark import (
+    DEFAULT_SCALE, benchmark_clients, compare_results, route_cases, run_case, seed_benchmark_data,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and measure latency percentiles and "
+        "query counts for every API route. Writes JSON (stdout or --output)."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_SCALE.items():
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=default,
+                help=f"Seed size: {name} (default {default})",
+            )
+        parser.add_argument("--iterations", type=int, default=20, help="Timed requests per endpoint")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per endpoint")
+        parser.add_argument("--only", help="Only endpoints whose name contains this text")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument(
+            "--compare",
+            help="Previous JSON report: fail if any endpoint needs more queries or got slower",
+        )
+        parser.add_argument(
+            "--latency-tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed p50 slowdown for --compare (fraction, default 0.25)",
+        )
+
+    def handle(self, *args, **options):
+        scale = {name: options[name] for name in DEFAULT_SCALE}
+
+        # ✅ never touch the configured database: seed a test copy
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        logging.disable(logging.CRITICAL)  # 4xx/5xx are reported in the results instead
+
+        try:
+            ids = seed_benchmark_data(scale)
+            clients = benchmark_clients(ids)
+
+            results = []
+            for case in route_cases(ids):
+                if options["only"] and options["only"] not in case["name"]:
+                    continue
+
+                results.append(run_case(
+                    clients[case["role"]],
+                    case,
+                    iterations=options["iterations"],
+                    warmup=options["warmup"],
+                ))
+                self.stderr.write(
+                    f"{results[-1]['status']} {results[-1]['queries']:>3}q "
+                    f"p50={results[-1]['latency_ms']['p50']}ms  {case['name']}"
+                )
+        finally:
+            logging.disable(logging.NOTSET)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "django": django.get_version(),
+                "python": platform.python_version(),
+                "database": connection.vendor,
+                "scale": scale,
+                "rows": ids["rows"],
+                "iterations": options["iterations"],
+            },
+            "results": results,
+        }
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+            self.stderr.write(self.style.SUCCESS(f"✅ {len(results)} endpoint(s) → {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                regressions = compare_results(json.load(f), report, options["latency_tolerance"])
+
+            if regressions:
+                raise CommandError("Regressions:\n  " + "\n  ".join(regressions))
+
+            self.stderr.write(self.style.SUCCESS("✅ No regressions"))
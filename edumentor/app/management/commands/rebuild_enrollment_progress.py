@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Enrollment
+from app.progress import refresh_course_progress
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized progress counters on every Enrollment"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            dest="courses",
+            help="Only rebuild this course (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        course_ids = options["courses"] or (
+            Enrollment.objects.order_by().values_list("course_id", flat=True).distinct()
+        )
+
+        count = 0
+        for course_id in course_ids:
+            refresh_course_progress(course_id)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt enrollment progress for {count} course(s)"))
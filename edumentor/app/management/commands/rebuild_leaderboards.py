@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from app.leaderboard import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-course quiz leaderboards from QuizAttempt"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            dest="courses",
+            help="Only rebuild this course (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        count = refresh_leaderboards(options["courses"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {count} leaderboard row(s)"))
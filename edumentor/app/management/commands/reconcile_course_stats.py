@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from app.models import CourseStatsRollup
+from app.stats import ROLLUP_COUNTERS, compute_course_rollups, save_course_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every CourseStatsRollup counter from the raw rows and "
+        "report the courses that had drifted (run periodically, e.g. from cron)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            dest="courses",
+            help="Only reconcile this course (can be repeated)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drift, don't write",
+        )
+
+    def handle(self, *args, **options):
+        stored = CourseStatsRollup.objects.all()
+        if options["courses"]:
+            stored = stored.filter(course_id__in=options["courses"])
+        stored = {rollup.course_id: rollup for rollup in stored}
+
+        drifted = 0
+        rollups = compute_course_rollups(options["courses"])
+
+        for rollup in rollups:
+            old = stored.get(rollup.course_id)
+            changes = [
+                f"{counter} {getattr(old, counter) if old else '-'} → {getattr(rollup, counter)}"
+                for counter in ROLLUP_COUNTERS
+                if old is None or getattr(old, counter) != getattr(rollup, counter)
+            ]
+            if changes:
+                drifted += 1
+                self.stdout.write(f"course {rollup.course_id}: " + ", ".join(changes))
+
+        if options["dry_run"]:
+            self.stdout.write(f"{drifted} of {len(rollups)} course(s) drifted (dry run, nothing written)")
+            return
+
+        save_course_rollups(rollups)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Reconciled {len(rollups)} course(s), {drifted} had drifted"
+        ))
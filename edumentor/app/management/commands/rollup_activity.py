@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from app.activity import roll_up_activity
+
+
+class Command(BaseCommand):
+    help = (
+        "Append hourly activity buckets for every hour closed since the last "
+        "run (run hourly, e.g. from cron; the first run covers all history)"
+    )
+
+    def handle(self, *args, **options):
+        written = roll_up_activity()
+        for metric, count in written.items():
+            self.stdout.write(f"{metric}: {count} bucket(s)")
+        self.stdout.write(self.style.SUCCESS(f"✅ Rolled up {sum(written.values())} bucket(s)"))
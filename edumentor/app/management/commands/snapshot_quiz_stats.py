@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.stats import take_quiz_stats_snapshot
+
+
+class Command(BaseCommand):
+    help = "Store today's per-course quiz attempt stats (run daily, e.g. from cron)"
+
+    def handle(self, *args, **options):
+        count = take_quiz_stats_snapshot(timezone.localdate())
+        self.stdout.write(self.style.SUCCESS(f"✅ Snapshot stored for {count} course(s)"))
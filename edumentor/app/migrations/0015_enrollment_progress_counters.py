@@ -0,0 +1,63 @@
+# Generated by Django 6.0 on 2026-10-18 19:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_progress_counters(apps, schema_editor):
+    Enrollment = apps.get_model('app', 'Enrollment')
+    Lesson = apps.get_model('app', 'Lesson')
+    VideoProgress = apps.get_model('app', 'VideoProgress')
+
+    for enrollment in Enrollment.objects.all():
+        lessons = Lesson.objects.filter(module__course_id=enrollment.course_id, video__isnull=False)
+        total = lessons.count()
+        completed = lessons.filter(
+            video__videoprogress__user_id=enrollment.user_id,
+            video__videoprogress__is_completed=True
+        ).count()
+
+        last = VideoProgress.objects.filter(
+            user_id=enrollment.user_id,
+            video__module__course_id=enrollment.course_id
+        ).order_by('-updated_at', '-id').first()
+
+        enrollment.total_lessons = total
+        enrollment.completed_lessons = completed
+        enrollment.progress = int(completed * 100 / total) if total else 0
+        enrollment.last_lesson = (
+            Lesson.objects.filter(video_id=last.video_id).order_by('order', 'id').first()
+            if last else None
+        )
+        enrollment.save(update_fields=['total_lessons', 'completed_lessons', 'progress', 'last_lesson'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_course_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='last_lesson',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.lesson'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='total_lessons',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_progress_counters, migrations.RunPython.noop),
+    ]
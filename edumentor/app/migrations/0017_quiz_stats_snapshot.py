@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 19:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_quiz_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizStatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField()),
+                ('total_attempts', models.PositiveIntegerField(default=0)),
+                ('passed', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_stats_snapshots', to='app.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-snapshot_date'], name='quizstats_snapshot_date_idx')],
+                'unique_together': {('course', 'snapshot_date')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-18 19:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_duplicate_certificates(apps, schema_editor):
+    """
+    ✅ Keep the earliest certificate of every (user, course) so the unique
+    constraint below can be added
+    """
+    Certificate = apps.get_model('app', 'Certificate')
+
+    kept = set()
+    duplicates = []
+    for pk, user_id, course_id in Certificate.objects.order_by(
+        'issued_at', 'id'
+    ).values_list('id', 'user_id', 'course_id').iterator():
+        if (user_id, course_id) in kept:
+            duplicates.append(pk)
+        else:
+            kept.add((user_id, course_id))
+
+    for start in range(0, len(duplicates), 500):
+        Certificate.objects.filter(id__in=duplicates[start:start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_quiz_stats_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='pdf_sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(drop_duplicate_certificates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='certificate',
+            unique_together={('user', 'course')},
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 6.0 on 2026-10-18 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_course_ids(apps, schema_editor):
+    Video = apps.get_model('app', 'Video')
+    Quiz = apps.get_model('app', 'Quiz')
+    VideoProgress = apps.get_model('app', 'VideoProgress')
+    QuizAttempt = apps.get_model('app', 'QuizAttempt')
+
+    VideoProgress.objects.update(course_id=Subquery(
+        Video.objects.filter(id=OuterRef('video_id')).values('module__course_id')[:1]
+    ))
+    QuizAttempt.objects.update(course_id=Subquery(
+        Quiz.objects.filter(id=OuterRef('quiz_id')).values('module__course_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_certificate_pdf'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoprogress',
+            name='course',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.course'),
+        ),
+        migrations.AddField(
+            model_name='quizattempt',
+            name='course',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.course'),
+        ),
+        migrations.RunPython(fill_course_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='videoprogress',
+            name='course',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.course'),
+        ),
+        migrations.AlterField(
+            model_name='quizattempt',
+            name='course',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.course'),
+        ),
+        migrations.AddIndex(
+            model_name='videoprogress',
+            index=models.Index(condition=models.Q(('is_completed', True)), fields=['user', 'course'], name='vprogress_user_course_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videoprogress',
+            index=models.Index(condition=models.Q(('is_completed', True)), fields=['course'], name='vprogress_course_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user'], name='enrollment_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['course'], name='enrollment_course_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['course', 'passed'], name='attempt_course_passed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(condition=models.Q(('passed', True)), fields=['user', 'course'], name='attempt_user_course_passed_idx'),
+        ),
+    ]
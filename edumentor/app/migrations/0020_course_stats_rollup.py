@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-18 19:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_rollups(apps, schema_editor):
+    Course = apps.get_model('app', 'Course')
+    Enrollment = apps.get_model('app', 'Enrollment')
+    VideoProgress = apps.get_model('app', 'VideoProgress')
+    QuizAttempt = apps.get_model('app', 'QuizAttempt')
+    Certificate = apps.get_model('app', 'Certificate')
+    CourseStatsRollup = apps.get_model('app', 'CourseStatsRollup')
+
+    def count(queryset):
+        return Coalesce(Subquery(
+            queryset.filter(course_id=OuterRef('pk'))
+            .order_by().values('course_id').annotate(c=Count('pk')).values('c')
+        ), 0)
+
+    rows = Course.objects.annotate(
+        n_enrollments=count(Enrollment.objects.all()),
+        n_active_enrollments=count(Enrollment.objects.filter(is_active=True)),
+        n_completed_videos=count(VideoProgress.objects.filter(is_completed=True)),
+        n_quiz_attempts=count(QuizAttempt.objects.all()),
+        n_quiz_passes=count(QuizAttempt.objects.filter(passed=True)),
+        n_certificates=count(Certificate.objects.all()),
+    ).values_list(
+        'id', 'n_enrollments', 'n_active_enrollments', 'n_completed_videos',
+        'n_quiz_attempts', 'n_quiz_passes', 'n_certificates',
+    )
+
+    CourseStatsRollup.objects.bulk_create(
+        [
+            CourseStatsRollup(
+                course_id=course_id,
+                enrollments=enrollments,
+                active_enrollments=active_enrollments,
+                completed_videos=completed_videos,
+                quiz_attempts=quiz_attempts,
+                quiz_passes=quiz_passes,
+                certificates=certificates,
+            )
+            for course_id, enrollments, active_enrollments, completed_videos,
+            quiz_attempts, quiz_passes, certificates in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_progress_attempt_course_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStatsRollup',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats_rollup', serialize=False, to='app.course')),
+                ('enrollments', models.PositiveIntegerField(default=0)),
+                ('active_enrollments', models.PositiveIntegerField(default=0)),
+                ('completed_videos', models.PositiveIntegerField(default=0)),
+                ('quiz_attempts', models.PositiveIntegerField(default=0)),
+                ('quiz_passes', models.PositiveIntegerField(default=0)),
+                ('certificates', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 6.0 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_course_stats_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('enrollments', 'Enrollments'), ('active_progress_rows', 'Active progress rows'), ('first_quiz_attempts', 'First quiz attempts'), ('certificates', 'Certificates')], max_length=20)),
+                ('hour', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ActivityWatermark',
+            fields=[
+                ('metric', models.CharField(choices=[('enrollments', 'Enrollments'), ('active_progress_rows', 'Active progress rows'), ('first_quiz_attempts', 'First quiz attempts'), ('certificates', 'Certificates')], max_length=20, primary_key=True, serialize=False)),
+                ('rolled_up_to', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['issued_at'], name='certificate_issued_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['enrolled_at'], name='enrollment_enrolled_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['attempted_at'], name='attempt_attempted_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videoprogress',
+            index=models.Index(fields=['updated_at'], name='vprogress_updated_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='activitybucket',
+            name='course',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_buckets', to='app.course'),
+        ),
+        migrations.AddIndex(
+            model_name='activitybucket',
+            index=models.Index(fields=['metric', 'hour'], name='activity_metric_hour_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='activitybucket',
+            unique_together={('course', 'metric', 'hour')},
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 6.0 on 2026-10-18 19:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Sum
+
+
+def fill_leaderboards(apps, schema_editor):
+    """
+    ✅ Existing attempts were scored when they were made; the rows rank
+    ties by the latest of them, like app.leaderboard does
+    """
+    QuizAttempt = apps.get_model('app', 'QuizAttempt')
+    LeaderboardEntry = apps.get_model('app', 'LeaderboardEntry')
+
+    QuizAttempt.objects.update(scored_at=F('attempted_at'))
+
+    rows = QuizAttempt.objects.values('course_id', 'user_id').annotate(
+        total=Sum('score'),
+        quizzes=Count('pk'),
+        scored_at=Max('scored_at'),
+    ).order_by()
+
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(
+                course_id=row['course_id'],
+                user_id=row['user_id'],
+                total_score=row['total'],
+                quizzes=row['quizzes'],
+                avg_score=row['total'] / row['quizzes'],
+                scored_at=row['scored_at'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_activity_buckets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='scored_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_score', models.PositiveIntegerField(default=0)),
+                ('quizzes', models.PositiveIntegerField(default=0)),
+                ('avg_score', models.FloatField(default=0)),
+                ('scored_at', models.DateTimeField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='app.course')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', '-avg_score', 'scored_at', 'user'], name='leaderboard_rank_idx')],
+                'unique_together': {('course', 'user')},
+            },
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
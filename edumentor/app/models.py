@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # Create your models here.
 class Profile(models.Model):
@@ -28,6 +29,13 @@ class Course(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     thumbnail = models.URLField(blank=True, null=True) 
 
+    class Meta:
+        indexes = [
+            # ✅ catalog filters + keyset pagination
+            models.Index(fields=['category', 'is_premium'], name='course_category_premium_idx'),
+            models.Index(fields=['-created_at', '-id'], name='course_created_at_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -69,8 +77,33 @@ class VideoProgress(models.Model):
     is_completed = models.BooleanField(default=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # ✅ denormalized video.module.course (set on write, see app.signals)
+    # so course-scoped progress queries don't join video → module
+    course = models.ForeignKey(
+        'Course',
+        on_delete=models.CASCADE,
+        editable=False,
+        related_name='+'
+    )
+
     class Meta:
         unique_together = ('user', 'video')
+        indexes = [
+            # course_progress / eligibility: completed videos of a user in a course
+            models.Index(
+                fields=['user', 'course'],
+                condition=models.Q(is_completed=True),
+                name='vprogress_user_course_done_idx'
+            ),
+            # course_stats: completed videos in a course
+            models.Index(
+                fields=['course'],
+                condition=models.Q(is_completed=True),
+                name='vprogress_course_done_idx'
+            ),
+            # activity rollup: rows updated in an hour range
+            models.Index(fields=['updated_at'], name='vprogress_updated_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.video.title}"
@@ -82,8 +115,36 @@ class Enrollment(models.Model):
     enrolled_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
 
+    # ✅ denormalized progress, maintained by app.progress (see rebuild_enrollment_progress)
+    completed_lessons = models.PositiveIntegerField(default=0)
+    total_lessons = models.PositiveIntegerField(default=0)
+    progress = models.PositiveSmallIntegerField(default=0)
+    last_lesson = models.ForeignKey(
+        'Lesson',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+'
+    )
+
     class Meta:
         unique_together = ('user', 'course')
+        indexes = [
+            # my_enrollments / membership cache
+            models.Index(
+                fields=['user'],
+                condition=models.Q(is_active=True),
+                name='enrollment_user_active_idx'
+            ),
+            # course analytics: active enrollments of a course
+            models.Index(
+                fields=['course'],
+                condition=models.Q(is_active=True),
+                name='enrollment_course_active_idx'
+            ),
+            # activity rollup: rows created in an hour range
+            models.Index(fields=['enrolled_at'], name='enrollment_enrolled_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} enrolled in {self.course.title}"
@@ -97,6 +158,9 @@ class Quiz(models.Model):
     title = models.CharField(max_length=200)
     total_marks = models.PositiveIntegerField(default=5)
     pass_marks = models.PositiveIntegerField(default=5)
+    # ✅ content version for per-process answer-key caches (question
+    # writes touch it too, see app.signals / app.cache.quiz_version)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.module.title} - Quiz"
@@ -128,15 +192,49 @@ class QuizAttempt(models.Model):
     score = models.PositiveIntegerField()
     passed = models.BooleanField(default=False)
     attempted_at = models.DateTimeField(auto_now_add=True)
+    # ✅ when the current score was set (first attempt, then every change;
+    # see submit_quiz / app.signals), the leaderboard's tie-breaker
+    scored_at = models.DateTimeField(default=timezone.now)
+
+    # ✅ denormalized quiz.module.course (set on write, see app.signals)
+    # (no single-column index: attempt_course_passed_idx starts with it)
+    course = models.ForeignKey(
+        'Course',
+        on_delete=models.CASCADE,
+        editable=False,
+        db_index=False,
+        related_name='+'
+    )
 
     class Meta:
         unique_together = ('user', 'quiz')
+        indexes = [
+            # course_pass_fail_stats / quiz stats: attempts of a course by outcome
+            models.Index(fields=['course', 'passed'], name='attempt_course_passed_idx'),
+            # course_progress quiz_passed: EXISTS passed attempt of a user in a course
+            models.Index(
+                fields=['user', 'course'],
+                condition=models.Q(passed=True),
+                name='attempt_user_course_passed_idx'
+            ),
+            # activity rollup: rows created in an hour range
+            models.Index(fields=['attempted_at'], name='attempt_attempted_at_idx'),
+        ]
 
 class Certificate(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     issued_at = models.DateTimeField(auto_now_add=True)
     certificate_id = models.CharField(max_length=100, unique=True)
+    # ✅ sha256 of the rendered PDF (file name on disk), empty until rendered
+    pdf_sha256 = models.CharField(max_length=64, blank=True, default="")
+
+    class Meta:
+        unique_together = ("user", "course")
+        indexes = [
+            # activity rollup: rows created in an hour range
+            models.Index(fields=['issued_at'], name='certificate_issued_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.course.title}"
@@ -157,4 +255,125 @@ class Lesson(models.Model):
         return self.title
 
 
+class QuizStatsSnapshot(models.Model):
+    """
+    ✅ Daily per-course quiz stats (written by `manage.py snapshot_quiz_stats`)
+    so the admin stats page doesn't scan QuizAttempt
+    """
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='quiz_stats_snapshots'
+    )
+    snapshot_date = models.DateField()
+    total_attempts = models.PositiveIntegerField(default=0)
+    passed = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('course', 'snapshot_date')
+        indexes = [
+            models.Index(fields=['-snapshot_date'], name='quizstats_snapshot_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.course.title} - {self.snapshot_date}"
+
+
+class CourseStatsRollup(models.Model):
+    """
+    ✅ Per-course counters for the analytics endpoints, kept up to date
+    incrementally (app.signals + app.stats hooks for bulk writes) and
+    recomputed by `manage.py reconcile_course_stats`
+    """
+    course = models.OneToOneField(
+        Course,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats_rollup'
+    )
+    enrollments = models.PositiveIntegerField(default=0)
+    active_enrollments = models.PositiveIntegerField(default=0)
+    completed_videos = models.PositiveIntegerField(default=0)
+    quiz_attempts = models.PositiveIntegerField(default=0)
+    quiz_passes = models.PositiveIntegerField(default=0)
+    certificates = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.course.title} stats"
+
+
+class ActivityBucket(models.Model):
+    """
+    ✅ Hourly per-course activity counts, append-only (one row per closed
+    hour, written by `manage.py rollup_activity`, see app.activity)
+    """
+    METRICS = [
+        ('enrollments', 'Enrollments'),
+        ('active_progress_rows', 'Active progress rows'),
+        ('first_quiz_attempts', 'First quiz attempts'),
+        ('certificates', 'Certificates'),
+    ]
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='activity_buckets'
+    )
+    metric = models.CharField(max_length=20, choices=METRICS)
+    hour = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('course', 'metric', 'hour')
+        indexes = [
+            # activity history across all courses: metric + time range
+            models.Index(fields=['metric', 'hour'], name='activity_metric_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.course.title} - {self.metric} @ {self.hour}"
 
+
+class ActivityWatermark(models.Model):
+    """
+    ✅ Per metric: every hour before `rolled_up_to` is in ActivityBucket
+    """
+    metric = models.CharField(max_length=20, primary_key=True, choices=ActivityBucket.METRICS)
+    rolled_up_to = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.metric} until {self.rolled_up_to}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    ✅ Per-course quiz leaderboard row, one per student, kept sorted by
+    leaderboard_rank_idx (maintained by submit_quiz / app.signals, rebuilt
+    by `manage.py rebuild_leaderboards`, see app.leaderboard)
+    """
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='leaderboard'
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    total_score = models.PositiveIntegerField(default=0)
+    quizzes = models.PositiveIntegerField(default=0)
+    avg_score = models.FloatField(default=0)
+    # ✅ latest QuizAttempt.scored_at of the student in the course:
+    # earlier wins a tie
+    scored_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('course', 'user')
+        indexes = [
+            # leaderboard pages + rank lookups, in ranking order
+            models.Index(
+                fields=['course', '-avg_score', 'scored_at', 'user'],
+                name='leaderboard_rank_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.course.title} - {self.user.username}: {self.avg_score}"
@@ -0,0 +1,32 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CourseCursorPagination(CursorPagination):
+    """
+    ✅ Keyset pagination for the course catalog.
+    Pages are addressed by an opaque cursor on -id (default) or -created_at,
+    so deep pages cost the same as the first one (no OFFSET scans).
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-id"
+
+    ORDERING_OPTIONS = {
+        "-id": ("-id",),
+        "-created_at": ("-created_at", "-id"),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get("ordering", self.ordering)
+        return self.ORDERING_OPTIONS.get(ordering, (self.ordering,))
+
+
+class LeaderboardPagination(PageNumberPagination):
+    """
+    ✅ Numbered pages for leaderboards: ranks follow from the page number
+    (page_size = top N, up to max_page_size per page)
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
@@ -0,0 +1,100 @@
+"""
+✅ Certificate PDF rendering + content-addressed storage.
+
+No Django imports here: these functions run inside the render process
+pool (see app/certificates.py) and the issue_certificates command.
+"""
+import hashlib
+import io
+import os
+import tempfile
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.colors import black, HexColor
+from reportlab.lib.units import inch
+
+
+def render_certificate_pdf(data):
+    """
+    ✅ data = {"certificate_id", "student", "course", "issued_on"} → PDF bytes
+    invariant=1 makes the output byte-identical for the same data
+    """
+    buffer = io.BytesIO()
+    width, height = landscape(A4)
+
+    pdf = canvas.Canvas(buffer, pagesize=(width, height), invariant=1)
+    pdf.setTitle(f"Certificate {data['certificate_id']}")
+
+    # border
+    pdf.setStrokeColor(HexColor("#4f46e5"))
+    pdf.setLineWidth(6)
+    pdf.rect(0.5 * inch, 0.5 * inch, width - inch, height - inch)
+
+    pdf.setFillColor(HexColor("#4f46e5"))
+    pdf.setFont("Helvetica-Bold", 36)
+    pdf.drawCentredString(width / 2, height - 1.8 * inch, "Certificate of Completion")
+
+    pdf.setFillColor(black)
+    pdf.setFont("Helvetica", 16)
+    pdf.drawCentredString(width / 2, height - 2.7 * inch, "This certifies that")
+
+    pdf.setFont("Helvetica-Bold", 28)
+    pdf.drawCentredString(width / 2, height - 3.4 * inch, data["student"])
+
+    pdf.setFont("Helvetica", 16)
+    pdf.drawCentredString(width / 2, height - 4.1 * inch, "has successfully completed the course")
+
+    pdf.setFont("Helvetica-Bold", 22)
+    pdf.drawCentredString(width / 2, height - 4.8 * inch, data["course"])
+
+    pdf.setFont("Helvetica", 12)
+    pdf.drawString(1 * inch, 1 * inch, f"Issued on {data['issued_on']}")
+    pdf.drawRightString(width - 1 * inch, 1 * inch, f"Certificate ID: {data['certificate_id']}")
+
+    pdf.showPage()
+    pdf.save()
+
+    return buffer.getvalue()
+
+
+def pdf_path(root, sha256):
+    return os.path.join(root, sha256[:2], f"{sha256}.pdf")
+
+
+def store_pdf(root, content):
+    """
+    ✅ Write PDF bytes under <root>/<sha[:2]>/<sha>.pdf (atomic rename,
+    skipped when the same content is already stored) → sha256
+    """
+    sha256 = hashlib.sha256(content).hexdigest()
+    path = pdf_path(root, sha256)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    return sha256
+
+
+def render_and_store(root, data):
+    """
+    ✅ Process-pool entry point: render + store → sha256
+    """
+    return store_pdf(root, render_certificate_pdf(data))
+
+
+def render_job(job):
+    """
+    ✅ multiprocessing.Pool entry point: (id, root, data) → (id, sha256)
+    """
+    certificate_id, root, data = job
+    return certificate_id, render_and_store(root, data)
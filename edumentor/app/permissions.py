@@ -1,14 +1,93 @@
 # app/permissions.py
-from rest_framework.permissions import BasePermission
-from .models import Enrollment
-from .models import Enrollment, Module
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+from .authentication import stateless_reads_enabled
+from .models import Profile
+from .cache import cache_is_shared, get_cached_role, set_cached_role, enrollment_version
+from .cache import get_enrolled_course_ids, get_module_course_id
+
+
+def get_role(request):
+    """
+    ✅ The user's Profile.role, resolved ONCE per request and shared by
+    every permission check and view:
+      1. memo on the request
+      2. role cache (role changes write the new role here), only when
+         the cache is shared: a per-process cache never sees a demotion
+         handled by another worker
+      3. "role" claim of the JWT, for reads with JWT_STATELESS_READS only
+      4. Profile query (then cached)
+    Returns None for anonymous users / users without a profile.
+    """
+    if hasattr(request, "_cached_role"):
+        return request._cached_role
+
+    user = request.user
+    role = None
+
+    if user and user.is_authenticated:
+        if cache_is_shared():
+            role = get_cached_role(user.id)
+
+        if role is None and request.method in SAFE_METHODS and stateless_reads_enabled():
+            claims = getattr(request, "auth", None)
+            role = claims.get("role") if hasattr(claims, "get") else None
+
+        if role is None:
+            role = Profile.objects.filter(user_id=user.id).values_list("role", flat=True).first()
+            if role is not None:
+                set_cached_role(user.id, role)
+
+    request._cached_role = role
+    return role
+
+
+def token_enrollments(request):
+    """
+    ✅ Active course ids from the "enr" JWT claim, or None when the token
+    has no claim or its "enr_v" is older than the user's enrollments.
+    Only a shared cache holds a version every worker bumps, so with a
+    per-process cache the claim is never trusted.
+    """
+    if hasattr(request, "_token_enrollments"):
+        return request._token_enrollments
+
+    claims = getattr(request, "auth", None)
+    enrolled = None
+
+    if hasattr(claims, "get") and "enr" in claims and cache_is_shared():
+        if claims.get("enr_v") == enrollment_version(request.user.id):
+            enrolled = set(claims["enr"])
+
+    request._token_enrollments = enrolled
+    return enrolled
+
+
+def enrolled_courses(request):
+    """
+    ✅ The user's active course ids: JWT claims when current, otherwise
+    the enrollment cache (one query per enrollment change, or per
+    LOCAL_ENROLLMENT_CACHE_TTL with a per-process cache)
+    """
+    if hasattr(request, "_enrolled_courses"):
+        return request._enrolled_courses
+
+    enrolled = token_enrollments(request)
+    if enrolled is None:
+        enrolled = get_enrolled_course_ids(request.user.id)
+
+    request._enrolled_courses = enrolled
+    return enrolled
+
+
+def is_enrolled(request, course_id):
+    return course_id in enrolled_courses(request)
 
 
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
         return (
             request.user.is_authenticated and
-            request.user.profile.role == 'ADMIN'
+            get_role(request) == 'ADMIN'
         )
 
 
@@ -16,7 +95,7 @@ class IsStudent(BasePermission):
     def has_permission(self, request, view):
         return (
             request.user.is_authenticated and
-            request.user.profile.role == 'STUDENT'
+            get_role(request) == 'STUDENT'
         )
 
 
@@ -27,11 +106,7 @@ class IsEnrolledStudent(BasePermission):
         if not course_id:
             return False
 
-        return Enrollment.objects.filter(
-            user=request.user,
-            course_id=course_id,
-            is_active=True
-        ).exists()
+        return is_enrolled(request, course_id)
 
 class IsEnrolledViaModule(BasePermission):
     def has_permission(self, request, view):
@@ -41,19 +116,14 @@ class IsEnrolledViaModule(BasePermission):
             return False
 
         # ✅ ADMIN BYPASS (CRITICAL)
-        if request.user.profile.role == 'ADMIN':
+        if get_role(request) == 'ADMIN':
             return True
 
-        try:
-            module = Module.objects.get(id=module_id)
-        except Module.DoesNotExist:
+        course_id = get_module_course_id(module_id)
+        if course_id is None:
             return False
 
-        return Enrollment.objects.filter(
-            user=request.user,
-            course=module.course,
-            is_active=True
-        ).exists()
+        return is_enrolled(request, course_id)
 
 class IsAdminUser(BasePermission):
     def has_permission(self, request, view):
@@ -62,8 +132,4 @@ class IsAdminUser(BasePermission):
             return False
 
         # ✅ profile may not exist → avoid crashing
-        profile = getattr(request.user, "profile", None)
-        if not profile:
-            return False
-
-        return profile.role == "ADMIN"
\ No newline at end of file
+        return get_role(request) == "ADMIN"
@@ -0,0 +1,567 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import BigIntegerField, Case, Count, Exists, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .cache import COURSE_PROGRESS_TTL, course_progress_key, invalidate_course_progress_many
+from .models import Course, Enrollment, Lesson, QuizAttempt, Video, VideoProgress
+from .stats import bump_course_rollups
+
+logger = logging.getLogger(__name__)
+
+
+def parse_progress(data):
+    """
+    ✅ Normalise a progress payload to (watched_seconds, is_completed)
+    Raises ValueError for non-numeric / negative watched_seconds
+    """
+    watched_seconds = int(data.get("watched_seconds") or 0)
+    if watched_seconds < 0:
+        raise ValueError("watched_seconds must be >= 0")
+
+    is_completed = data.get("is_completed", False)
+    if isinstance(is_completed, str):
+        is_completed = is_completed.lower() in ("1", "true", "yes")
+
+    return watched_seconds, bool(is_completed)
+
+
+def upsert_progress(records, video_courses=None):
+    """
+    ✅ Write many progress records in ONE transaction:
+    records = {(user_id, video_id): (watched_seconds, is_completed)}
+    video_courses: {video_id: course_id} if the caller already has it
+
+    Existing rows are read once so watched_seconds never goes backwards
+    and is_completed stays True once set. Returns the merged records.
+    """
+    if not records:
+        return {}
+
+    # ✅ video → course (for the denormalized VideoProgress.course and the
+    # enrollment counters); records for unknown videos are dropped
+    if video_courses is None:
+        video_courses = dict(
+            Video.objects.filter(
+                id__in={video_id for _, video_id in records}
+            ).values_list("id", "module__course_id")
+        )
+    records = {key: value for key, value in records.items() if key[1] in video_courses}
+
+    if not records:
+        return {}
+
+    user_ids = {user_id for user_id, _ in records}
+    video_ids = {video_id for _, video_id in records}
+
+    with transaction.atomic():
+        existing = {
+            (row["user_id"], row["video_id"]): (row["watched_seconds"], row["is_completed"])
+            for row in VideoProgress.objects.filter(
+                user_id__in=user_ids,
+                video_id__in=video_ids
+            ).values("user_id", "video_id", "watched_seconds", "is_completed")
+        }
+
+        merged = {}
+        for key, (watched_seconds, is_completed) in records.items():
+            old_seconds, old_completed = existing.get(key, (0, False))
+            merged[key] = (max(old_seconds, watched_seconds), old_completed or is_completed)
+
+        VideoProgress.objects.bulk_create(
+            [
+                VideoProgress(
+                    user_id=user_id,
+                    video_id=video_id,
+                    course_id=video_courses[video_id],
+                    watched_seconds=watched_seconds,
+                    is_completed=is_completed,
+                )
+                for (user_id, video_id), (watched_seconds, is_completed) in merged.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "video"],
+            update_fields=["watched_seconds", "is_completed", "updated_at"],
+        )
+
+        # ✅ bulk_create skips signals → maintain enrollment counters here
+        newly_completed = {
+            key for key, (_, is_completed) in merged.items()
+            if is_completed and not existing.get(key, (0, False))[1]
+        }
+        sync_enrollment_progress(merged.keys(), newly_completed, video_courses)
+
+    return merged
+
+
+def drop_orphan_records(records):
+    """
+    ✅ The records whose user and video still exist (both may be deleted
+    while their heartbeats wait in the buffer)
+    """
+    user_ids = set(User.objects.filter(
+        id__in={user_id for user_id, _ in records}
+    ).values_list("id", flat=True))
+    video_ids = set(Video.objects.filter(
+        id__in={video_id for _, video_id in records}
+    ).values_list("id", flat=True))
+
+    return {
+        key: value for key, value in records.items()
+        if key[0] in user_ids and key[1] in video_ids
+    }
+
+
+# ==========================================================
+# ✅ DENORMALIZED ENROLLMENT PROGRESS
+# (Enrollment.completed_lessons / total_lessons / progress / last_lesson)
+# ==========================================================
+def course_lessons(course_id):
+    """
+    ✅ Lessons that count towards progress: the ones with a video
+    """
+    return Lesson.objects.filter(module__course_id=course_id, video__isnull=False)
+
+
+def percent_expression(completed):
+    return Case(
+        When(total_lessons=0, then=Value(0)),
+        default=completed * 100 / F("total_lessons"),
+    )
+
+
+def refresh_enrollment_progress(user_id, course_id, with_total=False):
+    """
+    ✅ Recount one enrollment (run when a video is completed / uncompleted)
+    """
+    completed = course_lessons(course_id).filter(
+        video__videoprogress__user_id=user_id,
+        video__videoprogress__is_completed=True
+    ).count()
+
+    enrollments = Enrollment.objects.filter(user_id=user_id, course_id=course_id)
+
+    if with_total:
+        enrollments.update(total_lessons=course_lessons(course_id).count())
+
+    enrollments.update(
+        completed_lessons=completed,
+        progress=percent_expression(Value(completed)),
+    )
+
+
+def refresh_enrollments_progress(pairs):
+    """
+    ✅ refresh_enrollment_progress() for many (user_id, course_id) pairs
+    with 2 UPDATE statements, whatever the number of courses
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return
+
+    completed = Lesson.objects.filter(
+        module__course_id=OuterRef("course_id"),
+        video__isnull=False,
+        video__videoprogress__user_id=OuterRef("user_id"),
+        video__videoprogress__is_completed=True
+    ).order_by().values("module__course_id").annotate(c=Count("id")).values("c")
+
+    enrollments = Enrollment.objects.filter(pair_filter(pairs))
+    enrollments.update(completed_lessons=Coalesce(Subquery(completed), 0))
+    enrollments.update(progress=percent_expression(F("completed_lessons")))
+
+
+def pair_filter(pairs):
+    """✅ Q matching the enrollments of these (user_id, course_id) pairs"""
+    condition = Q(pk__in=[])
+    for user_id, course_id in pairs:
+        condition |= Q(user_id=user_id, course_id=course_id)
+    return condition
+
+
+def refresh_course_progress(course_id):
+    """
+    ✅ Recount every enrollment of a course with 3 UPDATE statements
+    (run when the course's lesson set changes, and by the rebuild command)
+    """
+    completed = course_lessons(course_id).filter(
+        video__videoprogress__user_id=OuterRef("user_id"),
+        video__videoprogress__is_completed=True
+    ).order_by().values("module__course_id").annotate(c=Count("id")).values("c")
+
+    last_video = VideoProgress.objects.filter(
+        user_id=OuterRef(OuterRef("user_id")),
+        course_id=course_id
+    ).order_by("-updated_at", "-id").values("video_id")[:1]
+
+    last_lesson = Lesson.objects.filter(
+        video_id=Subquery(last_video)
+    ).order_by("order", "id").values("id")[:1]
+
+    enrollments = Enrollment.objects.filter(course_id=course_id)
+
+    enrollments.update(
+        total_lessons=course_lessons(course_id).count(),
+        completed_lessons=Coalesce(Subquery(completed), 0),
+        last_lesson=Subquery(last_lesson),
+    )
+    enrollments.update(progress=percent_expression(F("completed_lessons")))
+
+
+def update_last_lesson(user_id, video_id):
+    """
+    ✅ Point the enrollment's "continue" lesson at this video's lesson
+    (single UPDATE, skipped when it already points there)
+    """
+    lesson = Lesson.objects.filter(video_id=video_id).order_by("order", "id").values("id")[:1]
+
+    Enrollment.objects.filter(
+        user_id=user_id,
+        course__modules__videos__id=video_id
+    ).exclude(
+        last_lesson__video_id=video_id
+    ).update(last_lesson=Subquery(lesson))
+
+
+def update_last_lessons(last_video):
+    """
+    ✅ update_last_lesson() for many enrollments:
+    last_video = {(user_id, course_id): video_id}
+    One lesson lookup + one UPDATE (skipping rows already pointing there)
+    """
+    if not last_video:
+        return
+
+    lessons = {}
+    for video_id, lesson_id in Lesson.objects.filter(
+        video_id__in=set(last_video.values())
+    ).order_by("video_id", "order", "id").values_list("video_id", "id"):
+        lessons.setdefault(video_id, lesson_id)
+
+    targets = {pair: lessons.get(video_id) for pair, video_id in last_video.items()}
+
+    stale = Q(pk__in=[])
+    for (user_id, course_id), lesson_id in targets.items():
+        stale |= Q(user_id=user_id, course_id=course_id) & ~Q(last_lesson_id=lesson_id)
+
+    Enrollment.objects.filter(stale).update(last_lesson=Case(
+        *[
+            When(user_id=user_id, course_id=course_id, then=Value(lesson_id))
+            for (user_id, course_id), lesson_id in targets.items()
+        ],
+        default=F("last_lesson"),
+        output_field=BigIntegerField(),
+    ))
+
+
+def sync_enrollment_progress(keys, newly_completed=(), video_courses=None):
+    """
+    ✅ Counter maintenance for batched writes (buffer flush / bulk sync)
+    keys: (user_id, video_id) pairs that were written
+    video_courses: {video_id: course_id} if the caller already has it
+    Constant number of statements, however many users / courses the
+    batch spans.
+    """
+    keys = list(keys)
+    if video_courses is None:
+        video_courses = dict(
+            Video.objects.filter(
+                id__in={video_id for _, video_id in keys}
+            ).values_list("id", "module__course_id")
+        )
+
+    last_video = {}
+    for user_id, video_id in keys:
+        if video_id in video_courses:
+            last_video[(user_id, video_courses[video_id])] = video_id
+
+    update_last_lessons(last_video)
+
+    completed_per_course = Counter(
+        video_courses[video_id]
+        for _, video_id in newly_completed
+        if video_id in video_courses
+    )
+    bump_course_rollups("completed_videos", completed_per_course)
+
+    refresh_enrollments_progress(
+        (user_id, video_courses[video_id])
+        for user_id, video_id in newly_completed
+        if video_id in video_courses
+    )
+
+    invalidate_course_progress_many(last_video.keys())
+
+
+# ==========================================================
+# ✅ COURSE PROGRESS (lessons / completed videos / quiz passed)
+# ==========================================================
+def course_progress_rows(user, course_ids):
+    """
+    ✅ Progress for many courses in ONE query:
+    lesson count via Count(filter=...), completed videos via a counted
+    subquery and quiz_passed via Exists()
+    """
+    completed_videos = VideoProgress.objects.filter(
+        user=user,
+        course_id=OuterRef("pk"),
+        is_completed=True
+    ).order_by().values("course_id").annotate(c=Count("id")).values("c")
+
+    return Course.objects.filter(id__in=course_ids).annotate(
+        total_lessons=Count(
+            "modules__lessons",
+            filter=Q(modules__lessons__video__isnull=False),
+            distinct=True
+        ),
+        completed_lessons=Coalesce(Subquery(completed_videos), 0),
+        quiz_passed=Exists(
+            QuizAttempt.objects.filter(
+                user=user,
+                course_id=OuterRef("pk"),
+                passed=True
+            )
+        ),
+    ).values("id", "total_lessons", "completed_lessons", "quiz_passed")
+
+
+def course_progress_from_row(row):
+    total_lessons = row["total_lessons"]
+    completed_lessons = row["completed_lessons"]
+
+    progress_percent = 0
+    if total_lessons > 0:
+        progress_percent = int((completed_lessons / total_lessons) * 100)
+
+    completed = total_lessons > 0 and completed_lessons == total_lessons
+
+    return {
+        "course_id": row["id"],
+        "progress": progress_percent,
+        "videos_completed": completed_lessons,
+        "total_videos": total_lessons,
+        "quiz_passed": row["quiz_passed"],
+        "completed": completed,
+        "certificate_available": completed and row["quiz_passed"],
+    }
+
+
+def compute_course_progress(user, course_ids):
+    return {
+        row["id"]: course_progress_from_row(row)
+        for row in course_progress_rows(user, course_ids)
+    }
+
+
+def get_course_progress(user, course_ids):
+    """
+    ✅ Cached (COURSE_PROGRESS_TTL) per user + course; progress writes and
+    quiz submissions invalidate their key. Unknown course IDs are omitted.
+    """
+    keys = {course_progress_key(user.id, course_id): course_id for course_id in course_ids}
+    cached = cache.get_many(keys.keys())
+
+    result = {keys[key]: value for key, value in cached.items()}
+    missing = [course_id for course_id in course_ids if course_id not in result]
+
+    if missing:
+        fresh = compute_course_progress(user, missing)
+        cache.set_many(
+            {course_progress_key(user.id, course_id): value for course_id, value in fresh.items()},
+            COURSE_PROGRESS_TTL
+        )
+        result.update(fresh)
+
+    return result
+
+
+async def aget_course_progress(user, course_ids):
+    """
+    ✅ get_course_progress() for async views (async cache + ORM)
+    """
+    keys = {course_progress_key(user.id, course_id): course_id for course_id in course_ids}
+    cached = await cache.aget_many(keys.keys())
+
+    result = {keys[key]: value for key, value in cached.items()}
+    missing = [course_id for course_id in course_ids if course_id not in result]
+
+    if missing:
+        fresh = {
+            row["id"]: course_progress_from_row(row)
+            async for row in course_progress_rows(user, missing)
+        }
+        await cache.aset_many(
+            {course_progress_key(user.id, course_id): value for course_id, value in fresh.items()},
+            COURSE_PROGRESS_TTL
+        )
+        result.update(fresh)
+
+    return result
+
+
+class ProgressBuffer:
+    """
+    ✅ Write-behind buffer for video progress heartbeats.
+
+    Heartbeats are coalesced in memory per (user, video), keeping the max
+    watched_seconds and a sticky is_completed, and flushed to VideoProgress
+    with upsert_progress():
+      - every FLUSH_INTERVAL seconds (background thread)
+      - as soon as MAX_PENDING keys are buffered
+      - on interpreter shutdown (atexit; gunicorn runs it on graceful stop)
+
+    A hard kill loses at most one flush interval of heartbeats. The buffer
+    is per process, so other workers see a heartbeat after the next flush.
+
+    A failed flush re-queues its records; heartbeats of a deleted user or
+    video are dropped, and a record still failing after MAX_RETRIES
+    flushes is dropped too, so one bad row can't wedge the buffer.
+    """
+
+    def __init__(self, flush_interval=2.0, max_pending=1000, max_retries=5):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+
+        self._pending = {}
+        # ✅ {key: failed flushes}, only touched under _flush_lock
+        self._retries = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, user_id, video_id, watched_seconds, is_completed):
+        key = (user_id, video_id)
+
+        with self._lock:
+            old_seconds, old_completed = self._pending.get(key, (0, False))
+            value = (max(old_seconds, watched_seconds), old_completed or is_completed)
+            self._pending[key] = value
+            full = len(self._pending) >= self.max_pending
+
+        self._start()
+
+        if full:
+            self.flush()
+
+        return value
+
+    def pending(self, user_id, video_id):
+        with self._lock:
+            return self._pending.get((user_id, video_id))
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+
+            if not batch:
+                return 0
+
+            try:
+                try:
+                    upsert_progress(batch)
+                except IntegrityError:
+                    # ✅ a user / video deleted since its heartbeat
+                    batch = drop_orphan_records(batch)
+                    upsert_progress(batch)
+            except Exception:
+                dropped = self._requeue(batch)
+                logger.exception(
+                    "Video progress flush failed, re-queueing %s records (%s dropped after %s retries)",
+                    len(batch) - dropped, dropped, self.max_retries
+                )
+                return 0
+
+            for key in batch:
+                self._retries.pop(key, None)
+
+            return len(batch)
+
+    def stop(self):
+        self._stopped.set()
+        self.flush()
+
+    def _requeue(self, batch):
+        """✅ Merge a failed batch back; returns how many records were dropped"""
+        dropped = 0
+
+        with self._lock:
+            for key, (watched_seconds, is_completed) in batch.items():
+                retries = self._retries.get(key, 0) + 1
+                if retries > self.max_retries:
+                    self._retries.pop(key, None)
+                    dropped += 1
+                    continue
+
+                self._retries[key] = retries
+                old_seconds, old_completed = self._pending.get(key, (0, False))
+                self._pending[key] = (max(old_seconds, watched_seconds), old_completed or is_completed)
+
+        return dropped
+
+    def _start(self):
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(
+                target=self._run,
+                name="video-progress-flush",
+                daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+            # ✅ this thread owns its own DB connection
+            close_old_connections()
+
+
+def buffer_settings():
+    return {
+        "ENABLED": False,
+        "FLUSH_INTERVAL": 2.0,
+        "MAX_PENDING": 1000,
+        "MAX_RETRIES": 5,
+        **getattr(settings, "VIDEO_PROGRESS_BUFFER", {}),
+    }
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_progress_buffer():
+    """
+    ✅ Process-wide buffer, or None when buffered ingest is disabled
+    """
+    global _buffer
+
+    config = buffer_settings()
+    if not config["ENABLED"]:
+        return None
+
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ProgressBuffer(
+                    flush_interval=config["FLUSH_INTERVAL"],
+                    max_pending=config["MAX_PENDING"],
+                    max_retries=config["MAX_RETRIES"],
+                )
+
+    return _buffer
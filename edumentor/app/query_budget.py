@@ -0,0 +1,152 @@
+"""
+✅ Per-view query budgets.
+
+    @query_budget(3)
+    @api_view(["GET"])
+    def course_list(request): ...
+
+QueryBudgetMiddleware counts the queries of every request (execute_wrapper,
+works with DEBUG off) and, when a view exceeds its budget, logs or raises
+with the offending SQL grouped by fingerprint. QUERY_BUDGET_MODE:
+"off" (default), "log" (production) or "raise" (tests / local dev).
+app/tests.py holds every declared budget to account.
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def query_budget(max_queries):
+    """
+    ✅ Declare the most queries a view may run (cold cache included).
+    Put it ABOVE @api_view so it decorates the final view function.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+
+@contextmanager
+def record_queries():
+    """
+    ✅ with record_queries() as recorder: ... → recorder.queries (SQL strings)
+    on every configured database
+    """
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),               # string literals
+    (re.compile(r"%s|\b\d+(?:\.\d+)?\b"), "?"),          # placeholders / numbers
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),  # IN (?, ?, ?)
+    (re.compile(r"\s+"), " "),
+]
+
+
+def fingerprint(sql):
+    """
+    ✅ SQL with literals / placeholders stripped, so the 200 copies of an
+    N+1 query collapse to one line
+    """
+    for pattern, replacement in LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def budget_report(name, queries, budget):
+    counts = Counter(fingerprint(sql) for sql in queries)
+    lines = [f"{name} ran {len(queries)} queries (budget {budget}):"]
+    lines += [f"  {count}× {sql}" for sql, count in counts.most_common()]
+    return "\n".join(lines)
+
+
+def view_name(view_func):
+    # ✅ @api_view functions are WrappedAPIView classes named after the function
+    view = getattr(view_func, "cls", None) or view_func
+    return f"{view.__module__}.{view.__name__}"
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        mode = getattr(settings, "QUERY_BUDGET_MODE", "off")
+        if mode == "off":
+            return self.get_response(request)
+
+        with record_queries() as recorder:
+            response = self.get_response(request)
+
+        return self.check_budget(request, response, recorder, mode)
+
+    async def __acall__(self, request):
+        mode = getattr(settings, "QUERY_BUDGET_MODE", "off")
+        if mode == "off":
+            return await self.get_response(request)
+
+        # ✅ the async ORM runs queries in the request's thread-sensitive
+        # worker thread, so the wrappers go on that thread's connections
+        recording = record_queries()
+        recorder = await sync_to_async(recording.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.__exit__)(None, None, None)
+
+        return self.check_budget(request, response, recorder, mode)
+
+    def check_budget(self, request, response, recorder, mode):
+        budget = getattr(request, "_query_budget", None)
+
+        if budget is not None and len(recorder) > budget:
+            report = budget_report(request._query_budget_view, recorder.queries, budget)
+            if mode == "raise":
+                raise QueryBudgetExceeded(report)
+            logger.warning(report)
+
+        response["X-Query-Count"] = str(len(recorder))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = getattr(
+            view_func, "query_budget", getattr(settings, "QUERY_BUDGET_DEFAULT", None)
+        )
+        request._query_budget_view = view_name(view_func)
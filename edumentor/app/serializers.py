@@ -30,7 +30,21 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ✅ Sparse fieldsets: pass fields=[...] to only serialize those fields
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class CourseSerializer(DynamicFieldsModelSerializer):
     is_enrolled = serializers.SerializerMethodField()
 
     class Meta:
@@ -44,6 +58,11 @@ class CourseSerializer(serializers.ModelSerializer):
         if not request or request.user.is_anonymous:
             return False
 
+        # ✅ Catalog views load the user's enrolled course IDs once per request
+        enrolled_ids = self.context.get('enrolled_course_ids')
+        if enrolled_ids is not None:
+            return obj.id in enrolled_ids
+
         # ✅ Check enrollment for THIS USER ONLY
         return Enrollment.objects.filter(
             user=request.user,
@@ -52,9 +71,10 @@ class CourseSerializer(serializers.ModelSerializer):
 
 class LessonSerializer(serializers.ModelSerializer):
     module_title = serializers.CharField(source="module.title", read_only=True)
-    module_id = serializers.IntegerField(source="module.id", read_only=True)
-    course_id = serializers.IntegerField(source="module.course.id", read_only=True)
-    video_id = serializers.IntegerField(source="video.id", read_only=True)
+    module_id = serializers.IntegerField(read_only=True)
+    # ✅ read the FK columns directly instead of loading course / video rows
+    course_id = serializers.IntegerField(source="module.course_id", read_only=True)
+    video_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Lesson
@@ -148,11 +168,7 @@ class MiniCourseSerializer(serializers.ModelSerializer):
 class MyEnrollmentSerializer(serializers.ModelSerializer):
     course = MiniCourseSerializer(read_only=True)
 
-    progress = serializers.SerializerMethodField()
-    total_lessons = serializers.SerializerMethodField()
-    completed_lessons = serializers.SerializerMethodField()
-    last_lesson_id = serializers.SerializerMethodField()
-
+    # ✅ progress counters are stored on Enrollment (see app.progress)
     class Meta:
         model = Enrollment
         fields = [
@@ -165,36 +181,6 @@ class MyEnrollmentSerializer(serializers.ModelSerializer):
             "last_lesson_id",
         ]
 
-    def get_total_lessons(self, obj):
-        return Lesson.objects.filter(module__course=obj.course).count()
-
-    def get_completed_lessons(self, obj):
-        user = obj.user
-        lessons = Lesson.objects.filter(module__course=obj.course).values_list("id", flat=True)
-
-        # ✅ Completed = watched progress exists and marked completed
-        return VideoProgress.objects.filter(
-            user=user,
-            video_id__in=lessons,
-            is_completed=True
-        ).count()
-
-    def get_progress(self, obj):
-        total = self.get_total_lessons(obj)
-        if total == 0:
-            return 0
-        completed = self.get_completed_lessons(obj)
-        return int((completed / total) * 100)
-
-    def get_last_lesson_id(self, obj):
-        user = obj.user
-        last = VideoProgress.objects.filter(
-            user=user,
-            video__module__course=obj.course
-        ).order_by("-id").first()
-
-        return last.video_id if last else None
-
 
 
 class ModuleMiniSerializer(serializers.ModelSerializer):
@@ -0,0 +1,454 @@
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Profile, Course, Module, Lesson, Video, VideoProgress, Enrollment, Quiz, Question, QuizAttempt
+from .models import Certificate, CourseStatsRollup
+from .cache import invalidate_course_outline, invalidate_course_progress, invalidate_quiz, invalidate_module_quiz
+from .cache import set_cached_role, invalidate_role, invalidate_enrollments, invalidate_module_course
+from .authentication import mark_user_inactive
+from .progress import refresh_course_progress, refresh_enrollment_progress, update_last_lesson
+from .stats import bump_course_rollup, refresh_course_rollups
+from .leaderboard import record_quiz_score, refresh_leaderboards
+
+
+def course_id_for_module(module_id):
+    return Module.objects.filter(
+        id=module_id
+    ).values_list("course_id", flat=True).first()
+
+
+def course_ids_for_modules(module_ids):
+    return set(Module.objects.filter(
+        id__in=set(module_ids) - {None}
+    ).values_list("course_id", flat=True))
+
+
+def course_id_for_video(video_id):
+    return Video.objects.filter(
+        id=video_id
+    ).values_list("module__course_id", flat=True).first()
+
+
+# ==========================================================
+# ✅ CASCADES (Course / User delete)
+# Deleting a course or a user sends post_delete for every row under it.
+# The per-row counter handlers skip those rows: a course's rollup and
+# leaderboard rows go with it, and a user's courses are recounted once
+# by user_deleted. The course ids are kept on the delete's origin (the
+# instance / queryset .delete() was called on), so a delete that rolls
+# back leaves nothing behind.
+# ==========================================================
+CASCADE_ROOTS = (Course, User)
+
+
+def origin_model(origin):
+    """✅ Model of a delete's origin (instance or queryset)"""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def in_cascade(origin):
+    """✅ True when a Course / User delete (instance or queryset) is cascading"""
+    return origin_model(origin) in CASCADE_ROOTS
+
+
+def skip_in_cascade(instance, origin):
+    """
+    ✅ True when this row goes away with a deleted Course / User; its
+    course is remembered for user_deleted to recount
+    """
+    if not in_cascade(origin):
+        return False
+    origin.__dict__.setdefault("_cascade_course_ids", set()).add(instance.course_id)
+    return True
+
+
+def move_to_course(queryset, course_id):
+    """
+    ✅ Re-point denormalized course_id rows → the course IDs they left
+    """
+    old_course_ids = set(queryset.order_by().values_list("course_id", flat=True).distinct())
+    if old_course_ids:
+        queryset.update(course_id=course_id)
+    return old_course_ids
+
+
+# ==========================================================
+# ✅ ROLE CACHE (RegisterSerializer, ProfileAdmin, shell...)
+# ==========================================================
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, **kwargs):
+    # ✅ write the new role (not just delete) so it wins over stale JWT claims
+    set_cached_role(instance.user_id, instance.role)
+
+
+@receiver(post_delete, sender=Profile)
+def profile_deleted(sender, instance, **kwargs):
+    invalidate_role(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    mark_user_inactive(instance.id, not instance.is_active)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, origin=None, **kwargs):
+    # ✅ one recount of the courses whose rows went with the user (the
+    # first post_delete of a queryset delete does it for every user)
+    course_ids = origin.__dict__.pop("_cascade_course_ids", None) if origin is not None else None
+    if course_ids:
+        refresh_course_rollups(course_ids)
+
+
+# ==========================================================
+# ✅ ENROLLMENT MEMBERSHIP (cached course ids + JWT "enr_v")
+# enroll_course / enrollment_view / admin deactivation all save()
+# ==========================================================
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    invalidate_enrollments(instance.user_id)
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def module_course_changed(sender, instance, **kwargs):
+    invalidate_module_course(instance.id)
+
+
+# ==========================================================
+# ✅ COURSE OUTLINE INVALIDATION
+# ==========================================================
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, **kwargs):
+    invalidate_course_outline(instance.id)
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def module_changed(sender, instance, **kwargs):
+    invalidate_course_outline(instance.course_id)
+    # ✅ moved: the old course lists it too
+    if instance._was_course_id not in (None, instance.course_id):
+        invalidate_course_outline(instance._was_course_id)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def lesson_or_video_changed(sender, instance, origin=None, **kwargs):
+    # ✅ rows of a deleted module: module_changed handles that course
+    if in_cascade(origin) or origin_model(origin) is Module:
+        return
+    # ✅ moved: the old module's course lists it too
+    for course_id in course_ids_for_modules({instance.module_id, instance._was_module_id}):
+        invalidate_course_outline(course_id)
+
+
+# ==========================================================
+# ✅ QUIZ CACHE INVALIDATION (answer key / module → quiz)
+# ==========================================================
+@receiver(post_init, sender=Quiz)
+def remember_quiz_module(sender, instance, **kwargs):
+    instance._was_module_id = instance.module_id
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def quiz_changed(sender, instance, **kwargs):
+    invalidate_quiz(instance.id)
+    invalidate_module_quiz(instance.module_id)
+    # ✅ a quiz moved to another module leaves its old module quiz-less
+    if instance._was_module_id not in (None, instance.module_id):
+        invalidate_module_quiz(instance._was_module_id)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, origin=None, **kwargs):
+    # ✅ Quiz.updated_at is the version per-process caches read (app.cache.quiz_version)
+    if not in_cascade(origin):
+        Quiz.objects.filter(id=instance.quiz_id).update(updated_at=timezone.now())
+    invalidate_quiz(instance.quiz_id)
+
+
+# ==========================================================
+# ✅ ENROLLMENT PROGRESS COUNTERS
+# (batched writes go through app.progress.sync_enrollment_progress)
+# ==========================================================
+@receiver(pre_save, sender=VideoProgress)
+def video_progress_course(sender, instance, **kwargs):
+    # ✅ denormalized course for writes that didn't set it (admin, shell...)
+    if instance.course_id is None:
+        instance.course_id = course_id_for_video(instance.video_id)
+
+
+@receiver(pre_save, sender=QuizAttempt)
+def quiz_attempt_course(sender, instance, **kwargs):
+    if instance.course_id is None:
+        instance.course_id = Module.objects.filter(
+            quiz__id=instance.quiz_id
+        ).values_list("course_id", flat=True).first()
+
+
+@receiver(post_save, sender=Module)
+def module_moved(sender, instance, created, **kwargs):
+    # ✅ keep the denormalized course in sync if a module changes course
+    # (and recount both courses' rollups, leaderboards + enrollment progress)
+    if not created:
+        old_course_ids = move_to_course(
+            VideoProgress.objects.filter(video__module_id=instance.id).exclude(course_id=instance.course_id),
+            instance.course_id
+        )
+        old_quiz_course_ids = move_to_course(
+            QuizAttempt.objects.filter(quiz__module_id=instance.id).exclude(course_id=instance.course_id),
+            instance.course_id
+        )
+        old_course_ids |= old_quiz_course_ids
+        if old_course_ids:
+            refresh_course_rollups(old_course_ids | {instance.course_id})
+        if old_quiz_course_ids:
+            refresh_leaderboards(old_quiz_course_ids | {instance.course_id})
+
+        # ✅ its lessons left one course's lesson set for the other's
+        if instance._was_course_id not in (None, instance.course_id):
+            refresh_course_progress(instance._was_course_id)
+            refresh_course_progress(instance.course_id)
+
+
+@receiver(post_save, sender=Video)
+def video_moved(sender, instance, created, **kwargs):
+    if not created:
+        course_id = course_id_for_module(instance.module_id)
+        old_course_ids = move_to_course(
+            VideoProgress.objects.filter(video_id=instance.id).exclude(course_id=course_id),
+            course_id
+        )
+        if old_course_ids:
+            refresh_course_rollups(old_course_ids | {course_id})
+
+
+@receiver(post_save, sender=Quiz)
+def quiz_moved(sender, instance, created, **kwargs):
+    if not created:
+        course_id = course_id_for_module(instance.module_id)
+        old_course_ids = move_to_course(
+            QuizAttempt.objects.filter(quiz_id=instance.id).exclude(course_id=course_id),
+            course_id
+        )
+        if old_course_ids:
+            refresh_course_rollups(old_course_ids | {course_id})
+            refresh_leaderboards(old_course_ids | {course_id})
+
+
+@receiver(post_init, sender=VideoProgress)
+def remember_completion(sender, instance, **kwargs):
+    instance._was_completed = instance.is_completed
+
+
+@receiver(post_save, sender=VideoProgress)
+def video_progress_saved(sender, instance, created, **kwargs):
+    update_last_lesson(instance.user_id, instance.video_id)
+
+    # ✅ recount only when completion actually changes
+    was_completed = instance._was_completed and not created
+    if instance.is_completed != was_completed:
+        refresh_enrollment_progress(instance.user_id, instance.course_id)
+        invalidate_course_progress(instance.user_id, instance.course_id)
+        bump_course_rollup(instance.course_id, completed_videos=1 if instance.is_completed else -1)
+
+    instance._was_completed = instance.is_completed
+
+
+@receiver(post_delete, sender=VideoProgress)
+def video_progress_deleted(sender, instance, origin=None, **kwargs):
+    if skip_in_cascade(instance, origin):
+        return
+    if instance.is_completed:
+        refresh_enrollment_progress(instance.user_id, instance.course_id)
+        invalidate_course_progress(instance.user_id, instance.course_id)
+        bump_course_rollup(instance.course_id, completed_videos=-1)
+
+
+@receiver(post_save, sender=QuizAttempt)
+@receiver(post_delete, sender=QuizAttempt)
+def quiz_attempt_changed(sender, instance, **kwargs):
+    if instance.course_id:
+        invalidate_course_progress(instance.user_id, instance.course_id)
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, **kwargs):
+    # ✅ recount only when the counted lessons (the ones with a video)
+    # change: not on title / content / order edits
+    before = after = None
+    if not created and instance._was_video_id is not None:
+        before = (instance._was_module_id, instance._was_video_id)
+    if instance.video_id is not None:
+        after = (instance.module_id, instance.video_id)
+
+    if before != after:
+        for course_id in course_ids_for_modules(key[0] for key in (before, after) if key):
+            refresh_course_progress(course_id)
+
+
+@receiver(post_delete, sender=Lesson)
+@receiver(post_delete, sender=Video)
+def lesson_set_changed(sender, instance, origin=None, **kwargs):
+    # ✅ rows of a deleted module: module_deleted recounts that course once
+    if in_cascade(origin) or origin_model(origin) is Module:
+        return
+    # (a deleted video's lessons lose it: SET_NULL)
+    if sender is Lesson and instance.video_id is None:
+        return
+    course_id = course_id_for_module(instance.module_id)
+    if course_id:
+        refresh_course_progress(course_id)
+
+
+@receiver(post_delete, sender=Module)
+def module_deleted(sender, instance, origin=None, **kwargs):
+    if not in_cascade(origin):
+        refresh_course_progress(instance.course_id)
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, **kwargs):
+    if created:
+        refresh_enrollment_progress(instance.user_id, instance.course_id, with_total=True)
+
+
+# ==========================================================
+# ✅ COURSE STATS ROLLUP (CourseStatsRollup counters)
+# Bulk writes skip these: see the hooks in app.stats
+# ==========================================================
+@receiver(post_save, sender=Course)
+def course_created(sender, instance, created, **kwargs):
+    if created:
+        CourseStatsRollup.objects.get_or_create(course=instance)
+
+
+@receiver(post_init, sender=Enrollment)
+def remember_active(sender, instance, **kwargs):
+    instance._was_active = instance.is_active
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_counted(sender, instance, created, **kwargs):
+    if created:
+        bump_course_rollup(
+            instance.course_id,
+            enrollments=1,
+            active_enrollments=int(instance.is_active)
+        )
+    elif instance.is_active != instance._was_active:
+        bump_course_rollup(instance.course_id, active_enrollments=1 if instance.is_active else -1)
+
+    instance._was_active = instance.is_active
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_uncounted(sender, instance, origin=None, **kwargs):
+    if skip_in_cascade(instance, origin):
+        return
+    bump_course_rollup(
+        instance.course_id,
+        enrollments=-1,
+        active_enrollments=-int(instance.is_active)
+    )
+
+
+@receiver(post_init, sender=QuizAttempt)
+def remember_passed(sender, instance, **kwargs):
+    instance._was_passed = instance.passed
+
+
+@receiver(post_save, sender=QuizAttempt)
+def quiz_attempt_counted(sender, instance, created, **kwargs):
+    if created:
+        bump_course_rollup(instance.course_id, quiz_attempts=1, quiz_passes=int(instance.passed))
+    elif instance.passed != instance._was_passed:
+        bump_course_rollup(instance.course_id, quiz_passes=1 if instance.passed else -1)
+
+    instance._was_passed = instance.passed
+
+
+@receiver(post_delete, sender=QuizAttempt)
+def quiz_attempt_uncounted(sender, instance, origin=None, **kwargs):
+    if skip_in_cascade(instance, origin):
+        return
+    bump_course_rollup(instance.course_id, quiz_attempts=-1, quiz_passes=-int(instance.passed))
+
+
+@receiver(post_save, sender=Certificate)
+def certificate_counted(sender, instance, created, **kwargs):
+    if created:
+        bump_course_rollup(instance.course_id, certificates=1)
+
+
+@receiver(post_delete, sender=Certificate)
+def certificate_uncounted(sender, instance, origin=None, **kwargs):
+    if skip_in_cascade(instance, origin):
+        return
+    bump_course_rollup(instance.course_id, certificates=-1)
+
+
+# ==========================================================
+# ✅ LEADERBOARD (LeaderboardEntry rows)
+# submit_quiz's upsert skips these and calls record_quiz_score itself
+# ==========================================================
+@receiver(post_init, sender=QuizAttempt)
+def remember_score(sender, instance, **kwargs):
+    instance._was_score = instance.score
+
+
+@receiver(pre_save, sender=QuizAttempt)
+def quiz_attempt_rescored(sender, instance, **kwargs):
+    # ✅ new attempts get the field default
+    if not instance._state.adding and instance.score != instance._was_score:
+        instance.scored_at = timezone.now()
+
+
+@receiver(post_save, sender=QuizAttempt)
+def quiz_attempt_scored(sender, instance, created, **kwargs):
+    if created or instance.score != instance._was_score:
+        record_quiz_score(instance.user_id, instance.course_id)
+
+    instance._was_score = instance.score
+
+
+@receiver(post_delete, sender=QuizAttempt)
+def quiz_attempt_unscored(sender, instance, origin=None, **kwargs):
+    # ✅ a user's / course's rows go with it: nobody else's average changes
+    if in_cascade(origin):
+        return
+    record_quiz_score(instance.user_id, instance.course_id, create=False)
+
+
+# ==========================================================
+# ✅ REMEMBERED VALUES (what a row was loaded with, to detect moves)
+# Also connected to post_save, after every handler above: the next save
+# of the same instance compares against what was just saved
+# ==========================================================
+@receiver(post_init, sender=Module)
+@receiver(post_save, sender=Module)
+def remember_course(sender, instance, **kwargs):
+    instance._was_course_id = instance.course_id
+
+
+@receiver(post_init, sender=Lesson)
+@receiver(post_save, sender=Lesson)
+@receiver(post_init, sender=Video)
+@receiver(post_save, sender=Video)
+def remember_module(sender, instance, **kwargs):
+    instance._was_module_id = instance.module_id
+
+
+@receiver(post_init, sender=Lesson)
+@receiver(post_save, sender=Lesson)
+def remember_video(sender, instance, **kwargs):
+    instance._was_video_id = instance.video_id
@@ -0,0 +1,276 @@
+from django.db.models import Case, Count, F, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import (
+    Certificate, Course, CourseStatsRollup, Enrollment, Lesson, Module, Quiz,
+    QuizAttempt, QuizStatsSnapshot, VideoProgress,
+)
+
+
+def count_subquery(queryset, **outer):
+    """
+    ✅ Coalesce(COUNT of queryset correlated on the outer row, 0):
+    count_subquery(Module.objects.all(), course_id="pk")
+    The first keyword is the GROUP BY column.
+    """
+    group_by = next(iter(outer))
+
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef(ref) for field, ref in outer.items()})
+            .order_by().values(group_by).annotate(c=Count("pk")).values("c")
+        ),
+        0,
+    )
+
+
+def pass_fail_row(course_id, course_title, total_attempts, passed):
+    pass_percentage = 0
+    if total_attempts > 0:
+        pass_percentage = round((passed / total_attempts) * 100, 2)
+
+    return {
+        "course_id": course_id,
+        "course_title": course_title,
+        "total_attempts": total_attempts,
+        "passed": passed,
+        "failed": total_attempts - passed,
+        "pass_percentage": pass_percentage,
+    }
+
+
+def live_course_quiz_stats():
+    """
+    ✅ ONE query: every course with counted subqueries on the denormalized
+    QuizAttempt.course (attempt_course_passed_idx), so courses without
+    attempts are still listed (with zeros)
+    """
+    return Course.objects.annotate(
+        total_attempts=count_subquery(QuizAttempt.objects.all(), course_id="pk"),
+        passed=count_subquery(QuizAttempt.objects.filter(passed=True), course_id="pk"),
+    ).order_by("id").values_list("id", "title", "total_attempts", "passed")
+
+
+def snapshot_course_quiz_stats():
+    """
+    ✅ Latest daily snapshot (constant work regardless of attempt volume)
+    Returns None when no snapshot has been taken yet.
+    """
+    latest = QuizStatsSnapshot.objects.aggregate(latest=Max("snapshot_date"))["latest"]
+    if latest is None:
+        return None
+
+    return QuizStatsSnapshot.objects.filter(
+        snapshot_date=latest
+    ).order_by("course_id").values_list("course_id", "course__title", "total_attempts", "passed")
+
+
+def course_quiz_stats(use_snapshot=False):
+    rows = snapshot_course_quiz_stats() if use_snapshot else None
+    if rows is None:
+        rows = live_course_quiz_stats()
+
+    return [pass_fail_row(*row) for row in rows]
+
+
+def take_quiz_stats_snapshot(snapshot_date):
+    """
+    ✅ Store today's live stats (re-running the same day overwrites it)
+    """
+    snapshots = [
+        QuizStatsSnapshot(
+            course_id=course_id,
+            snapshot_date=snapshot_date,
+            total_attempts=total_attempts,
+            passed=passed,
+        )
+        for course_id, _, total_attempts, passed in live_course_quiz_stats()
+    ]
+
+    QuizStatsSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=["course", "snapshot_date"],
+        update_fields=["total_attempts", "passed", "created_at"],
+    )
+    return len(snapshots)
+
+
+# ==========================================================
+# ✅ PER-COURSE ANALYTICS (one statement for any number of courses)
+# ==========================================================
+def counts_by_course(course_ids, counts, courses=None):
+    """
+    ✅ {course_id: {"course_id", *counts}} in ONE query, in course_ids order.
+    counts = {name: count_subquery(...) or a CourseStatsRollup counter name}
+    Unknown course IDs get zeros, like the per-course endpoints always
+    returned; a course without a rollup row gets it built.
+    """
+    courses = Course.objects.all() if courses is None else courses
+    rollup = {name: count for name, count in counts.items() if isinstance(count, str)}
+
+    # ✅ aliased: "modules" / "enrollments" are also Course relations
+    rows = {
+        row["id"]: row
+        for row in courses.filter(id__in=course_ids).annotate(**{
+            f"count_{name}": F(f"stats_rollup__{count}") if name in rollup else count
+            for name, count in counts.items()
+        }).values("id", *(f"count_{name}" for name in counts))
+    }
+
+    if rollup:
+        missing = [
+            course_id for course_id, row in rows.items()
+            if row[f"count_{next(iter(rollup))}"] is None
+        ]
+        for course_rollup in refresh_course_rollups(missing) if missing else ():
+            rows[course_rollup.course_id].update({
+                f"count_{name}": getattr(course_rollup, counter) for name, counter in rollup.items()
+            })
+
+    return {
+        course_id: {
+            "course_id": course_id,
+            **{name: rows.get(course_id, {}).get(f"count_{name}", 0) for name in counts},
+        }
+        for course_id in course_ids
+    }
+
+
+def course_analytics_rows(course_ids):
+    return counts_by_course(course_ids, {
+        "enrollments": "active_enrollments",
+        "modules": count_subquery(Module.objects.all(), course_id="pk"),
+        "quizzes": count_subquery(Quiz.objects.all(), module__course_id="pk"),
+        "certificates_issued": "certificates",
+    })
+
+
+def course_pass_fail_rows(course_ids):
+    return counts_by_course(course_ids, {
+        "total_attempts": "quiz_attempts",
+        "passed": "quiz_passes",
+    })
+
+
+def course_stats_rows(course_ids):
+    """
+    ✅ Quiz attempts are those of each course's first quiz (lowest id),
+    as /courses/<id>/stats/ always reported (per quiz → not in the rollup)
+    """
+    first_quiz = Quiz.objects.filter(
+        module__course_id=OuterRef("pk")
+    ).order_by("id").values("id")[:1]
+
+    first_quiz_attempts = QuizAttempt.objects.filter(quiz_id=OuterRef("first_quiz_id"))
+
+    return counts_by_course(course_ids, {
+        "total_lessons": count_subquery(Lesson.objects.all(), module__course_id="pk"),
+        "completed_videos": "completed_videos",
+        "quiz_attempts": count_subquery(first_quiz_attempts, course_id="pk"),
+        "passed_attempts": count_subquery(first_quiz_attempts.filter(passed=True), course_id="pk"),
+    }, courses=Course.objects.annotate(first_quiz_id=Subquery(first_quiz)))
+
+
+def total_enrollments():
+    return CourseStatsRollup.objects.aggregate(total=Coalesce(Sum("enrollments"), 0))["total"]
+
+
+# ==========================================================
+# ✅ COURSE STATS ROLLUP
+# Incremental: app.signals for single-row writes, bump_course_rollup()
+# from the bulk paths (submit_quiz upsert, progress buffer flush).
+# From scratch: refresh_course_rollups() (reconcile_course_stats,
+# bulk certificate issue, module moves, missing rows).
+# ==========================================================
+ROLLUP_COUNTERS = (
+    "enrollments", "active_enrollments", "completed_videos",
+    "quiz_attempts", "quiz_passes", "certificates",
+)
+
+
+def compute_course_rollups(course_ids=None):
+    """
+    ✅ [CourseStatsRollup] counted from the raw rows in ONE query
+    (course_ids=None → every course; unknown IDs are skipped)
+    """
+    courses = Course.objects.order_by("id")
+    if course_ids is not None:
+        courses = courses.filter(id__in=course_ids)
+
+    rows = courses.annotate(
+        count_enrollments=count_subquery(Enrollment.objects.all(), course_id="pk"),
+        count_active_enrollments=count_subquery(Enrollment.objects.filter(is_active=True), course_id="pk"),
+        count_completed_videos=count_subquery(VideoProgress.objects.filter(is_completed=True), course_id="pk"),
+        count_quiz_attempts=count_subquery(QuizAttempt.objects.all(), course_id="pk"),
+        count_quiz_passes=count_subquery(QuizAttempt.objects.filter(passed=True), course_id="pk"),
+        count_certificates=count_subquery(Certificate.objects.all(), course_id="pk"),
+    ).values("id", *(f"count_{counter}" for counter in ROLLUP_COUNTERS))
+
+    return [
+        CourseStatsRollup(
+            course_id=row["id"],
+            **{counter: row[f"count_{counter}"] for counter in ROLLUP_COUNTERS}
+        )
+        for row in rows
+    ]
+
+
+def save_course_rollups(rollups):
+    CourseStatsRollup.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=["course"],
+        update_fields=list(ROLLUP_COUNTERS),
+        batch_size=500,
+    )
+    return rollups
+
+
+def refresh_course_rollups(course_ids=None):
+    """
+    ✅ Recompute and upsert the rollup rows → the fresh rows
+    """
+    return save_course_rollups(compute_course_rollups(course_ids))
+
+
+def bump_course_rollup(course_id, **deltas):
+    """
+    ✅ One UPDATE: bump_course_rollup(7, quiz_attempts=1, quiz_passes=-1)
+    A course without a rollup row is skipped (built on the next read).
+    """
+    deltas = {counter: delta for counter, delta in deltas.items() if delta}
+    if not course_id or not deltas:
+        return
+
+    CourseStatsRollup.objects.filter(course_id=course_id).update(**{
+        counter: Greatest(F(counter) + delta, 0) for counter, delta in deltas.items()
+    })
+
+
+def bump_course_rollups(counter, deltas):
+    """
+    ✅ One UPDATE for many courses: bump_course_rollups("completed_videos", {7: 2, 9: 1})
+    """
+    deltas = {course_id: delta for course_id, delta in deltas.items() if course_id and delta}
+    if not deltas:
+        return
+
+    CourseStatsRollup.objects.filter(course_id__in=deltas).update(**{
+        counter: Greatest(F(counter) + Case(
+            *[When(course_id=course_id, then=Value(delta)) for course_id, delta in deltas.items()],
+            default=Value(0),
+        ), 0)
+    })
+
+
+def record_quiz_attempt(course_id, previous_passed, passed):
+    """
+    ✅ Rollup hook for an upserted attempt (no signals);
+    previous_passed=None when it's the user's first attempt
+    """
+    bump_course_rollup(
+        course_id,
+        quiz_attempts=1 if previous_passed is None else 0,
+        quiz_passes=int(passed) - int(bool(previous_passed)),
+    )
@@ -1,3 +1,1294 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import resolve
+from django.db import DatabaseError, connection
+from django.db.models import Count, Max, Sum
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from . import async_views, certificates, views
+from .activity import roll_up_activity
+from .authentication import ClaimsJWTAuthentication
+from .benchmark import benchmark_clients, route_cases, seed_benchmark_data
+from .cache import get_course_outline, invalidate_course_outline
+from .cache import (
+    LOCAL_ENROLLMENT_CACHE_TTL, LOCAL_MODULE_QUIZ_TTL, QUIZ_CACHE_TTL, get_module_quiz, module_quiz_ttl,
+)
+from .certificates import bulk_issue
+from .leaderboard import refresh_leaderboards
+from .checks import stateless_reads_cache
+from .models import (
+    ActivityBucket, ActivityWatermark, Certificate, Course, CourseStatsRollup,
+    Enrollment, LeaderboardEntry, Lesson, Module, Profile, Question, Quiz,
+    QuizAttempt, Video, VideoProgress,
+)
+from .progress import ProgressBuffer
+from .tokens import EduMentorTokenObtainPairSerializer
+from .stats import ROLLUP_COUNTERS, compute_course_rollups
+from .query_budget import QueryBudgetExceeded, budget_report, fingerprint
+
+
+# ==========================================================
+# ✅ FIXTURES (small and hand-built; seed_benchmark_data is for the
+# budget / cross-check tests)
+# ==========================================================
+def make_user(username, role="STUDENT", **fields):
+    user = User.objects.create_user(username=username, password="pw", **fields)
+    Profile.objects.create(user=user, role=role)
+    return user
+
+
+def make_course(owner, title="Course", lessons=2, questions=0):
+    """✅ Course with one module of `lessons` video lessons (+ a quiz) → (course, module, videos)"""
+    course = Course.objects.create(title=title, description="d", category="Programming", created_by=owner)
+    module = Module.objects.create(course=course, title="Module 1", order=1)
+
+    videos = []
+    for order in range(1, lessons + 1):
+        video = Video.objects.create(
+            module=module, title=f"Video {order}", video_url="https://example.com/v.mp4",
+            duration=60, order=order,
+        )
+        Lesson.objects.create(module=module, title=f"Lesson {order}", order=order, video=video)
+        videos.append(video)
+
+    if questions:
+        quiz = Quiz.objects.create(module=module, title="Quiz", total_marks=questions, pass_marks=1)
+        for number in range(questions):
+            Question.objects.create(
+                quiz=quiz, question_text=f"Q{number}?",
+                option_a="A", option_b="B", option_c="C", option_d="D", correct_option="A",
+            )
+
+    return course, module, videos
+
+
+def shared_cache():
+    """✅ override_settings with a cache every worker would see (stands in for Redis)"""
+    return override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": tempfile.mkdtemp(prefix="edumentor-cache-"),
+    }})
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class CourseCatalogTests(TestCase):
+    """
+    ✅ course_list / admin_courses: cursor pages, the ordering whitelist,
+    filters and sparse fieldsets
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN", is_staff=True)
+        cls.student = make_user("student")
+        cls.courses = [
+            Course.objects.create(
+                title=f"Course {i}", description="d", created_by=cls.admin,
+                category="Design" if i % 2 else "Programming", is_premium=i % 3 == 0,
+            )
+            for i in range(5)
+        ]
+        # ✅ creation order opposite to id order
+        for i, course in enumerate(cls.courses):
+            Course.objects.filter(id=course.id).update(created_at=timezone.now() - timedelta(days=i))
+        Enrollment.objects.create(user=cls.student, course=cls.courses[1])
+
+    def ids(self, response):
+        return [course["id"] for course in response.json()["results"]]
+
+    def walk(self, client, url, params):
+        pages = [client.get(url, params).json()]
+        while pages[-1]["next"]:
+            pages.append(client.get(pages[-1]["next"]).json())
+        return pages
+
+    def test_cursor_pages_cover_the_catalog(self):
+        for client, url in (
+            (client_for(self.student), "/api/courses/"),
+            (client_for(self.admin), "/api/admin/courses/"),
+        ):
+            with self.subTest(url=url):
+                pages = self.walk(client, url, {"page_size": 2})
+
+                self.assertEqual(set(pages[0]), {"next", "previous", "results"})
+                self.assertEqual([len(page["results"]) for page in pages], [2, 2, 1])
+                self.assertIsNone(pages[0]["previous"])
+                self.assertIsNotNone(pages[1]["previous"])
+                self.assertEqual(
+                    [course["id"] for page in pages for course in page["results"]],
+                    sorted((course.id for course in self.courses), reverse=True),
+                )
+
+    def test_ordering_whitelist(self):
+        client = client_for(self.student)
+        newest_first = [course.id for course in self.courses]
+
+        pages = self.walk(client, "/api/courses/", {"page_size": 2, "ordering": "-created_at"})
+        self.assertEqual([course["id"] for page in pages for course in page["results"]], newest_first)
+
+        # ✅ anything else falls back to -id
+        for ordering in ("title", "created_at", "-description"):
+            response = client.get("/api/courses/", {"ordering": ordering})
+            self.assertEqual(self.ids(response), newest_first[::-1])
+
+    def test_filters_and_fields(self):
+        client = client_for(self.student)
+
+        response = client.get("/api/courses/", {"category": "Design", "is_premium": "true"})
+        self.assertEqual(self.ids(response), [self.courses[3].id])
+        response = client.get("/api/courses/", {"is_premium": "0"})
+        self.assertEqual(self.ids(response), [course.id for course in reversed(self.courses) if not course.is_premium])
+
+        response = client.get("/api/courses/", {"fields": "id,is_enrolled,password"})
+        results = response.json()["results"]
+        self.assertEqual({tuple(sorted(course)) for course in results}, {("id", "is_enrolled")})
+        self.assertEqual([course["id"] for course in results if course["is_enrolled"]], [self.courses[1].id])
+
+
+class CourseOutlineTests(TestCase):
+    """
+    ✅ The module → lesson tree: 2 queries to build, none once cached,
+    and every edit or move invalidates the courses it touches
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN")
+        cls.course, cls.module, _ = make_course(cls.admin, lessons=3)
+        cls.other, cls.other_module, _ = make_course(cls.admin, title="Other", lessons=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def lessons(self, course):
+        return [lesson["title"] for module in get_course_outline(course.id) for lesson in module["lessons"]]
+
+    def test_built_in_two_queries_then_cached(self):
+        with self.assertNumQueries(2):
+            outline = get_course_outline(self.course.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_course_outline(self.course.id), outline)
+
+        response = client_for(self.admin).get(f"/api/courses/{self.course.id}/outline/")
+        self.assertEqual(response.json()["modules"], outline)
+        self.assertEqual([lesson["course_id"] for lesson in outline[0]["lessons"]], [self.course.id] * 3)
+
+    def test_lesson_edit_invalidates(self):
+        self.lessons(self.course)
+        lesson = Lesson.objects.get(module=self.module, order=1)
+        lesson.title = "Renamed"
+        lesson.save()
+
+        self.assertEqual(self.lessons(self.course), ["Renamed", "Lesson 2", "Lesson 3"])
+
+    def test_moves_invalidate_both_courses(self):
+        self.lessons(self.course)
+        self.lessons(self.other)
+        lesson = Lesson.objects.get(module=self.module, order=3)
+        lesson.module = self.other_module
+        lesson.save()
+
+        self.assertEqual(self.lessons(self.course), ["Lesson 1", "Lesson 2"])
+        self.assertEqual(self.lessons(self.other), ["Lesson 1", "Lesson 3"])
+
+        module = Module.objects.get(id=self.other_module.id)
+        module.course = self.course
+        module.save()
+
+        self.assertEqual(self.lessons(self.other), [])
+        self.assertEqual(len(get_course_outline(self.course.id)), 2)
+
+    def test_module_delete_invalidates_once(self):
+        self.lessons(self.course)
+        with mock.patch("app.signals.invalidate_course_outline", wraps=invalidate_course_outline) as invalidate:
+            Module.objects.get(id=self.module.id).delete()
+
+        invalidate.assert_called_once_with(self.course.id)
+        self.assertEqual(self.lessons(self.course), [])
+
+
+class ProgressBufferTests(TestCase):
+    """
+    ✅ Write-behind heartbeats: coalescing, size-triggered flush, requeue
+    after a failed flush (the timer thread never fires: 1h interval)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN")
+        cls.student = make_user("student")
+        cls.course, cls.module, cls.videos = make_course(cls.admin, lessons=2)
+        Enrollment.objects.create(user=cls.student, course=cls.course)
+
+    def progress(self, video):
+        return VideoProgress.objects.filter(user=self.student, video=video).values_list(
+            "watched_seconds", "is_completed"
+        ).first()
+
+    def test_heartbeats_coalesce_until_flushed(self):
+        buffer = ProgressBuffer(flush_interval=3600)
+        for watched_seconds, is_completed in [(10, False), (40, True), (25, False)]:
+            buffer.add(self.student.id, self.videos[0].id, watched_seconds, is_completed)
+
+        self.assertEqual(buffer.pending(self.student.id, self.videos[0].id), (40, True))
+        self.assertIsNone(self.progress(self.videos[0]))
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.progress(self.videos[0]), (40, True))
+        self.assertEqual(Enrollment.objects.get(user=self.student).completed_lessons, 1)
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_flush_never_moves_progress_backwards(self):
+        VideoProgress.objects.create(user=self.student, video=self.videos[0], watched_seconds=50, is_completed=True)
+        buffer = ProgressBuffer(flush_interval=3600)
+        buffer.add(self.student.id, self.videos[0].id, 20, False)
+        buffer.flush()
+
+        self.assertEqual(self.progress(self.videos[0]), (50, True))
+
+    def test_full_buffer_flushes_inline(self):
+        buffer = ProgressBuffer(flush_interval=3600, max_pending=2)
+        buffer.add(self.student.id, self.videos[0].id, 10, False)
+        self.assertIsNone(self.progress(self.videos[0]))
+
+        buffer.add(self.student.id, self.videos[1].id, 10, False)
+        self.assertEqual(self.progress(self.videos[0]), (10, False))
+        self.assertIsNone(buffer.pending(self.student.id, self.videos[1].id))
+
+    def test_failed_flush_requeues_and_merges(self):
+        buffer = ProgressBuffer(flush_interval=3600)
+        buffer.add(self.student.id, self.videos[0].id, 30, True)
+
+        with mock.patch("app.progress.upsert_progress", side_effect=DatabaseError("down")):
+            with self.assertLogs("app.progress", "ERROR"):
+                self.assertEqual(buffer.flush(), 0)
+
+        # ✅ kept, and merged with what arrived meanwhile
+        buffer.add(self.student.id, self.videos[0].id, 45, False)
+        self.assertEqual(buffer.pending(self.student.id, self.videos[0].id), (45, True))
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.progress(self.videos[0]), (45, True))
+
+    def test_view_serves_pending_heartbeats(self):
+        buffer = ProgressBuffer(flush_interval=3600)
+        client = client_for(self.student)
+        url = f"/api/video-progress/{self.videos[0].id}/"
+
+        with mock.patch("app.views.get_progress_buffer", return_value=buffer):
+            response = client.post(url, {"watched_seconds": 70, "is_completed": "true"})
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(client.get(url).json()["watched_seconds"], 70)
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.progress(self.videos[0]), (70, True))
+
+
+class ProgressBufferOrphanTests(TransactionTestCase):
+    """
+    ✅ Rows the database rejects don't wedge the buffer (needs real
+    commits: the foreign keys are only checked at COMMIT)
+    """
+
+    def setUp(self):
+        self.admin = make_user("teacher", role="ADMIN")
+        self.student = make_user("student")
+        self.course, self.module, self.videos = make_course(self.admin, lessons=1)
+
+    def test_heartbeats_of_a_deleted_user_are_dropped(self):
+        gone = make_user("gone")
+        buffer = ProgressBuffer(flush_interval=3600)
+        buffer.add(self.student.id, self.videos[0].id, 30, False)
+        buffer.add(gone.id, self.videos[0].id, 30, False)
+        gone.delete()
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(VideoProgress.objects.get().user_id, self.student.id)
+        self.assertIsNone(buffer.pending(gone.id, self.videos[0].id))
+
+    def test_failing_records_are_dropped_after_max_retries(self):
+        buffer = ProgressBuffer(flush_interval=3600, max_retries=2)
+        buffer.add(self.student.id, self.videos[0].id, 30, False)
+
+        with mock.patch("app.progress.upsert_progress", side_effect=DatabaseError("down")):
+            with self.assertLogs("app.progress", "ERROR") as logs:
+                for _ in range(3):
+                    self.assertEqual(buffer.flush(), 0)
+
+        self.assertIn("(1 dropped after 2 retries)", logs.output[-1])
+        self.assertIsNone(buffer.pending(self.student.id, self.videos[0].id))
+
+
+class EnrollmentProgressCounterTests(TestCase):
+    """
+    ✅ Enrollment.completed_lessons / total_lessons / progress / last_lesson
+    follow every write path, and rebuild_enrollment_progress repairs drift
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN")
+        cls.student = make_user("student")
+        cls.course, cls.module, cls.videos = make_course(cls.admin, lessons=4)
+        Enrollment.objects.create(user=cls.student, course=cls.course)
+
+    def counters(self):
+        return Enrollment.objects.filter(user=self.student, course=self.course).values(
+            "completed_lessons", "total_lessons", "progress", "last_lesson__video_id"
+        ).get()
+
+    def test_enrolling_counts_the_lessons(self):
+        self.assertEqual(self.counters(), {
+            "completed_lessons": 0, "total_lessons": 4, "progress": 0, "last_lesson__video_id": None,
+        })
+
+    def test_counters_follow_progress_writes(self):
+        client = client_for(self.student)
+        client.post(f"/api/video-progress/{self.videos[0].id}/", {"watched_seconds": 60, "is_completed": True})
+        client.post("/api/video-progress/bulk/", {"items": [
+            {"video_id": self.videos[1].id, "watched_seconds": 60, "is_completed": True},
+            {"video_id": self.videos[2].id, "watched_seconds": 10},
+        ]}, format="json")
+        self.assertEqual(self.counters(), {
+            "completed_lessons": 2, "total_lessons": 4, "progress": 50,
+            "last_lesson__video_id": self.videos[2].id,
+        })
+
+        # ORM: uncomplete one, delete the other
+        progress = VideoProgress.objects.get(user=self.student, video=self.videos[0])
+        progress.is_completed = False
+        progress.save()
+        VideoProgress.objects.get(user=self.student, video=self.videos[1]).delete()
+        self.assertEqual(self.counters()["completed_lessons"], 0)
+
+    def test_bulk_sync_cost_does_not_grow_with_courses(self):
+        courses = [(self.course, self.videos)]
+        for i in range(4):
+            course, _, videos = make_course(self.admin, title=f"Course {i}", lessons=2)
+            Enrollment.objects.create(user=self.student, course=course)
+            courses.append((course, videos))
+
+        def sync(batch):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = client_for(self.student).post("/api/video-progress/bulk/", {"items": [
+                    {"video_id": videos[0].id, "watched_seconds": 60, "is_completed": True}
+                    for _, videos in batch
+                ]}, format="json")
+            self.assertEqual(response.json()["saved"], len(batch))
+            return len(queries)
+
+        self.assertEqual(sync(courses[:1]), sync(courses[1:]))
+
+        for course, videos in courses:
+            enrollment = Enrollment.objects.get(user=self.student, course=course)
+            self.assertEqual(enrollment.completed_lessons, 1)
+            self.assertEqual(enrollment.progress, 100 // enrollment.total_lessons)
+            self.assertEqual(enrollment.last_lesson.video_id, videos[0].id)
+            self.assertEqual(CourseStatsRollup.objects.get(course=course).completed_videos, 1)
+
+    def test_lesson_set_changes_update_totals(self):
+        VideoProgress.objects.create(user=self.student, video=self.videos[0], is_completed=True)
+        Lesson.objects.filter(video=self.videos[3]).delete()
+
+        self.assertEqual(self.counters()["total_lessons"], 3)
+        self.assertEqual(self.counters()["progress"], 33)
+
+    def test_module_move_recounts_both_courses(self):
+        other, other_module, _ = make_course(self.admin, title="Other", lessons=1)
+        Enrollment.objects.create(user=self.student, course=other)
+
+        module = Module.objects.get(id=other_module.id)
+        module.course = self.course
+        module.save()
+
+        self.assertEqual(self.counters()["total_lessons"], 5)
+        self.assertEqual(Enrollment.objects.get(user=self.student, course=other).total_lessons, 0)
+
+    def test_only_lesson_set_changes_recount(self):
+        with mock.patch("app.signals.refresh_course_progress") as refresh:
+            lesson = Lesson.objects.get(video=self.videos[0])
+            lesson.title = "Renamed"
+            lesson.order = 9
+            lesson.save()
+            refresh.assert_not_called()
+
+            lesson.video = None
+            lesson.save()
+            refresh.assert_called_once_with(self.course.id)
+
+            refresh.reset_mock()
+            Module.objects.get(id=self.module.id).delete()
+            refresh.assert_called_once_with(self.course.id)
+
+    def test_rebuild_repairs_drift(self):
+        VideoProgress.objects.create(user=self.student, video=self.videos[0], is_completed=True)
+        expected = self.counters()
+
+        Enrollment.objects.update(completed_lessons=3, total_lessons=9, progress=90, last_lesson=None)
+        call_command("rebuild_enrollment_progress", course=[self.course.id], stdout=io.StringIO())
+
+        self.assertEqual(self.counters(), expected)
+
+
+class AnswerKeyTests(TestCase):
+    """
+    ✅ Grading must follow question edits, including edits handled by
+    another worker whose invalidation never reaches this process's cache
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN")
+        cls.student = make_user("student")
+        cls.course, cls.module, _ = make_course(cls.admin, lessons=1, questions=1)
+        cls.question = Question.objects.get(quiz__module=cls.module)
+        Enrollment.objects.create(user=cls.student, course=cls.course)
+
+    def submit(self, answer):
+        return client_for(self.student).post(
+            f"/api/modules/{self.module.id}/quiz/submit/",
+            {"answers": {str(self.question.id): answer}},
+            format="json",
+        ).json()
+
+    def edit_answer(self, option):
+        self.question.correct_option = option
+        self.question.save()
+
+    def test_edit_on_another_worker_regrades(self):
+        self.assertEqual(self.submit("A")["score"], 1)
+
+        # ✅ the other worker's cache invalidation doesn't reach this process
+        with mock.patch("app.signals.invalidate_quiz"):
+            self.edit_answer("B")
+
+        self.assertEqual(self.submit("A")["score"], 0)
+        self.assertEqual(self.submit("B")["score"], 1)
+
+    @shared_cache()
+    def test_shared_cache_uses_the_version_key(self):
+        self.assertEqual(self.submit("A")["score"], 1)
+        self.edit_answer("C")
+
+        self.assertEqual(self.submit("C")["score"], 1)
+        self.assertEqual(QuizAttempt.objects.get(user=self.student).score, 1)
+
+    def test_quiz_deleted_on_another_worker_is_not_found(self):
+        self.assertEqual(self.submit("A")["score"], 1)
+
+        with mock.patch("app.signals.invalidate_quiz"), mock.patch("app.signals.invalidate_module_quiz"):
+            self.module.quiz.delete()
+
+        response = client_for(self.student).post(
+            f"/api/modules/{self.module.id}/quiz/submit/", {"answers": {}}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+        # ✅ and the stale module → quiz entry expires soon
+        self.assertEqual(module_quiz_ttl(), LOCAL_MODULE_QUIZ_TTL)
+        with shared_cache():
+            self.assertEqual(module_quiz_ttl(), QUIZ_CACHE_TTL)
+
+    def test_moved_quiz_leaves_its_old_module(self):
+        _, other_module, _ = make_course(self.admin, title="Other")
+        self.assertIsNotNone(get_module_quiz(self.module.id))
+
+        quiz = Quiz.objects.get(module=self.module)
+        quiz.module = other_module
+        quiz.save()
+
+        self.assertIsNone(get_module_quiz(self.module.id))
+        self.assertEqual(get_module_quiz(other_module.id)["quiz_id"], quiz.id)
+
+
+class QuizETagTests(TestCase):
+    """✅ Quiz reads answer If-None-Match with 304 until the quiz changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN")
+        cls.student = make_user("student")
+        cls.course, cls.module, _ = make_course(cls.admin, lessons=1, questions=2)
+        cls.quiz = Quiz.objects.get(module=cls.module)
+        Enrollment.objects.create(user=cls.student, course=cls.course)
+
+    def test_if_none_match_returns_304(self):
+        client = client_for(self.student)
+        for url in (
+            f"/api/quizzes/{self.quiz.id}/questions/",
+            f"/api/modules/{self.module.id}/quiz/",
+        ):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response["ETag"]
+
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(response["ETag"], etag)
+
+                self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_question_edit_changes_the_etag(self):
+        client = client_for(self.student)
+        url = f"/api/quizzes/{self.quiz.id}/questions/"
+        etag = client.get(url)["ETag"]
+
+        # ✅ also when the edit's invalidation doesn't reach this process
+        question = Question.objects.filter(quiz=self.quiz).first()
+        question.question_text = "Edited?"
+        with mock.patch("app.signals.invalidate_quiz"):
+            question.save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Edited?", [q["question_text"] for q in response.json()])
+
+
+class QuizSubmitRaceTests(TestCase):
+    """✅ Two racing first submissions count one attempt between them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN")
+        cls.student = make_user("student")
+        cls.course, cls.module, _ = make_course(cls.admin, lessons=1, questions=1)
+        cls.question = Question.objects.get(quiz__module=cls.module)
+        Enrollment.objects.create(user=cls.student, course=cls.course)
+
+    def test_losing_the_insert_race_replaces_the_winner(self):
+        raced = []
+
+        def concurrent_first_submission(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            if not raced and sql.startswith('SELECT "app_quizattempt"."passed"'):
+                raced.append(sql)
+                # ✅ the other request inserts (and counts) its attempt right
+                # after this one found none
+                QuizAttempt.objects.create(user=self.student, quiz=self.module.quiz, score=0, passed=False)
+            return result
+
+        with connection.execute_wrapper(concurrent_first_submission):
+            response = client_for(self.student).post(
+                f"/api/modules/{self.module.id}/quiz/submit/",
+                {"answers": {str(self.question.id): "A"}},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(raced)
+        self.assertEqual(
+            CourseStatsRollup.objects.values("quiz_attempts", "quiz_passes").get(course=self.course),
+            {"quiz_attempts": 1, "quiz_passes": 1},
+        )
+        self.assertEqual(QuizAttempt.objects.values("score", "passed").get(user=self.student), {"score": 1, "passed": True})
+        self.assertEqual(LeaderboardEntry.objects.get(user=self.student).avg_score, 1)
+
+
+class RoleChangeTests(TestCase):
+    """
+    ✅ A demoted admin loses write access at once, even when the role
+    change was handled by another worker and this process's cache still
+    holds the old role
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN")
+        cls.course, cls.module, cls.videos = make_course(cls.admin, lessons=1, questions=1)
+
+    def setUp(self):
+        cache.clear()
+        self.refresh = EduMentorTokenObtainPairSerializer.get_token(self.admin)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}")
+
+    def demote(self, other_worker=True):
+        profile = Profile.objects.get(user=self.admin)
+        profile.role = "STUDENT"
+        if other_worker:
+            with mock.patch("app.signals.set_cached_role"):
+                profile.save()
+        else:
+            profile.save()
+
+    def add_question(self):
+        return self.client.post(f"/api/quizzes/{self.module.quiz.id}/questions/add/", {
+            "question_text": "Q?", "option_a": "A", "option_b": "B",
+            "option_c": "C", "option_d": "D", "correct_option": "A",
+        }, format="json")
+
+    def analytics(self):
+        return self.client.get(f"/api/admin/courses/{self.course.id}/analytics/")
+
+    def test_writes_read_the_profile(self):
+        self.assertEqual(self.add_question().status_code, 201)
+        self.demote()
+
+        self.assertEqual(self.add_question().status_code, 403)
+
+    def test_reads_read_the_profile_with_a_per_process_cache(self):
+        self.assertEqual(self.analytics().status_code, 200)
+        self.demote()
+
+        self.assertEqual(self.analytics().status_code, 403)
+
+    def test_users_without_a_profile_must_be_enrolled(self):
+        nobody = User.objects.create_user(username="nobody", password="pw")
+        client = client_for(nobody)
+        video_id = self.videos[0].id
+
+        response = client.post(f"/api/video-progress/{video_id}/", {"watched_seconds": 10})
+        self.assertEqual(response.status_code, 403)
+
+        response = client.post("/api/video-progress/bulk/", {"items": [{"video_id": video_id}]}, format="json")
+        self.assertEqual(response.json()["results"][0]["error"], "You are not enrolled in this course")
+        self.assertFalse(VideoProgress.objects.exists())
+
+    def test_role_claim_is_not_trusted_by_default(self):
+        self.demote()
+        cache.clear()
+
+        self.assertEqual(self.analytics().status_code, 403)
+
+    @shared_cache()
+    @override_settings(JWT_STATELESS_READS=True)
+    def test_stateless_reads_trust_the_claim_for_reads_only(self):
+        self.demote()
+        cache.clear()
+
+        self.assertEqual(self.analytics().status_code, 200)
+        self.assertEqual(self.add_question().status_code, 403)
+
+        # ✅ a refresh re-reads the role instead of copying the old claim
+        self.assertNotIn("role", self.refresh.payload)
+        response = APIClient().post("/api/token/refresh/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.json()["access"])["role"], "STUDENT")
+        self.assertNotIn("role", RefreshToken(response.json()["refresh"]).payload)
+
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+        self.assertEqual(self.analytics().status_code, 403)
+
+    @override_settings(JWT_STATELESS_READS=True)
+    def test_stateless_reads_stay_off_with_a_per_process_cache(self):
+        self.demote()
+        cache.clear()
+
+        self.assertEqual(self.analytics().status_code, 403)
+        self.assertEqual(stateless_reads_cache(None)[0].id, "app.E002")
+
+    def test_claims_authentication_needs_a_shared_cache(self):
+        token = EduMentorTokenObtainPairSerializer.get_token(self.admin).access_token
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        with override_settings(JWT_STATELESS_READS=True):
+            user, _ = ClaimsJWTAuthentication().authenticate(request)
+            self.assertFalse(hasattr(user, "_from_token_claims"))
+
+            with shared_cache():
+                user, _ = ClaimsJWTAuthentication().authenticate(request)
+                self.assertTrue(user._from_token_claims)
+                self.assertEqual(stateless_reads_cache(None), [])
+
+    @shared_cache()
+    def test_shared_cache_carries_the_demotion(self):
+        self.assertEqual(self.add_question().status_code, 201)
+        self.demote(other_worker=False)
+
+        self.assertEqual(self.analytics().status_code, 403)
+        self.assertEqual(self.add_question().status_code, 403)
+
+
+class EnrollmentRevocationTests(TestCase):
+    """
+    ✅ A revoked enrollment or a deactivated user loses access within the
+    membership TTL with a per-process cache, and at once with a shared one
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN")
+        cls.student = make_user("student")
+        cls.course, _, _ = make_course(cls.admin, lessons=1)
+        cls.enrollment = Enrollment.objects.create(user=cls.student, course=cls.course)
+
+    def setUp(self):
+        cache.clear()
+        self.token = EduMentorTokenObtainPairSerializer.get_token(self.student).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def enrolled(self):
+        return self.client.get(f"/api/courses/{self.course.id}/enroll/").json()["enrolled"]
+
+    def revoke(self, other_worker=True):
+        self.enrollment.is_active = False
+        if other_worker:
+            with mock.patch("app.signals.invalidate_enrollments"):
+                self.enrollment.save()
+        else:
+            self.enrollment.save()
+
+    def test_per_process_cache_drops_revocations_within_seconds(self):
+        self.assertTrue(self.enrolled())
+        self.revoke()
+
+        later = time.time() + LOCAL_ENROLLMENT_CACHE_TTL + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertFalse(self.enrolled())
+
+    @shared_cache()
+    def test_shared_cache_revokes_at_once(self):
+        self.assertTrue(self.enrolled())
+        self.revoke(other_worker=False)
+
+        self.assertFalse(self.enrolled())
+
+    @shared_cache()
+    @override_settings(JWT_STATELESS_READS=True)
+    def test_deactivation_rejects_stateless_reads(self):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertTrue(ClaimsJWTAuthentication().authenticate(request)[0]._from_token_claims)
+
+        self.student.is_active = False
+        self.student.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            ClaimsJWTAuthentication().authenticate(request)
+
+
+class CertificateTests(TestCase):
+    """✅ Bulk issuing, the render pool, range header parsing and the download URL"""
+
+    def test_bulk_issue_counts_only_new_rows(self):
+        admin = make_user("teacher", role="ADMIN")
+        course, _, _ = make_course(admin, lessons=1)
+        students = [make_user(f"student{i}").id for i in range(3)]
+        new_id = certificates.new_certificate_id
+
+        def concurrent_issue(course_id):
+            # ✅ another request issues student 0's certificate mid-run
+            if not Certificate.objects.filter(user_id=students[0]).exists():
+                Certificate.objects.create(user_id=students[0], course_id=course_id, certificate_id="OTHER")
+            return new_id(course_id)
+
+        with mock.patch("app.certificates.new_certificate_id", side_effect=concurrent_issue):
+            self.assertEqual(bulk_issue(course.id, students), 2)
+
+        self.assertEqual(bulk_issue(course.id, students), 0)
+        self.assertEqual(Certificate.objects.filter(course=course).count(), 3)
+
+    @override_settings(CERTIFICATE_RENDER_WORKERS=1)
+    def test_broken_render_pool_is_replaced(self):
+        student = make_user("student")
+        course, _, _ = make_course(student, lessons=1)
+        certificate = Certificate.objects.create(user=student, course=course, certificate_id="CERT-1")
+        broken = mock.Mock(**{"submit.side_effect": BrokenProcessPool("child killed")})
+        fresh = mock.Mock()
+
+        with mock.patch.object(certificates, "_pool", broken), \
+                mock.patch("app.certificates.ProcessPoolExecutor", return_value=fresh) as executor:
+            certificates.request_render(certificate)
+            self.assertIs(certificates._pool, fresh)
+
+        certificates._pending.discard(certificate.id)
+        broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        fresh.submit.assert_called_once()
+        self.assertEqual(executor.call_args.kwargs["mp_context"].get_start_method(), "spawn")
+
+    def test_parse_byte_range(self):
+        cases = [
+            # header, size, expected
+            (None, 100, None),
+            ("", 100, None),
+            ("bytes=-", 100, None),
+            ("items=0-10", 100, None),
+            ("bytes=0-1,5-6", 100, None),
+            ("bytes=0-9", 100, (0, 9)),
+            (" bytes=10- ", 100, (10, 99)),
+            ("bytes=90-500", 100, (90, 99)),
+            ("bytes=99-99", 100, (99, 99)),
+            ("bytes=-10", 100, (90, 99)),
+            ("bytes=-500", 100, (0, 99)),
+            ("bytes=100-", 100, False),
+            ("bytes=100-200", 100, False),
+            ("bytes=9-3", 100, False),
+            ("bytes=-0", 100, False),
+            ("bytes=0-", 0, False),
+            ("bytes=-5", 0, False),
+        ]
+        for header, size, expected in cases:
+            with self.subTest(header=header, size=size):
+                self.assertEqual(views.parse_byte_range(header, size), expected)
+
+    def test_download_url_is_reversed(self):
+        student = make_user("student")
+        course, _, _ = make_course(student, lessons=1)
+        certificate = Certificate.objects.create(user=student, course=course, certificate_id="CERT-1")
+
+        response = client_for(student).get(f"/api/courses/{course.id}/certificate/")
+
+        self.assertEqual(
+            response.json()["download_url"],
+            f"http://testserver/api/certificates/{certificate.certificate_id}/download/",
+        )
+
+
+# ✅ certificates render inline: a pool callback thread would open its own
+# connection to the test database
+@override_settings(
+    QUERY_BUDGET_MODE="raise",
+    CERTIFICATE_RENDER_WORKERS=0,
+    CERTIFICATE_ROOT=tempfile.mkdtemp(prefix="edumentor-certificates-"),
+)
+class QueryBudgetTests(TestCase):
+    """
+    ✅ Every view with @query_budget must stay within it on a cold cache,
+    at a dataset size where an N+1 would blow the budget
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids = seed_benchmark_data({
+            "courses": 4,
+            "modules": 3,
+            "lessons": 4,
+            "questions": 3,
+            "users": 12,
+            "enrollments": 2,
+        })
+
+    def setUp(self):
+        self.clients = benchmark_clients(self.ids)
+        for client in self.clients.values():
+            client.raise_request_exception = True
+
+    def test_views_stay_within_their_budget(self):
+        checked = 0
+
+        for case in route_cases(self.ids):
+            if getattr(resolve(case["path"]).func, "query_budget", None) is None:
+                continue
+
+            with self.subTest(case["name"]):
+                cache.clear()
+                client = self.clients[case["role"]]
+                response = getattr(client, case["method"])(case["path"], case["data"], format="json")
+
+                self.assertLess(response.status_code, 500)
+                self.assertIn("X-Query-Count", response)
+                checked += 1
+
+        self.assertGreater(checked, 30)
+
+    def test_exceeding_the_budget_raises_with_fingerprints(self):
+        func = resolve("/api/videos/").func
+        original = func.query_budget
+        func.query_budget = 0
+
+        try:
+            with self.assertRaises(QueryBudgetExceeded) as raised:
+                self.clients["student"].get("/api/videos/")
+        finally:
+            func.query_budget = original
+
+        self.assertIn("app.views.video_list ran", str(raised.exception))
+        self.assertIn("(budget 0)", str(raised.exception))
+
+
+class AsyncViewTests(TestCase):
+    """
+    ✅ app.async_views must answer exactly like their app.views twins
+    (called directly: urls.py only routes to them when ASYNC_VIEWS is on)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids = seed_benchmark_data({"courses": 3, "modules": 2, "lessons": 3, "users": 4})
+
+    def get(self, view, path, user=None, **kwargs):
+        request = APIRequestFactory().get(path)
+        if user is not None:
+            force_authenticate(request, user=user)
+        return view(request, **kwargs)
+
+    def test_async_views_match_sync_views(self):
+        paths = [
+            ("course_list", "/api/courses/?page_size=2"),
+            ("course_modules", f"/api/courses/{self.ids['course_id']}/modules/"),
+            ("course_progress", f"/api/courses/{self.ids['course_id']}/progress/"),
+            ("lesson_detail", f"/api/lessons/{self.ids['lesson_id']}/"),
+            ("module_lessons", f"/api/modules/{self.ids['module_id']}/lessons/"),
+            ("my_enrollments", "/api/my-enrollments/"),
+            ("lesson_detail", "/api/lessons/0/"),
+        ]
+
+        for name, path in paths:
+            with self.subTest(path):
+                match = resolve(path.split("?")[0])
+
+                cache.clear()
+                response = self.get(
+                    async_to_sync(getattr(async_views, name)), path, self.ids["student"], **match.kwargs
+                )
+
+                cache.clear()
+                expected = self.get(getattr(views, name), path, self.ids["student"], **match.kwargs).render()
+
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.content, expected.content)
+
+    def test_unauthenticated_requests_get_drf_errors(self):
+        response = self.get(async_to_sync(async_views.my_enrollments), "/api/my-enrollments/")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(json.loads(response.content), {"detail": "Authentication credentials were not provided."})
+        self.assertIn("WWW-Authenticate", response)
+
+
+class CourseAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids = seed_benchmark_data({"courses": 3, "modules": 2, "lessons": 2, "users": 6})
+
+    def test_batch_matches_per_course_endpoints(self):
+        admin = benchmark_clients(self.ids)["admin"]
+        course_ids = [self.ids["course_id"] + 2, self.ids["course_id"], 0]
+
+        for batch, single in [
+            ("/api/admin/courses/analytics/", "/api/admin/courses/{}/analytics/"),
+            ("/api/courses/stats/", "/api/courses/{}/stats/"),
+        ]:
+            with self.subTest(batch):
+                response = admin.get(batch, {"ids": ",".join(map(str, course_ids))})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.json(),
+                    [admin.get(single.format(course_id)).json() for course_id in course_ids]
+                )
+
+    def test_invalid_ids_are_rejected(self):
+        admin = benchmark_clients(self.ids)["admin"]
+        response = admin.get("/api/admin/courses/analytics/", {"ids": "1,x"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class CourseStatsRollupTests(TestCase):
+    """
+    ✅ The incrementally maintained counters must equal a recount after
+    writes through every path (API, upserts, ORM saves/deletes, bulk)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids = seed_benchmark_data({"courses": 3, "modules": 2, "lessons": 2, "questions": 2, "users": 6})
+
+    def assertRollupsAreExact(self):
+        stored = {r.course_id: r for r in CourseStatsRollup.objects.all()}
+        for fresh in compute_course_rollups():
+            for counter in ROLLUP_COUNTERS:
+                self.assertEqual(
+                    getattr(stored[fresh.course_id], counter),
+                    getattr(fresh, counter),
+                    f"course {fresh.course_id} {counter}"
+                )
+
+    def test_counters_follow_every_write_path(self):
+        student = benchmark_clients(self.ids)["student"]
+        course_id, module_id = self.ids["course_id"], self.ids["module_id"]
+        other = Course.objects.exclude(id=course_id).order_by("id").first()
+
+        # API: enrollment, progress (single + bulk upsert), quiz upserts, certificate
+        student.post(f"/api/enroll/{other.id}/")
+        student.post(f"/api/video-progress/{self.ids['video_id']}/", {"watched_seconds": 300, "is_completed": True})
+        student.post("/api/video-progress/bulk/", {"items": [
+            {"video_id": video_id, "watched_seconds": 300, "is_completed": True}
+            for video_id in Module.objects.get(id=module_id).videos.values_list("id", flat=True)
+        ]}, format="json")
+        for answer in ("A", "B", "A"):
+            student.post(f"/api/modules/{module_id}/quiz/submit/", {
+                "answers": {str(self.ids["question_id"]): answer}
+            }, format="json")
+        student.post(f"/api/courses/{course_id}/certificate/")
+        self.assertRollupsAreExact()
+
+        # ORM: deactivate / delete / new course / module moved to another course
+        enrollment = Enrollment.objects.filter(course_id=course_id, is_active=True).first()
+        enrollment.is_active = False
+        enrollment.save()
+        QuizAttempt.objects.filter(course_id=course_id).first().delete()
+        VideoProgress.objects.filter(course_id=course_id, is_completed=True).first().delete()
+        Course.objects.create(title="New", description="d", created_by=self.ids["admin"])
+
+        module = Module.objects.get(id=module_id)
+        module.course = other
+        module.save()
+        self.assertRollupsAreExact()
+
+        # bulk certificate issue + cascades
+        bulk_issue(other.id, list(Enrollment.objects.filter(course=other).values_list("user_id", flat=True)))
+        self.ids["student"].delete()
+        self.assertRollupsAreExact()
+
+    def test_reads_rebuild_missing_rows(self):
+        CourseStatsRollup.objects.filter(course_id=self.ids["course_id"]).delete()
+        admin = benchmark_clients(self.ids)["admin"]
+
+        response = admin.get(f"/api/admin/courses/{self.ids['course_id']}/analytics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.json()["enrollments"], 0)
+        self.assertTrue(CourseStatsRollup.objects.filter(course_id=self.ids["course_id"]).exists())
+
+
+class CascadeDeleteTests(TestCase):
+    """
+    ✅ Deleting a course or a user costs the same whatever the number of
+    rows under it (no per-row counter updates), and leaves exact rollups
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("teacher", role="ADMIN")
+        cls.students = [make_user(f"student{i}") for i in range(5)]
+
+    def course_with_activity(self, students):
+        course, module, videos = make_course(self.admin, title=f"Course {len(students)}", lessons=2, questions=1)
+        for student in students:
+            Enrollment.objects.create(user=student, course=course)
+            for video in videos:
+                VideoProgress.objects.create(user=student, video=video, watched_seconds=60, is_completed=True)
+            QuizAttempt.objects.create(user=student, quiz=module.quiz, score=1, passed=True)
+            Certificate.objects.create(user=student, course=course, certificate_id=f"C-{course.id}-{student.id}")
+        return course
+
+    def queries_to_delete(self, instance):
+        with CaptureQueriesContext(connection) as queries:
+            instance.delete()
+        return len(queries)
+
+    def test_course_delete_cost_does_not_grow_with_rows(self):
+        small = self.course_with_activity(self.students[:1])
+        large = self.course_with_activity(self.students)
+
+        self.assertEqual(self.queries_to_delete(small), self.queries_to_delete(large))
+        self.assertFalse(CourseStatsRollup.objects.filter(course_id__in=[small.id, large.id]).exists())
+
+    def test_user_delete_cost_does_not_grow_with_rows(self):
+        for size in (1, 3, 5):
+            self.course_with_activity(self.students[:size])
+
+        # student4 is in one course, student0 in all three
+        self.assertEqual(self.queries_to_delete(self.students[4]), self.queries_to_delete(self.students[0]))
+
+        stored = {r.course_id: r for r in CourseStatsRollup.objects.all()}
+        for fresh in compute_course_rollups():
+            for counter in ROLLUP_COUNTERS:
+                self.assertEqual(getattr(stored[fresh.course_id], counter), getattr(fresh, counter))
+        self.assertFalse(LeaderboardEntry.objects.filter(user_id__in=[self.students[0].id, self.students[4].id]).exists())
+
+
+class ActivityHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids = seed_benchmark_data({"courses": 2, "modules": 1, "lessons": 2, "users": 4})
+
+        # ✅ Monday 10:00 UTC: enrollments 10:10, progress 10:00, attempts 12:00, certificates Tuesday
+        cls.monday = datetime(2026, 1, 5, 10, tzinfo=dt_timezone.utc)
+        Enrollment.objects.update(enrolled_at=cls.monday + timedelta(minutes=10))
+        VideoProgress.objects.update(updated_at=cls.monday)
+        QuizAttempt.objects.update(attempted_at=cls.monday + timedelta(hours=2))
+        Certificate.objects.update(issued_at=cls.monday + timedelta(days=1, minutes=30))
+
+    def total(self, metric):
+        return sum(ActivityBucket.objects.filter(metric=metric).values_list("count", flat=True))
+
+    def test_rollup_is_incremental(self):
+        written = roll_up_activity(now=self.monday + timedelta(days=3))
+
+        self.assertEqual(written["enrollments"], Course.objects.count())
+        self.assertEqual(self.total("enrollments"), Enrollment.objects.count())
+        self.assertEqual(self.total("certificates"), Certificate.objects.count())
+        self.assertEqual(
+            set(ActivityBucket.objects.filter(metric="first_quiz_attempts").values_list("hour", flat=True)),
+            {self.monday + timedelta(hours=2)}
+        )
+
+        # ✅ nothing new → nothing appended; new rows land once, after their hour closes
+        self.assertEqual(sum(roll_up_activity(now=self.monday + timedelta(days=3)).values()), 0)
+
+        # (history is append-only: deleting rows doesn't remove their buckets)
+        enrolled = self.total("enrollments")
+        Enrollment.objects.filter(user=self.ids["student"]).delete()
+        Enrollment.objects.create(user=self.ids["student"], course_id=self.ids["course_id"])
+
+        roll_up_activity()
+        self.assertEqual(self.total("enrollments"), enrolled)
+
+        roll_up_activity(now=timezone.now() + timedelta(hours=2))
+        self.assertEqual(self.total("enrollments"), enrolled + 1)
+        self.assertEqual(ActivityWatermark.objects.count(), 4)
+
+    def test_endpoint_downsamples_ranges(self):
+        roll_up_activity(now=self.monday + timedelta(days=3))
+        admin = benchmark_clients(self.ids)["admin"]
+        course_id = self.ids["course_id"]
+
+        response = admin.get("/api/admin/activity/", {
+            "metrics": "enrollments,certificates",
+            "course": course_id,
+            "start": "2026-01-05T06:00:00",
+            "end": "2026-01-08",
+            "interval": "day",
+        })
+        self.assertEqual(response.status_code, 200)
+        series = response.json()["series"]
+
+        self.assertEqual(
+            [point["count"] for point in series["enrollments"]],
+            [Enrollment.objects.filter(course_id=course_id).count(), 0, 0]
+        )
+        self.assertEqual([point["count"] for point in series["certificates"]], [0, 1, 0])
+        self.assertEqual(series["enrollments"][0]["bucket"], "2026-01-05T00:00:00Z")
+
+        response = admin.get("/api/admin/activity/", {"start": "2026-01-05", "end": "2026-01-08"})
+        self.assertEqual(response.json()["interval"], "hour")
+        self.assertEqual(len(response.json()["series"]["active_progress_rows"]), 72)
+
+        for params in ({"metrics": "logins"}, {"start": "yesterday"}, {"interval": "hour", "start": "2020-01-01"}):
+            with self.subTest(params):
+                self.assertEqual(admin.get("/api/admin/activity/", params).status_code, 400)
+
+
+class LeaderboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids = seed_benchmark_data({"courses": 2, "modules": 1, "lessons": 1, "questions": 1, "users": 12})
+
+    def assertLeaderboardIsExact(self):
+        stored = set(LeaderboardEntry.objects.values_list(
+            "course_id", "user_id", "total_score", "quizzes", "scored_at"
+        ))
+        fresh = set(QuizAttempt.objects.values_list("course_id", "user_id").annotate(
+            total=Sum("score"), quizzes=Count("pk"), scored_at=Max("scored_at")
+        ).order_by())
+        self.assertEqual(stored, fresh)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_ties_rank_by_who_scored_first(self):
+        course_id, question_id = self.ids["course_id"], str(self.ids["question_id"])
+        # two students who haven't scored yet, the later-created one submits first
+        first, second = (
+            QuizAttempt.objects.filter(course_id=course_id, score=0).exclude(user=self.ids["student"])
+            .order_by("-user_id").values_list("user_id", flat=True)[:2]
+        )
+        for user_id in (first, second):
+            self.client_for(User.objects.get(id=user_id)).post(
+                f"/api/modules/{self.ids['module_id']}/quiz/submit/", {"answers": {question_id: "A"}}, format="json"
+            )
+        self.assertLeaderboardIsExact()
+
+        response = self.client_for(User.objects.get(id=second)).get(
+            f"/api/courses/{course_id}/leaderboard/", {"page_size": 100}
+        )
+        self.assertEqual(response.status_code, 200)
+        results, me = response.json()["results"], response.json()["me"]
+
+        self.assertEqual([row["rank"] for row in results], list(range(1, len(results) + 1)))
+        self.assertEqual(results, sorted(results, key=lambda row: (-row["avg_score"], row["scored_at"])))
+        ranks = {row["username"]: row["rank"] for row in results}
+        first_name, second_name = (User.objects.get(id=user_id).username for user_id in (first, second))
+        self.assertEqual(ranks[second_name], ranks[first_name] + 1)
+        self.assertEqual(me["rank"], ranks[second_name])
+        self.assertNotIn("user_id", me)
+        self.assertFalse(any("user_id" in row for row in results))
+
+        # ✅ my rank off the current page comes from a COUNT
+        page = self.client_for(User.objects.get(id=second)).get(
+            f"/api/courses/{course_id}/leaderboard/", {"page_size": 1, "page": len(results)}
+        ).json()
+        self.assertEqual(page["results"][0]["rank"], len(results))
+        self.assertEqual(page["me"], me)
+
+        # ✅ a rebuild from scratch ranks the same as the incremental writes
+        stored = list(LeaderboardEntry.objects.order_by("pk").values("course_id", "user_id", "scored_at"))
+        LeaderboardEntry.objects.all().delete()
+        refresh_leaderboards()
+        rebuilt = list(LeaderboardEntry.objects.values("course_id", "user_id", "scored_at"))
+        self.assertCountEqual(rebuilt, stored)
+
+    def test_orm_writes_and_top_students(self):
+        QuizAttempt.objects.filter(course_id=self.ids["course_id"]).first().delete()
+        attempt = QuizAttempt.objects.filter(course_id=self.ids["course_id"]).first()
+        attempt.score += 1
+        attempt.save()
+        module = Module.objects.get(id=self.ids["module_id"])
+        module.course = Course.objects.exclude(id=self.ids["course_id"]).first()
+        module.save()
+        admin = benchmark_clients(self.ids)["admin"]
+        self.ids["student"].delete()
+        self.assertLeaderboardIsExact()
+
+        course_id = module.course_id
+        top = admin.get(f"/api/admin/courses/{course_id}/top-students/", {"n": 3}).json()
+        board = admin.get(f"/api/courses/{course_id}/leaderboard/", {"page_size": 3}).json()["results"]
+
+        self.assertEqual([row["user__username"] for row in top], [row["username"] for row in board])
+        self.assertEqual(admin.get(f"/api/admin/courses/{course_id}/top-students/", {"n": 0}).status_code, 400)
+        self.assertEqual(admin.get("/api/courses/0/leaderboard/").status_code, 404)
+
+    def test_only_enrolled_students_and_admins_see_it(self):
+        course_id = self.ids["course_id"]
+        outsider = make_user("outsider")
+
+        response = self.client_for(outsider).get(f"/api/courses/{course_id}/leaderboard/")
+        self.assertEqual(response.status_code, 403)
+
+        admin = benchmark_clients(self.ids)["admin"]
+        results = admin.get(f"/api/courses/{course_id}/leaderboard/").json()["results"]
+        self.assertTrue(all("user_id" in row for row in results))
+
+
+class FingerprintTests(TestCase):
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "app_module" WHERE "id" IN (%s, %s, %s) AND title = \'x\''),
+            'SELECT * FROM "app_module" WHERE "id" IN (...) AND title = ?',
+        )
+
+    def test_report_groups_repeated_queries(self):
+        queries = [f'SELECT * FROM "app_module" WHERE "id" = {i}' for i in range(5)]
+        report = budget_report("app.views.video_list", queries + ["SELECT 1"], 2)
+
+        self.assertIn("ran 6 queries (budget 2)", report)
+        self.assertIn('5× SELECT * FROM "app_module" WHERE "id" = ?', report)
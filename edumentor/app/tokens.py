@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Enrollment
+from .cache import enrollment_version, set_cached_role
+
+# ✅ users enrolled in more courses than this get no "enr" claim
+# (permissions fall back to the database)
+MAX_ENROLLMENT_CLAIMS = 200
+
+
+def enrollment_claims(user_id):
+    """
+    ✅ {"enr": [active course ids], "enr_v": version}
+    The version is read BEFORE the ids, so a concurrent enrollment change
+    bumps it past the claim instead of being silently missed.
+    """
+    version = enrollment_version(user_id)
+
+    course_ids = list(
+        Enrollment.objects.filter(
+            user_id=user_id,
+            is_active=True
+        ).order_by("course_id").values_list("course_id", flat=True)[:MAX_ENROLLMENT_CLAIMS + 1]
+    )
+
+    if len(course_ids) > MAX_ENROLLMENT_CLAIMS:
+        return {}
+
+    return {"enr": course_ids, "enr_v": version}
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    ✅ A plain refresh token whose access tokens carry the user's CURRENT
+    role and enrollments. The claims are never stored on the refresh
+    token itself: simplejwt copies every refresh claim into each access
+    token (and ROTATE_REFRESH_TOKENS keeps them on the rotated token), so
+    they would outlive ACCESS_TOKEN_LIFETIME for as long as the client
+    keeps refreshing.
+    """
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user_id = self[api_settings.USER_ID_CLAIM]
+
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values("username", "is_staff", "profile__role").first()
+        if user is None:
+            return access
+
+        if user["profile__role"] is not None:
+            access["role"] = user["profile__role"]
+            set_cached_role(user_id, user["profile__role"])
+
+        access["username"] = user["username"]
+        access["staff"] = user["is_staff"]
+
+        for claim, value in enrollment_claims(user_id).items():
+            access[claim] = value
+
+        return access
+
+
+class EduMentorTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    ✅ Access tokens carry the user's role and active enrollments, so read-only
+    requests can be authorised without loading User / Profile / Enrollment.
+    Used by login() and the token/ endpoint (SIMPLE_JWT TOKEN_OBTAIN_SERIALIZER).
+    """
+    token_class = ClaimsRefreshToken
+
+
+class EduMentorTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    ✅ token/refresh/ re-reads the claims for every new access token
+    (SIMPLE_JWT TOKEN_REFRESH_SERIALIZER)
+    """
+    token_class = ClaimsRefreshToken
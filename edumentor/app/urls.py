@@ -1,5 +1,6 @@
+from django.conf import settings
 from django.urls import path
-from app import views
+from app import async_views, views
 from app.views import register,login,admin_only_view,course_view
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from app.views import module_view
@@ -9,6 +10,9 @@ from app.views import enrollment_view
 from app.views import create_quiz, get_quiz,submit_quiz, add_question, course_progress,course_analytics,top_students,course_pass_fail_stats,admin_dashboard_stats,admin_courses,admin_course_detail,admin_users,toggle_user_active,admin_modules,admin_module_detail,admin_lessons,admin_add_lesson,admin_edit_lesson,admin_delete_lesson,module_list,course_list,admin_module_detail,course_modules,admin_update_quiz,video_list,lesson_video_urls,course_stats,lesson_list,admin_courses_quiz_stats
 
 
+# ✅ hot read endpoints: async versions under ASGI (settings.ASYNC_VIEWS)
+read_views = async_views if settings.ASYNC_VIEWS else views
+
 
 urlpatterns = [
 
@@ -27,11 +31,12 @@ urlpatterns = [
     # ==========================================================
     # ✅ PUBLIC COURSES
     # ==========================================================
-    path("courses/", views.course_list),
+    path("courses/", read_views.course_list),
     path("courses/<int:course_id>/", views.course_detail),
 
     # Course Modules
-    path("courses/<int:course_id>/modules/", views.course_modules),
+    path("courses/<int:course_id>/modules/", read_views.course_modules),
+    path("courses/<int:course_id>/outline/", views.course_outline),
     path("courses/<int:course_id>/modules/<int:module_id>/", views.course_module_detail),
 
     # ==========================================================
@@ -45,10 +50,10 @@ urlpatterns = [
     # ✅ LESSONS (Global)
     # ==========================================================
     path("lessons/", views.lesson_list),
-    path("lessons/<int:lesson_id>/", views.lesson_detail),
+    path("lessons/<int:lesson_id>/", read_views.lesson_detail),
 
     # Module lessons
-    path("modules/<int:module_id>/lessons/", views.module_lessons),
+    path("modules/<int:module_id>/lessons/", read_views.module_lessons),
     path("modules/<int:module_id>/completed-lessons/", views.module_completed_lessons),
 
     # ==========================================================
@@ -66,13 +71,14 @@ urlpatterns = [
 
     # Video Progress
     path("video-progress/<int:video_id>/", views.video_progress_view),
+    path("video-progress/bulk/", views.bulk_video_progress),
 
     # ==========================================================
     # ✅ ENROLLMENT + MY COURSES
     # ==========================================================
     path("courses/<int:course_id>/enroll/", views.enrollment_view),
     path("enroll/<int:course_id>/", views.enroll_course, name="enroll_course"),
-    path("my-enrollments/", views.my_enrollments, name="my_enrollments"),
+    path("my-enrollments/", read_views.my_enrollments, name="my_enrollments"),
 
     # ==========================================================
     # ✅ QUIZ SYSTEM
@@ -88,15 +94,20 @@ urlpatterns = [
     # ==========================================================
     # ✅ COURSE PROGRESS + STATS
     # ==========================================================
-    path("courses/<int:course_id>/progress/", views.course_progress),
+    path("courses/<int:course_id>/progress/", read_views.course_progress),
+    path("courses/progress/", views.course_progress_batch),
+    path("courses/<int:course_id>/certificate/", views.course_certificate),
+    path("certificates/<str:certificate_id>/download/", views.download_certificate, name="download_certificate"),
 
     # ✅ IMPORTANT: keep ONLY ONE stats endpoint
     path("courses/<int:course_id>/stats/", views.course_stats),
+    path("courses/stats/", views.course_stats_batch),
 
     # ==========================================================
     # ✅ ADMIN DASHBOARD
     # ==========================================================
     path("admin/dashboard/", views.admin_dashboard_stats),
+    path("admin/activity/", views.admin_activity),
 
     # ==========================================================
     # ✅ ADMIN USERS
@@ -112,8 +123,10 @@ urlpatterns = [
 
     # Course Analytics (Admin)
     path("admin/courses/<int:course_id>/analytics/", views.course_analytics),
+    path("admin/courses/analytics/", views.course_analytics_batch),
     path("admin/courses/<int:course_id>/top-students/", views.top_students),
     path("courses/<int:course_id>/passfail/", views.course_pass_fail_stats),
+    path("courses/<int:course_id>/leaderboard/", views.course_leaderboard),
 
     # ==========================================================
     # ✅ ADMIN MODULES + LESSONS
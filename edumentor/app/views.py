@@ -1,31 +1,46 @@
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
-from .permissions import IsAdmin, IsEnrolledStudent
+from .permissions import IsAdmin, IsEnrolledStudent, get_role, is_enrolled, enrolled_courses
 from .permissions import IsEnrolledViaModule
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import EduMentorTokenObtainPairSerializer
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAdminUser
 from django.contrib.auth.models import User
 from .models import Profile
 from .models import Course, Module, Video, Enrollment,Lesson, VideoProgress
 from .models import Quiz, Question, QuizAttempt
-from .serializers import RegisterSerializer,CourseSerializer, ModuleSerializer, VideoSerializer,VideoProgressSerializer,EnrollmentSerializer,QuizSerializer,QuestionSerializer,QuizAttemptSerializer,StudentQuestionSerializer,AdminQuestionSerializer,UserSerializer,LessonSerializer,MyEnrollmentSerializer
+from .pagination import CourseCursorPagination, LeaderboardPagination
+from .query_budget import query_budget
+from .cache import get_course_outline, get_module_quiz, get_answer_key, get_quiz_payload, invalidate_course_progress
+from .stats import (
+    course_analytics_rows, course_pass_fail_rows, course_quiz_stats, course_stats_rows,
+    record_quiz_attempt, total_enrollments,
+)
+from .activity import ACTIVITY_SOURCES, INTERVALS, MAX_ACTIVITY_POINTS, activity_series, pick_interval, point_count, rolled_up_to
+from .leaderboard import leaderboard, leaderboard_row, my_rank, record_quiz_score
+from .progress import get_progress_buffer, parse_progress, upsert_progress, get_course_progress
+from .serializers import RegisterSerializer,CourseSerializer, ModuleSerializer, VideoSerializer,VideoProgressSerializer,EnrollmentSerializer,QuizSerializer,QuestionSerializer,QuizAttemptSerializer,AdminQuestionSerializer,UserSerializer,LessonSerializer,MyEnrollmentSerializer
 from django.contrib.auth import get_user_model
+from django.conf import settings
 
 
 
-import uuid
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
+import os
+import re
+from django.http import HttpResponse, FileResponse
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import parse_etags
 from .models import Certificate
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.colors import black, HexColor
-from reportlab.lib.units import inch
+from .certificates import certificate_file, issue_certificate, request_render
 
 
 
@@ -46,6 +61,7 @@ def register(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(4)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login(request):
@@ -63,7 +79,8 @@ def login(request):
     print("AUTH RESULT:", user)
 
     if user is not None:
-        refresh = RefreshToken.for_user(user)
+        # ✅ role + enrolled courses travel in the token (see app/tokens.py)
+        refresh = EduMentorTokenObtainPairSerializer.get_token(user)
 
         return Response({
             'refresh': str(refresh),
@@ -87,7 +104,7 @@ def protected_view(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def admin_only_view(request):
-    if request.user.profile.role != 'ADMIN':
+    if get_role(request) != 'ADMIN':
         return Response(
             {"error": "Admin access only"},
             status=403
@@ -97,7 +114,7 @@ def admin_only_view(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_course(request):
-    if request.user.profile.role != 'ADMIN':
+    if get_role(request) != 'ADMIN':
         return Response(
             {"error": "Only admin can create courses"},
             status=403
@@ -112,6 +129,72 @@ def create_course(request):
 
 
 
+def course_catalog_context(request, fields=None):
+    """
+    ✅ Serializer context for course lists: the user's enrolled course IDs
+    are fetched once so is_enrolled doesn't query per course
+    """
+    context = {'request': request}
+
+    if fields and 'is_enrolled' not in fields:
+        return context
+
+    if request.user.is_authenticated:
+        context['enrolled_course_ids'] = set(
+            Enrollment.objects.filter(user=request.user)
+            .values_list('course_id', flat=True)
+        )
+
+    return context
+
+
+def requested_course_fields(request):
+    """
+    ✅ Sparse fieldset from ?fields=id,title (unknown names are ignored)
+    """
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+
+    allowed = CourseSerializer.Meta.fields
+    return [f for f in (name.strip() for name in fields.split(',')) if f in allowed] or None
+
+
+def filter_courses(request, courses, fields=None):
+    """
+    ✅ Catalog filters: ?category=Design&is_premium=true
+    """
+    category = request.query_params.get('category')
+    if category:
+        courses = courses.filter(category=category)
+
+    is_premium = request.query_params.get('is_premium')
+    if is_premium is not None:
+        courses = courses.filter(is_premium=is_premium.lower() in ('1', 'true', 'yes'))
+
+    # ✅ only load the columns we serialize (+ the keyset columns)
+    if fields:
+        columns = {'id', 'created_at'} | {f for f in fields if f != 'is_enrolled'}
+        courses = courses.only(*columns)
+
+    return courses
+
+
+def paginated_courses(request, courses):
+    fields = requested_course_fields(request)
+    courses = filter_courses(request, courses, fields)
+
+    paginator = CourseCursorPagination()
+    page = paginator.paginate_queryset(courses, request)
+    serializer = CourseSerializer(
+        page,
+        many=True,
+        fields=fields,
+        context=course_catalog_context(request, fields)
+    )
+    return paginator.get_paginated_response(serializer.data)
+
+
 @api_view(['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def course_view(request, course_id=None):
@@ -133,32 +216,33 @@ def course_view(request, course_id=None):
         serializer = CourseSerializer(
             courses,
             many=True,
-            context={'request': request}
+            context=course_catalog_context(request)
         )
         return Response(serializer.data)
 
 
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def course_list(request):
-    courses = Course.objects.all().order_by("-id")
-    serializer = CourseSerializer(courses, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    # ✅ ?cursor=...&page_size=20&ordering=-created_at&category=...&is_premium=...&fields=...
+    return paginated_courses(request, Course.objects.all())
 
 
 # 🔹 SINGLE COURSE DETAIL
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def course_detail(request, course_id):
     course = get_object_or_404(Course, id=course_id)
     serializer = CourseSerializer(
         course,
-        context={'request': request}
+        context=course_catalog_context(request)
     )
     return Response(serializer.data)
     # 🔹 POST → Create course (ADMIN only)
     if request.method == 'POST':
-        if request.user.profile.role != 'ADMIN':
+        if get_role(request) != 'ADMIN':
             return Response(
                 {"error": "Only admin can create courses"},
                 status=status.HTTP_403_FORBIDDEN
@@ -173,7 +257,7 @@ def course_detail(request, course_id):
 
     # 🔹 PUT / PATCH → Update course (ADMIN only)
     if request.method in ['PUT', 'PATCH']:
-        if request.user.profile.role != 'ADMIN':
+        if get_role(request) != 'ADMIN':
             return Response(
                 {"error": "Only admin can update courses"},
                 status=status.HTTP_403_FORBIDDEN
@@ -201,7 +285,7 @@ def course_detail(request, course_id):
 
     # 🔹 DELETE → Delete course (ADMIN only)
     if request.method == 'DELETE':
-        if request.user.profile.role != 'ADMIN':
+        if get_role(request) != 'ADMIN':
             return Response(
                 {"error": "Only admin can delete courses"},
                 status=status.HTTP_403_FORBIDDEN
@@ -221,18 +305,29 @@ def course_detail(request, course_id):
             status=status.HTTP_200_OK
         )
 
+@query_budget(4)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def course_modules(request, course_id):
     course = get_object_or_404(Course, id=course_id)
 
-    modules = Module.objects.filter(course=course).order_by("order")
-    serializer = ModuleSerializer(modules, many=True)
-    print("✅ course_modules view called")
+    # ✅ same module → lesson tree as /outline/, served from cache
+    return Response(get_course_outline(course.id), status=status.HTTP_200_OK)
 
 
-    return Response(serializer.data, status=status.HTTP_200_OK)
+@query_budget(4)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def course_outline(request, course_id):
+    course = get_object_or_404(Course, id=course_id)
+
+    return Response({
+        "course_id": course.id,
+        "title": course.title,
+        "modules": get_course_outline(course.id),
+    }, status=status.HTTP_200_OK)
 
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def course_module_detail(request, course_id, module_id):
@@ -245,10 +340,10 @@ def course_module_detail(request, course_id, module_id):
 @api_view(['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def module_view(request, course_id):
-    user = request.user
+    role = get_role(request)
 
     # 🔐 SAFETY: profile may not exist
-    if not hasattr(user, "profile"):
+    if role is None:
         return Response(
             {"detail": "User profile not found"},
             status=status.HTTP_403_FORBIDDEN
@@ -263,11 +358,11 @@ def module_view(request, course_id):
         )
 
     # ✅ STUDENT → only if enrolled (optional rule)
-    if user.profile.role == "STUDENT":
+    if role == "STUDENT":
         modules = Module.objects.filter(course=course).order_by("order")
 
     # ✅ ADMIN → see all modules
-    elif user.profile.role == "ADMIN":
+    elif role == "ADMIN":
         modules = Module.objects.filter(course=course).order_by("order")
 
     else:
@@ -281,7 +376,7 @@ def module_view(request, course_id):
 
     # 🔹 POST → create module (ADMIN only)
     if request.method == 'POST':
-        if request.user.profile.role != 'ADMIN':
+        if get_role(request) != 'ADMIN':
             return Response(
                 {"error": "Only admin can create modules"},
                 status=status.HTTP_403_FORBIDDEN
@@ -299,7 +394,7 @@ def module_view(request, course_id):
 
     # 🔹 PUT / PATCH → update module (ADMIN only)
     if request.method in ['PUT', 'PATCH']:
-        if request.user.profile.role != 'ADMIN':
+        if get_role(request) != 'ADMIN':
             return Response(
                 {"error": "Only admin can update modules"},
                 status=status.HTTP_403_FORBIDDEN
@@ -324,7 +419,7 @@ def module_view(request, course_id):
 
     # 🔹 DELETE → delete module (ADMIN only)
     if request.method == 'DELETE':
-        if request.user.profile.role != 'ADMIN':
+        if get_role(request) != 'ADMIN':
             return Response(
                 {"error": "Only admin can delete modules"},
                 status=status.HTTP_403_FORBIDDEN
@@ -352,7 +447,7 @@ def module_detail(request, course_id, module_id):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
     # 🔐 Enrollment check for students
-    if request.user.profile.role == 'STUDENT':
+    if get_role(request) == 'STUDENT':
         is_enrolled = Enrollment.objects.filter(
             user=request.user,
             course=module.course,
@@ -370,22 +465,17 @@ def module_detail(request, course_id, module_id):
 
 
 
+@query_budget(4)
 @api_view(['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def video_view(request, course_id=None, module_id=None, video_id=None):
     
-    if request.user.profile.role == 'STUDENT':
-        is_enrolled = Enrollment.objects.filter(
-        user=request.user,
-        course_id=course_id,
-        is_active=True
-    ).exists()
-
-    if not is_enrolled:
-        return Response(
-            {"error": "You are not enrolled in this course"},
-            status=403
-        )
+    if get_role(request) != 'ADMIN':
+        if not is_enrolled(request, course_id):
+            return Response(
+                {"error": "You are not enrolled in this course"},
+                status=403
+            )
 
 
     # 🔹 GET → list videos OR single video
@@ -411,7 +501,7 @@ def video_view(request, course_id=None, module_id=None, video_id=None):
 
     # 🔹 POST → create video (ADMIN only)
     if request.method == 'POST':
-        if request.user.profile.role != 'ADMIN':
+        if get_role(request) != 'ADMIN':
             return Response({"error": "Only admin can add videos"}, status=403)
 
         data = request.data.copy()
@@ -428,7 +518,7 @@ def video_view(request, course_id=None, module_id=None, video_id=None):
 
     # 🔹 PUT / PATCH → update video (ADMIN only)
     if request.method in ['PUT', 'PATCH']:
-        if request.user.profile.role != 'ADMIN':
+        if get_role(request) != 'ADMIN':
             return Response({"error": "Only admin can update videos"}, status=403)
 
         try:
@@ -450,7 +540,7 @@ def video_view(request, course_id=None, module_id=None, video_id=None):
 
     # 🔹 DELETE → delete video (ADMIN only)
     if request.method == 'DELETE':
-        if request.user.profile.role != 'ADMIN':
+        if get_role(request) != 'ADMIN':
             return Response({"error": "Only admin can delete videos"}, status=403)
 
         try:
@@ -461,10 +551,11 @@ def video_view(request, course_id=None, module_id=None, video_id=None):
         video.delete()
         return Response({"message": "Video deleted successfully"})
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def video_list(request):
-    videos = Video.objects.all().order_by("module_id", "order")
+    videos = Video.objects.select_related("module").order_by("module_id", "order")
     data = [
         {
             "id": v.id,
@@ -478,6 +569,7 @@ def video_list(request):
     return Response(data)
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def lesson_video_urls(request):
@@ -487,49 +579,88 @@ def lesson_video_urls(request):
             "lesson_id": l.id,
             "title": l.title,
             "lesson_video_url": l.video_url,
-            "video_id": l.video.id if l.video else None,
+            "video_id": l.video_id,
         }
         for l in lessons
     ]
     return Response(data)
 
 
+@query_budget(10)
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def video_progress_view(request, video_id):
 
-    course_id = Video.objects.get(id=video_id).module.course_id
+    # ✅ one query: video → module → course
+    course_id = Video.objects.filter(
+        id=video_id
+    ).values_list("module__course_id", flat=True).first()
 
-    if request.user.profile.role == 'STUDENT':
-        if not Enrollment.objects.filter(
-            user=request.user,
-            course_id=course_id,
-            is_active=True
-        ).exists():
+    if course_id is None:
+        return Response({"error": "Video not found"}, status=404)
+
+    # ✅ everyone but admins (users without a profile too) must be enrolled
+    if get_role(request) != 'ADMIN':
+        if not is_enrolled(request, course_id):
             return Response(
                 {"error": "You are not enrolled in this course"},
                 status=403
             )
 
+    # ✅ None unless VIDEO_PROGRESS_BUFFER is enabled
+    buffer = get_progress_buffer()
+
     # 🔹 GET → get progress of a video (resume playback)
     if request.method == 'GET':
         progress, _ = VideoProgress.objects.get_or_create(
             user=request.user,
-            video_id=video_id
+            video_id=video_id,
+            defaults={"course_id": course_id}
         )
-        serializer = VideoProgressSerializer(progress)
-        return Response(serializer.data)
+        data = VideoProgressSerializer(progress).data
+
+        # ✅ include heartbeats that are still waiting to be flushed
+        pending = buffer.pending(request.user.id, video_id) if buffer else None
+        if pending:
+            data["watched_seconds"] = max(data["watched_seconds"], pending[0])
+            data["is_completed"] = data["is_completed"] or pending[1]
+
+        return Response(data)
+
+    # 🔹 POST → buffered heartbeat (written to DB in batches)
+    if request.method == 'POST' and buffer is not None:
+        try:
+            watched_seconds, is_completed = parse_progress(request.data)
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid progress data"}, status=400)
+
+        watched_seconds, is_completed = buffer.add(
+            request.user.id, video_id, watched_seconds, is_completed
+        )
+
+        return Response({
+            "user": request.user.id,
+            "video": video_id,
+            "watched_seconds": watched_seconds,
+            "is_completed": is_completed,
+            "buffered": True
+        }, status=202)
 
     # 🔹 POST → update progress
     if request.method == 'POST':
+        # ✅ real bools/ints ("true" from a form would defeat the
+        # completion change detection in app.signals)
+        try:
+            watched_seconds, is_completed = parse_progress(request.data)
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid progress data"}, status=400)
+
         progress, _ = VideoProgress.objects.get_or_create(
             user=request.user,
-            video_id=video_id
+            video_id=video_id,
+            defaults={"course_id": course_id}
         )
 
-        watched_seconds = request.data.get('watched_seconds', 0)
-        is_completed = request.data.get('is_completed', False)
-
         progress.watched_seconds = watched_seconds
         progress.is_completed = is_completed
         progress.save()
@@ -538,6 +669,93 @@ def video_progress_view(request, video_id):
         return Response(serializer.data)
 
 
+MAX_BULK_PROGRESS_ITEMS = 500
+
+
+@query_budget(13)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_video_progress(request):
+    """
+    ✅ Sync many progress records in one request (offline resume / batching)
+    Body: {"items": [{"video_id": 1, "watched_seconds": 120, "is_completed": false}, ...]}
+    Returns one result per item, in the same order.
+    """
+    items = request.data.get("items") if isinstance(request.data, dict) else request.data
+
+    if not isinstance(items, list):
+        return Response({"error": "items must be a list"}, status=400)
+
+    if len(items) > MAX_BULK_PROGRESS_ITEMS:
+        return Response(
+            {"error": f"At most {MAX_BULK_PROGRESS_ITEMS} items per request"},
+            status=400
+        )
+
+    results = []
+    parsed = []
+
+    for item in items:
+        try:
+            video_id = int(item["video_id"])
+            watched_seconds, is_completed = parse_progress(item)
+        except (KeyError, TypeError, ValueError):
+            results.append({"video_id": item.get("video_id") if isinstance(item, dict) else None,
+                            "status": "error", "error": "Invalid progress data"})
+            parsed.append(None)
+            continue
+
+        results.append({"video_id": video_id, "status": "ok"})
+        parsed.append((video_id, watched_seconds, is_completed))
+
+    video_ids = {p[0] for p in parsed if p}
+
+    # ✅ 1 query: video → course for every referenced video
+    video_courses = dict(
+        Video.objects.filter(id__in=video_ids).values_list("id", "module__course_id")
+    )
+
+    # ✅ enrollment membership from the token / enrollment cache
+    # (everyone but admins, users without a profile too)
+    if get_role(request) != 'ADMIN':
+        enrolled = enrolled_courses(request)
+    else:
+        enrolled = set(video_courses.values())
+
+    records = {}
+    for result, item in zip(results, parsed):
+        if item is None:
+            continue
+
+        video_id, watched_seconds, is_completed = item
+
+        if video_id not in video_courses:
+            result.update(status="error", error="Video not found")
+        elif video_courses[video_id] not in enrolled:
+            result.update(status="error", error="You are not enrolled in this course")
+        else:
+            # ✅ duplicates in one payload keep the furthest position
+            old_seconds, old_completed = records.get((request.user.id, video_id), (0, False))
+            records[(request.user.id, video_id)] = (
+                max(old_seconds, watched_seconds), old_completed or is_completed
+            )
+
+    # ✅ single transaction for all rows
+    merged = upsert_progress(records, video_courses)
+
+    for result in results:
+        if result["status"] == "ok":
+            watched_seconds, is_completed = merged[(request.user.id, result["video_id"])]
+            result.update(watched_seconds=watched_seconds, is_completed=is_completed)
+
+    return Response({
+        "saved": len(merged),
+        "failed": sum(1 for r in results if r["status"] == "error"),
+        "results": results
+    })
+
+
+@query_budget(2)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def module_videos(request, module_id):
@@ -546,13 +764,14 @@ def module_videos(request, module_id):
     return Response(serializer.data)
 
 
+@query_budget(2)
 @api_view(['POST', 'GET'])
 @permission_classes([IsAuthenticated])
 def enrollment_view(request, course_id):
 
     # 🔹 POST → Enroll in a course (STUDENT only)
     if request.method == 'POST':
-        if request.user.profile.role != 'STUDENT':
+        if get_role(request) != 'STUDENT':
             return Response(
                 {"error": "Only students can enroll"},
                 status=403
@@ -574,13 +793,7 @@ def enrollment_view(request, course_id):
 
     # 🔹 GET → Check enrollment status
     if request.method == 'GET':
-        is_enrolled = Enrollment.objects.filter(
-            user=request.user,
-            course_id=course_id,
-            is_active=True
-        ).exists()
-
-        return Response({"enrolled": is_enrolled})
+        return Response({"enrolled": is_enrolled(request, course_id)})
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsAdmin])
@@ -606,6 +819,26 @@ def add_question(request, quiz_id):
     serializer.save(quiz_id=quiz_id)
     return Response(serializer.data, status=201)
 
+def etag_response(request, data, etag):
+    """
+    ✅ 304 Not Modified when the client already has this version
+    (If-None-Match), otherwise the data with its ETag
+    """
+    etag = f'"{etag}"'
+    client_etags = parse_etags(request.headers.get("If-None-Match", ""))
+
+    if etag in client_etags or "*" in client_etags:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+
+    response["ETag"] = etag
+    # ✅ browsers must revalidate, but can reuse the body on 304
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def quiz_detail(request, quiz_id):
@@ -619,83 +852,122 @@ def quiz_detail(request, quiz_id):
         "module": quiz.module.id
     })
 
+@query_budget(4)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def quiz_questions(request, quiz_id):
-    quiz = get_object_or_404(Quiz, id=quiz_id)
-    questions = quiz.questions.all()
-
-    data = []
-    for q in questions:
-        data.append({
-            "id": q.id,
-            "question_text": q.question_text,
-            "option_a": q.option_a,
-            "option_b": q.option_b,
-            "option_c": q.option_c,
-            "option_d": q.option_d,
-        })
+    payload = get_quiz_payload(quiz_id)
+    if payload is None:
+        return Response({"error": "Quiz not found"}, status=404)
 
-    return Response(data)
+    data = [
+        {
+            "id": q["id"],
+            "question_text": q["question_text"],
+            "option_a": q["option_a"],
+            "option_b": q["option_b"],
+            "option_c": q["option_c"],
+            "option_d": q["option_d"],
+        }
+        for q in payload["questions"]
+    ]
+
+    return etag_response(request, data, payload["etag"])
 
+@query_budget(5)
 @api_view(['GET'])
 def module_quiz(request, module_id):
-    quiz = get_object_or_404(Quiz, module_id=module_id)
+    quiz_meta = get_module_quiz(module_id)
+    payload = get_quiz_payload(quiz_meta["quiz_id"]) if quiz_meta else None
+    if payload is None:
+        return Response({"error": "Quiz not found"}, status=404)
 
-    return Response({
-        "id": quiz.id,
-        "title": quiz.title,
-        "total_marks": quiz.total_marks,
-        "pass_marks": quiz.pass_marks,
-    })
+    quiz = payload["quiz"]
+    return etag_response(request, {
+        "id": quiz["id"],
+        "title": quiz["title"],
+        "total_marks": quiz["total_marks"],
+        "pass_marks": quiz["pass_marks"],
+    }, payload["etag"])
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsEnrolledViaModule])
 def get_quiz(request, module_id):
-    quiz = Quiz.objects.get(module_id=module_id)
-    questions = quiz.questions.all()
+    quiz_meta = get_module_quiz(module_id)
+    payload = get_quiz_payload(quiz_meta["quiz_id"]) if quiz_meta else None
+    if payload is None:
+        return Response({"error": "Quiz not found"}, status=404)
 
-    serializer = StudentQuestionSerializer(questions, many=True)
-    return Response({
-        "quiz_id": quiz.id,
-        "questions": serializer.data
-    })
+    return etag_response(request, {
+        "quiz_id": payload["quiz"]["id"],
+        "questions": payload["questions"]
+    }, payload["etag"])
 
+@query_budget(14)
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def submit_quiz(request, module_id):
-    module = get_object_or_404(Module, id=module_id)
-    quiz = get_object_or_404(Quiz, module=module)
+    # ✅ module → quiz and the answer key both come from cache
+    quiz_meta = get_module_quiz(module_id)
+    if quiz_meta is None:
+        return Response({"error": "Quiz not found"}, status=404)
 
     answers = request.data.get("answers", {})
     if not isinstance(answers, dict):
         return Response({"error": "Answers must be an object/dictionary"}, status=400)
 
-    questions = Question.objects.filter(quiz=quiz)
+    # ✅ None: the quiz went away after module → quiz was cached
+    answer_key = get_answer_key(quiz_meta["quiz_id"])
+    if answer_key is None:
+        return Response({"error": "Quiz not found"}, status=404)
 
-    score = 0
-    total = questions.count()
+    score = sum(
+        1
+        for question_id, correct_option in answer_key["answers"].items()
+        if str(answers.get(question_id) or "").upper() == correct_option
+    )
+    total = len(answer_key["answers"])
 
-    for q in questions:
-        selected = answers.get(str(q.id)) or answers.get(q.id)
-        if selected and selected.upper() == q.correct_option.upper():
-            score += 1
+    passed = score >= answer_key["pass_marks"]
 
-    passed = score >= quiz.pass_marks
+    attempts = QuizAttempt.objects.filter(user=request.user, quiz_id=quiz_meta["quiz_id"])
 
-    # ✅ Update or Create attempt
-    attempt, created = QuizAttempt.objects.update_or_create(
-        user=request.user,
-        quiz=quiz,
-        defaults={
-            "score": score,
-            "passed": passed
-        }
-    )
+    # ✅ Update or Create attempt. The row lock makes concurrent submissions
+    # of one user take turns, so each sees the result it replaces (the
+    # rollup / leaderboard deltas depend on it)
+    with transaction.atomic():
+        previous = attempts.select_for_update().values("passed", "score").first()
+
+        if previous is None:
+            try:
+                with transaction.atomic():
+                    QuizAttempt.objects.bulk_create([QuizAttempt(
+                        user=request.user,
+                        quiz_id=quiz_meta["quiz_id"],
+                        course_id=quiz_meta["course_id"],
+                        score=score,
+                        passed=passed
+                    )])
+            except IntegrityError:
+                # ✅ a concurrent first submission got there first: replace it
+                previous = attempts.select_for_update().values("passed", "score").first()
+
+        if previous is not None:
+            changes = {"score": score, "passed": passed}
+            if previous["score"] != score:
+                changes["scored_at"] = timezone.now()
+            attempts.update(**changes)
+
+        # ✅ bulk_create / update skip signals
+        record_quiz_attempt(quiz_meta["course_id"], previous and previous["passed"], passed)
+        if previous is None or previous["score"] != score:
+            record_quiz_score(request.user.id, quiz_meta["course_id"])
+
+    invalidate_course_progress(request.user.id, quiz_meta["course_id"])
 
     return Response({
-        "quiz_id": quiz.id,
+        "quiz_id": quiz_meta["quiz_id"],
         "module_id": module_id,
         "score": score,
         "total_questions": total,
@@ -704,87 +976,247 @@ def submit_quiz(request, module_id):
     }, status=200)
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def course_progress(request, course_id):
-    user = request.user
+    progress = get_course_progress(request.user, [course_id]).get(course_id)
 
-    # ✅ Only lessons which have a video assigned
-    total_lessons = Lesson.objects.filter(
-        module__course_id=course_id,
-        video__isnull=False
-    ).count()
+    if progress is None:
+        return Response({"error": "Course not found"}, status=404)
 
-    completed_lessons = VideoProgress.objects.filter(
-        user=user,
-        video__module__course_id=course_id,
-        is_completed=True
-    ).count()
+    # ✅ same payload as before (course_id is only used by the batch endpoint)
+    return Response({k: v for k, v in progress.items() if k != "course_id"})
 
-    progress_percent = 0
-    if total_lessons > 0:
-        progress_percent = int((completed_lessons / total_lessons) * 100)
 
-    quiz_passed = QuizAttempt.objects.filter(
-        user=user,
-        quiz__module__course_id=course_id,
-        passed=True
-    ).exists()
+MAX_PROGRESS_COURSES = 100
 
-    completed = total_lessons > 0 and completed_lessons == total_lessons
-    certificate_available = completed and quiz_passed
 
-    return Response({
-        "progress": progress_percent,
-        "videos_completed": completed_lessons,
-        "total_videos": total_lessons,
-        "quiz_passed": quiz_passed,
-        "completed": completed,
-        "certificate_available": certificate_available
-    })
+def requested_course_ids(request):
+    """
+    ✅ ?ids=1,2,3 → [1, 2, 3] (duplicates dropped, order kept), None when
+    absent. Raises ValueError for anything that isn't an integer.
+    """
+    ids = request.query_params.get("ids")
+    if not ids:
+        return None
 
+    return list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated, IsAdmin])
-def course_analytics(request, course_id):
+@query_budget(3)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def course_progress_batch(request):
+    """
+    ✅ Progress bars for many courses in one call: ?ids=1,2,3
+    Without ids → every course the user is actively enrolled in
+    """
+    try:
+        course_ids = requested_course_ids(request)
+    except ValueError:
+        return Response({"error": "ids must be a comma separated list of integers"}, status=400)
 
-    total_enrollments = Enrollment.objects.filter(
-        course_id=course_id,
-        is_active=True
-    ).count()
+    if course_ids is None:
+        course_ids = sorted(enrolled_courses(request))
 
-    total_modules = Module.objects.filter(course_id=course_id).count()
+    if len(course_ids) > MAX_PROGRESS_COURSES:
+        return Response({"error": f"At most {MAX_PROGRESS_COURSES} courses per request"}, status=400)
 
-    total_quizzes = Quiz.objects.filter(
-        module__course_id=course_id
-    ).count()
+    progress = get_course_progress(request.user, course_ids)
+    return Response([progress[course_id] for course_id in course_ids if course_id in progress])
 
-    certificates_issued = Certificate.objects.filter(
-        course_id=course_id
-    ).count()
 
-    return Response({
-        "course_id": course_id,
-        "enrollments": total_enrollments,
-        "modules": total_modules,
-        "quizzes": total_quizzes,
-        "certificates_issued": certificates_issued
-    })
+# ==========================================================
+# ✅ CERTIFICATES
+# (PDFs render in a process pool, stored by content hash on disk)
+# ==========================================================
+def certificate_payload(request, certificate):
+    return {
+        "certificate_id": certificate.certificate_id,
+        "course_id": certificate.course_id,
+        "issued_at": certificate.issued_at,
+        "status": "ready" if certificate.pdf_sha256 else "pending",
+        "download_url": request.build_absolute_uri(
+            reverse("download_certificate", args=[certificate.certificate_id])
+        ),
+    }
+
+
+@query_budget(2)
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated])
+def course_certificate(request, course_id):
+    """
+    GET  → the user's certificate for this course (404 if not issued)
+    POST → issue it once certificate_available (idempotent)
+    """
+    if request.method == "GET":
+        certificate = get_object_or_404(Certificate, user=request.user, course_id=course_id)
+        return Response(certificate_payload(request, certificate))
+
+    progress = get_course_progress(request.user, [course_id]).get(course_id)
+
+    if progress is None:
+        return Response({"error": "Course not found"}, status=404)
+
+    if not progress["certificate_available"]:
+        return Response(
+            {"error": "Complete all lessons and pass the quiz to get a certificate"},
+            status=400
+        )
+
+    certificate, created = issue_certificate(request.user, course_id)
+
+    if certificate_file(certificate) is None:
+        request_render(certificate)
+
+    return Response(
+        certificate_payload(request, certificate),
+        status=201 if created else 200
+    )
+
+
+def parse_byte_range(header, size):
+    """
+    ✅ Single "bytes=" range → (start, end) inclusive,
+    None → serve the whole file, False → 416
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", (header or "").strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+
+    if start == "":
+        # suffix range: the last N bytes
+        length = int(end)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+
+    if start >= size or start > end:
+        return False
+
+    return start, end
+
+
+def pdf_file_response(request, path, etag, filename):
+    """
+    ✅ Stored PDF with a strong ETag (its sha256), long-lived caching
+    (the content never changes) and Range / If-Range support
+    """
+    etag = f'"{etag}"'
+    size = os.path.getsize(path)
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponse(status=304)
+    else:
+        byte_range = None
+        if request.headers.get("If-Range", etag) == etag:
+            byte_range = parse_byte_range(request.headers.get("Range"), size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+        elif byte_range:
+            start, end = byte_range
+            with open(path, "rb") as f:
+                f.seek(start)
+                content = f.read(end - start + 1)
+
+            response = HttpResponse(content, status=206, content_type="application/pdf")
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        else:
+            response = FileResponse(open(path, "rb"), content_type="application/pdf", filename=filename)
+
+    response["ETag"] = etag
+    response["Accept-Ranges"] = "bytes"
+    response["Cache-Control"] = "private, max-age=31536000, immutable"
+    return response
+
+
+@query_budget(3)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def download_certificate(request, certificate_id):
+    certificate = get_object_or_404(
+        Certificate.objects.select_related("user", "course"),
+        certificate_id=certificate_id
+    )
+
+    if certificate.user_id != request.user.id and get_role(request) != "ADMIN":
+        return Response({"error": "Not allowed"}, status=403)
+
+    path = certificate_file(certificate)
+
+    if path is None:
+        # ✅ not rendered yet (or file lost) → (re)queue and let the client poll
+        request_render(certificate)
+        path = certificate_file(certificate)
+
+    if path is None:
+        response = Response({"status": "pending"}, status=202)
+        response["Retry-After"] = "2"
+        return response
+
+    return pdf_file_response(
+        request,
+        path,
+        certificate.pdf_sha256,
+        f"certificate-{certificate.certificate_id}.pdf"
+    )
+
+
+
+MAX_ANALYTICS_COURSES = 100
+
+
+def course_batch(request, build_rows):
+    """
+    ✅ ?ids=1,2,3 → [row, ...] in ids order; without ids → every course
+    """
+    try:
+        course_ids = requested_course_ids(request)
+    except ValueError:
+        return Response({"error": "ids must be a comma separated list of integers"}, status=400)
+
+    if course_ids is None:
+        course_ids = list(Course.objects.order_by("id").values_list("id", flat=True))
+    elif len(course_ids) > MAX_ANALYTICS_COURSES:
+        return Response({"error": f"At most {MAX_ANALYTICS_COURSES} courses per request"}, status=400)
 
+    return Response(list(build_rows(course_ids).values()))
 
+
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
-def course_pass_fail_stats(request, course_id):
+def course_analytics(request, course_id):
+    # ✅ enrollments / modules / quizzes / certificates in ONE query
+    return Response(course_analytics_rows([course_id])[course_id])
+
+
+@query_budget(4)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def course_analytics_batch(request):
+    """
+    ✅ Analytics for many courses in one call: ?ids=1,2,3
+    Without ids → every course
+    """
+    return course_batch(request, course_analytics_rows)
 
-    total_attempts = QuizAttempt.objects.filter(
-        quiz__module__course_id=course_id
-    ).count()
 
-    passed = QuizAttempt.objects.filter(
-        quiz__module__course_id=course_id,
-        passed=True
-    ).count()
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def course_pass_fail_stats(request, course_id):
+    # ✅ counters from CourseStatsRollup
+    counts = course_pass_fail_rows([course_id])[course_id]
+    total_attempts, passed = counts["total_attempts"], counts["passed"]
 
     failed = total_attempts - passed
 
@@ -802,42 +1234,147 @@ def course_pass_fail_stats(request, course_id):
     })
 
 
-from django.db.models import Avg
+MAX_TOP_STUDENTS = 100
 
+
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
 def top_students(request, course_id):
+    # ✅ ?n= top N (default 5) straight from the leaderboard table
+    try:
+        n = int(request.query_params.get("n", 5))
+    except ValueError:
+        n = 0
 
-    top = QuizAttempt.objects.filter(
-        quiz__module__course_id=course_id
-    ).values(
-        'user__username'
-    ).annotate(
-        avg_score=Avg('score')
-    ).order_by('-avg_score')[:5]
+    if not 1 <= n <= MAX_TOP_STUDENTS:
+        return Response({"error": f"n must be between 1 and {MAX_TOP_STUDENTS}"}, status=400)
 
-    return Response(top)
+    return Response([
+        {"user__username": entry["user__username"], "avg_score": entry["avg_score"]}
+        for entry in leaderboard(course_id)[:n]
+    ])
 
 
+@query_budget(5)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsEnrolledStudent | IsAdmin])
+def course_leaderboard(request, course_id):
+    """
+    ✅ Quiz leaderboard of a course: ?page=&page_size= (page_size = top N)
+    "me" is the caller's own rank (null without attempts)
+    Enrolled students and admins only; user ids are shown to admins only.
+    """
+    paginator = LeaderboardPagination()
+    page = paginator.paginate_queryset(leaderboard(course_id), request)
+
+    if not page and not Course.objects.filter(id=course_id).exists():
+        return Response({"error": "Course not found"}, status=404)
+
+    first_rank = paginator.page.start_index()
+    rows = [leaderboard_row(entry, first_rank + i) for i, entry in enumerate(page)]
+
+    response = paginator.get_paginated_response(rows)
+    # ✅ no extra queries when the caller is on this page
+    me = next(
+        (row for row in rows if row["user_id"] == request.user.id), None
+    ) or my_rank(course_id, request.user.id)
+
+    if get_role(request) != "ADMIN":
+        for row in rows + [me or {}]:
+            row.pop("user_id", None)
+
+    response.data["me"] = me
+    return response
+
+
+@query_budget(5)
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_dashboard_stats(request):
     return Response({
         "total_courses": Course.objects.count(),
         "total_users": User.objects.count(),
-        "total_enrollments": Enrollment.objects.count(),
+        "total_enrollments": total_enrollments(),
         "recent_courses": list(
             Course.objects.order_by("-id")[:5].values("id", "title", "description")
         )
     })
 
+def parse_timestamp(value):
+    """
+    ✅ ISO date or datetime → aware datetime (naive values are UTC)
+    Raises ValueError for anything else.
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.min)
+
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+DEFAULT_ACTIVITY_RANGE = timedelta(days=30)
+
+
+@query_budget(3)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_activity(request):
+    """
+    ✅ Activity trends from the hourly buckets (see app.activity)
+    ?metrics=enrollments,first_quiz_attempts  (default: all)
+    ?course=<id>                              (default: all courses)
+    ?start=&end=  ISO date/datetime, end exclusive (default: last 30 days)
+    ?interval=hour|day|week|month             (default: finest within MAX_ACTIVITY_POINTS)
+    """
+    params = request.query_params
+
+    metrics = [m for m in params.get("metrics", "").split(",") if m.strip()] or list(ACTIVITY_SOURCES)
+    unknown = [m for m in metrics if m not in ACTIVITY_SOURCES]
+    if unknown:
+        return Response({"error": f"Unknown metrics: {', '.join(unknown)}"}, status=400)
+
+    try:
+        end = parse_timestamp(params["end"]) if params.get("end") else timezone.now()
+        start = parse_timestamp(params["start"]) if params.get("start") else end - DEFAULT_ACTIVITY_RANGE
+        course_id = int(params["course"]) if params.get("course") else None
+    except ValueError:
+        return Response({"error": "start/end must be ISO dates or datetimes, course an integer"}, status=400)
+
+    if start >= end:
+        return Response({"error": "start must be before end"}, status=400)
+
+    interval = params.get("interval") or pick_interval(start, end)
+    if interval not in INTERVALS:
+        return Response({"error": f"interval must be one of: {', '.join(INTERVALS)}"}, status=400)
+
+    if point_count(start, end, interval) > MAX_ACTIVITY_POINTS:
+        return Response(
+            {"error": f"At most {MAX_ACTIVITY_POINTS} points per series, use a coarser interval"},
+            status=400
+        )
+
+    return Response({
+        "interval": interval,
+        "start": start,
+        "end": end,
+        # ✅ buckets after this are not rolled up yet
+        "rolled_up_to": rolled_up_to(metrics),
+        "series": activity_series(metrics, start, end, interval, course_id=course_id),
+    })
+
+
+@query_budget(3)
 @api_view(['GET', 'POST'])
 @permission_classes([IsAdminUser])
 def admin_courses(request):
     if request.method == 'GET':
-        courses = Course.objects.all().order_by('-id')
-        serializer = CourseSerializer(courses, many=True)
-        return Response(serializer.data)
+        return paginated_courses(request, Course.objects.all())
 
     if request.method == 'POST':
       serializer = CourseSerializer(data=request.data)
@@ -865,6 +1402,7 @@ def admin_course_detail(request, pk):
         return Response(status=204)
 
 
+@query_budget(2)
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_users(request):
@@ -900,13 +1438,14 @@ def toggle_user_active(request, pk):
         )
 
 
+@query_budget(3)
 @api_view(["GET", "POST"])
 @permission_classes([IsAdminUser])
 def admin_modules(request, course_id):
 
     # ✅ GET modules list
     if request.method == "GET":
-        modules = Module.objects.filter(course_id=course_id).order_by("order")
+        modules = Module.objects.filter(course_id=course_id).prefetch_related("lessons").order_by("order")
         serializer = ModuleSerializer(modules, many=True)
         return Response(serializer.data, status=200)
 
@@ -923,6 +1462,7 @@ def admin_modules(request, course_id):
         return Response(serializer.errors, status=400)
 
 
+@query_budget(3)
 @api_view(["GET", "PUT", "PATCH", "DELETE"])
 @permission_classes([IsAdminUser])
 def admin_module_detail(request, module_id):
@@ -952,12 +1492,13 @@ def admin_module_detail(request, module_id):
 
 
 
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
 def admin_lessons(request, module_id):
     lessons = Lesson.objects.filter(
         module_id=module_id
-    ).order_by("order")
+    ).select_related("module").order_by("order")
     serializer = LessonSerializer(lessons, many=True)
     return Response(serializer.data)
 
@@ -1013,6 +1554,7 @@ def admin_update_quiz(request, quiz_id):
 
     return Response(serializer.data)
     
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_enrollments(request):
@@ -1031,7 +1573,8 @@ def enroll_course(request, course_id):
     user = request.user
 
     # ✅ Only students can enroll (optional)
-    if hasattr(user, "profile") and user.profile.role != "STUDENT":
+    role = get_role(request)
+    if role is not None and role != "STUDENT":
         return Response({"error": "Only students can enroll"}, status=403)
 
     enrollment, created = Enrollment.objects.get_or_create(
@@ -1044,21 +1587,24 @@ def enroll_course(request, course_id):
 
     return Response({"message": "Enrolled successfully"}, status=201)
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def lesson_detail(request, lesson_id):
-    lesson = get_object_or_404(Lesson, id=lesson_id)
+    lesson = get_object_or_404(Lesson.objects.select_related("module"), id=lesson_id)
     serializer = LessonSerializer(lesson)
     return Response(serializer.data, status=200)
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def module_lessons(request, module_id):
-    lessons = Lesson.objects.filter(module_id=module_id).order_by("order")
+    lessons = Lesson.objects.filter(module_id=module_id).select_related("module").order_by("order")
     serializer = LessonSerializer(lessons, many=True)
     return Response(serializer.data, status=200)
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def module_completed_lessons(request, module_id):
@@ -1075,31 +1621,26 @@ def module_completed_lessons(request, module_id):
 
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def course_stats(request, course_id):
+    # ✅ lessons / completed videos / first-quiz attempts in ONE query
+    return Response(course_stats_rows([course_id])[course_id])
 
-    total_lessons = Lesson.objects.filter(module__course_id=course_id).count()
-
-    completed_videos = VideoProgress.objects.filter(
-        video__module__course_id=course_id,
-        is_completed=True
-    ).count()
-
-    # quiz data
-    quiz = Quiz.objects.filter(module__course_id=course_id).first()
-    quiz_attempts = QuizAttempt.objects.filter(quiz=quiz).count() if quiz else 0
-    passed = QuizAttempt.objects.filter(quiz=quiz, passed=True).count() if quiz else 0
 
-    return Response({
-        "course_id": course_id,
-        "total_lessons": total_lessons,
-        "completed_videos": completed_videos,
-        "quiz_attempts": quiz_attempts,
-        "passed_attempts": passed,
-    })
+@query_budget(3)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def course_stats_batch(request):
+    """
+    ✅ Stats for many courses in one call: ?ids=1,2,3
+    Without ids → every course
+    """
+    return course_batch(request, course_stats_rows)
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def lesson_list(request):
@@ -1107,10 +1648,11 @@ def lesson_list(request):
     serializer = LessonSerializer(lessons, many=True)
     return Response(serializer.data)
 
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def module_list(request):
-    modules = Module.objects.all().order_by("id")
+    modules = Module.objects.prefetch_related("lessons").order_by("id")
     serializer = ModuleSerializer(modules, many=True)
     return Response(serializer.data)
 
@@ -1154,30 +1696,13 @@ def edit_quiz_question(request, question_id):
 
 
 
+@query_budget(2)
 @api_view(["GET"])
 def admin_courses_quiz_stats(request):
-    courses = Course.objects.all()
-    data = []
-
-    for course in courses:
-        # ✅ attempts where quiz->module->course = this course
-        attempts = QuizAttempt.objects.filter(quiz__module__course=course)
-
-        total_attempts = attempts.count()
-        passed = attempts.filter(passed=True).count()
-        failed = total_attempts - passed
-
-        pass_percentage = 0
-        if total_attempts > 0:
-            pass_percentage = round((passed / total_attempts) * 100, 2)
-
-        data.append({
-            "course_id": course.id,
-            "course_title": course.title,
-            "total_attempts": total_attempts,
-            "passed": passed,
-            "failed": failed,
-            "pass_percentage": pass_percentage,
-        })
+    # ✅ ?source=snapshot → latest daily snapshot (falls back to live stats)
+    use_snapshot = (
+        request.query_params.get("source") == "snapshot"
+        or getattr(settings, "QUIZ_STATS_USE_SNAPSHOT", False)
+    )
 
-    return Response(data)
\ No newline at end of file
+    return Response(course_quiz_stats(use_snapshot=use_snapshot))
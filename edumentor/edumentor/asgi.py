@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+✅ Opt-in (the Procfile serves WSGI):
+    web: gunicorn edumentor.asgi -k uvicorn_worker.UvicornWorker
+with DB_POOL=1 and requirements-pool.txt on PostgreSQL: persistent
+connections are off under ASGI, so without the pool every request
+opens a new connection (check app.W001).
 """
 
 import os
@@ -12,5 +18,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'edumentor.settings')
+# ✅ read by settings (SERVING_ASGI): async views on, persistent DB connections off
+os.environ.setdefault('EDUMENTOR_ASGI', '1')
 
 application = get_asgi_application()
@@ -56,16 +56,21 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'app.middleware.AsyncWhiteNoiseMiddleware',  # ✅ async-capable WhiteNoise (ASGI)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    
+    'app.query_budget.QueryBudgetMiddleware',
 ]
 
+# ✅ per-view query budgets (app/query_budget.py): off | log | raise
+QUERY_BUDGET_MODE = os.environ.get("QUERY_BUDGET_MODE", "off")
+# budget for views without @query_budget (None = unchecked)
+QUERY_BUDGET_DEFAULT = None
+
 ROOT_URLCONF = 'edumentor.urls'
 
 TEMPLATES = [
@@ -85,17 +90,42 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'edumentor.wsgi.application'
 
+# ✅ set by edumentor/asgi.py (opt-in: the Procfile serves WSGI)
+SERVING_ASGI = os.environ.get("EDUMENTOR_ASGI", "0") == "1"
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
 
+# ✅ Connection reuse for the DATABASE_URL deployment
+# DB_CONN_MAX_AGE      seconds a connection is kept between requests (0 = close per request)
+# DB_CONN_HEALTH_CHECKS ping reused connections before the request uses them
+# DB_POOL=1            PostgreSQL only: Django's psycopg 3 pool; replaces persistent
+#                      connections, so CONN_MAX_AGE is forced to 0. psycopg 3 is NOT in
+#                      requirements.txt (psycopg2 only): install requirements-pool.txt
+# Under ASGI requests don't keep a thread, so a persistent connection is
+# never reused and each one stays open until it times out: CONN_MAX_AGE
+# is forced to 0 there too, and DB_POOL=1 is the way to reuse connections.
+DB_CONN_MAX_AGE = 0 if SERVING_ASGI else int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+DB_CONN_HEALTH_CHECKS = os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1"
+DB_POOL = os.environ.get("DB_POOL", "0") == "1"
+
 if 'DATABASE_URL' in os.environ:
     DATABASES = {
         'default': dj_database_url.config(
-            default=os.environ.get('DATABASE_URL')
+            default=os.environ.get('DATABASE_URL'),
+            conn_max_age=0 if DB_POOL else DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
         )
     }
+
+    if DB_POOL and 'postgresql' in DATABASES['default']['ENGINE']:
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            'max_size': int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            'timeout': float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        }
 else:
     DATABASES = {
         'default': {
@@ -104,6 +134,49 @@ else:
         }
     }
 
+    # ✅ SQLITE_PRODUCTION=1 → single-node production profile:
+    # WAL lets readers run alongside the writer, BEGIN IMMEDIATE takes the
+    # write lock up front (no deadlock-style "database is locked" on lock
+    # upgrade) and busy_timeout / timeout make writers queue instead of fail
+    if os.environ.get("SQLITE_PRODUCTION", "0") == "1":
+        DATABASES['default']['OPTIONS'] = {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA busy_timeout=20000;"
+                "PRAGMA mmap_size=268435456;"
+                "PRAGMA cache_size=-64000;"
+                "PRAGMA temp_store=MEMORY;"
+            ),
+        }
+        DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+
+
+# ✅ Cache (course outline, quiz keys, roles, enrollment membership)
+# local memory per process by default; REDIS_URL shares it between
+# gunicorn workers (needs the "redis" package)
+if 'REDIS_URL' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'edumentor',
+        }
+    }
+
+
+# ✅ Certificates: rendered PDFs live under CERTIFICATE_ROOT/<sha[:2]>/<sha>.pdf
+# and render in a process pool (0 workers → inline, for dev)
+CERTIFICATE_ROOT = os.environ.get("CERTIFICATE_ROOT", BASE_DIR / "certificates")
+CERTIFICATE_RENDER_WORKERS = int(os.environ.get("CERTIFICATE_RENDER_WORKERS", "2"))
 
 
 # Password validation
@@ -142,8 +215,23 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# ✅ JWT_STATELESS_READS=1 → GET/HEAD/OPTIONS are authenticated from the
+# token claims (role / enrollments) without loading the User.
+# Needs a shared cache (REDIS_URL) to revoke claims: without one the
+# mode stays off (check app.E002). Access tokens then live 15 minutes,
+# the longest a claim is trusted: refresh tokens carry no claims, every
+# refresh re-reads them (app.tokens.ClaimsRefreshToken).
+JWT_STATELESS_READS = os.environ.get("JWT_STATELESS_READS", "0") == "1"
+
+# ✅ ASYNC_VIEWS=1 → the hot read endpoints are served by app/async_views.py;
+# they only free up threads under ASGI, so that's the default there (see
+# edumentor/asgi.py) and off under WSGI, where each would run in a thread hop
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "1" if SERVING_ASGI else "0") == "1"
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'app.authentication.ClaimsJWTAuthentication'
+        if JWT_STATELESS_READS else
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
 }
@@ -155,19 +243,34 @@ REST_FRAMEWORK = {
 # }
 
 SIMPLE_JWT={
-    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=120),
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15 if JWT_STATELESS_READS else 120),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
 
     'AUTH_HEADER_TYPES':('Bearer',),
     'AUTH_TOKEN_CLASSES':('rest_framework_simplejwt.tokens.AccessToken',),
+    'TOKEN_OBTAIN_SERIALIZER': 'app.tokens.EduMentorTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'app.tokens.EduMentorTokenRefreshSerializer',
 
 }
 AUTHENTICATION_BACKENDS = [
     "django.contrib.auth.backends.ModelBackend",
 ]
 
+# Video progress heartbeats: when enabled, POST /video-progress/<id>/ is
+# coalesced in memory per (user, video) and written in batches.
+VIDEO_PROGRESS_BUFFER = {
+    'ENABLED': os.environ.get('VIDEO_PROGRESS_BUFFER', '0') == '1',
+    'FLUSH_INTERVAL': float(os.environ.get('VIDEO_PROGRESS_FLUSH_INTERVAL', '2')),
+    'MAX_PENDING': int(os.environ.get('VIDEO_PROGRESS_MAX_PENDING', '1000')),
+    'MAX_RETRIES': int(os.environ.get('VIDEO_PROGRESS_MAX_RETRIES', '5')),
+}
+
+# Admin quiz stats: serve the latest `snapshot_quiz_stats` snapshot instead
+# of aggregating QuizAttempt live.
+QUIZ_STATS_USE_SNAPSHOT = os.environ.get('QUIZ_STATS_USE_SNAPSHOT', '0') == '1'
+
 
 
 # STATIC_URL = '/static/'
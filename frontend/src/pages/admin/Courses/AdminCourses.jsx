@@ -11,8 +11,17 @@ export default function AdminCourses() {
   const fetchCourses = async () => {
     try {
       setLoading(true);
-      const res = await api.get("/admin/courses/");
-      setCourses(res.data || []);
+
+      // ✅ admin list is cursor-paginated: follow `next` until the last page
+      let url = "/admin/courses/";
+      let all = [];
+
+      while (url) {
+        const res = await api.get(url);
+        all = [...all, ...(res.data?.results || [])];
+        setCourses(all);
+        url = res.data?.next;
+      }
     } catch (err) {
       console.log("Courses fetch error:", err?.response?.data || err);
       alert("❌ Failed to load courses");
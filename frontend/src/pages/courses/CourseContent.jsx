@@ -10,8 +10,8 @@ export default function CourseContent() {
   useEffect(() => {
     const fetchModules = async () => {
       try {
-        const res = await api.get(`/courses/${courseId}/modules/`);
-        setModules(res.data);
+        const res = await api.get(`/courses/${courseId}/outline/`);
+        setModules(res.data?.modules || []);
       } catch (err) {
         console.error(err);
       }
@@ -24,8 +24,8 @@ export default function CourseDetail() {
       setCourse(courseRes.data);
 
       if (courseRes.data.is_enrolled) {
-        const moduleRes = await api.get(`/courses/${courseId}/modules/`);
-        setModules(moduleRes.data || []);
+        const outlineRes = await api.get(`/courses/${courseId}/outline/`);
+        setModules(outlineRes.data?.modules || []);
       } else {
         setModules([]);
       }
@@ -17,8 +17,20 @@ export default function CoursePage() {
   useEffect(() => {
     const fetchCourses = async () => {
       try {
-        const res = await api.get("/courses/");
-        setCourses(res.data || []);
+        // ✅ catalog is cursor-paginated: render the first page, then append the rest
+        let url = "/courses/";
+        let firstPage = true;
+
+        while (url) {
+          const res = await api.get(url);
+          const page = res.data?.results || [];
+
+          setCourses((prev) => (firstPage ? page : [...prev, ...page]));
+          if (firstPage) setLoading(false);
+
+          firstPage = false;
+          url = res.data?.next;
+        }
       } catch (err) {
         console.log("Course fetch error:", err);
       } finally {